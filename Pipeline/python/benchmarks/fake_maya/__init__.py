@@ -0,0 +1,455 @@
+"""A fake maya.cmds and maya.mel, to run the maya api outside of maya.
+
+The scene is an in memory graph of nodes with their attributes, saved in the
+.ma files as json after a maya header, so the scenes can be opened, imported
+and referenced back. Every command is counted and can be slowed down
+to measure how many maya calls an operation makes and what they cost :
+
+    import fake_maya
+
+    fake_maya.install(latency=0.001, file=0.05)
+    from maya import cmds
+
+    creation.create_maya_scenes("pr_asset0000_mod_000.ma")
+    print(fake_maya.CALLS.most_common())
+
+The file paths are used as given, like maya does on windows.
+"""
+
+import collections
+import fnmatch
+import json
+import os
+import sys
+import time
+
+# the number of calls by command name, "mel.eval" for the mel commands
+CALLS = collections.Counter()
+
+# the time in seconds every command takes, by command name
+LATENCY = dict()
+
+# the time in seconds the commands without a latency of their own take
+DEFAULT_LATENCY = 0.0
+
+# the marker of the line holding the scene in the .ma files
+SCENE_MARKER = "//fake_maya: "
+
+HEADER = """//Maya ASCII 2022 scene
+//Name: {name}
+//Codeset: 1252
+requires maya "2022";
+currentUnit -l centimeter -a degree -t film;
+fileInfo "application" "maya";
+fileInfo "product" "Maya 2022";
+fileInfo "version" "2022";
+fileInfo "license" "student";
+"""
+
+# the attributes every transform has, with their default values
+TRANSFORM_ATTRIBUTES = {
+    "translate": [0.0, 0.0, 0.0],
+    "rotate": [0.0, 0.0, 0.0],
+    "scale": [1.0, 1.0, 1.0],
+    "visibility": True,
+}
+
+# the short names of the attributes, and the names of their components
+ALIASES = {"t": "translate", "r": "rotate", "s": "scale", "v": "visibility"}
+COMPONENTS = {"x": 0, "y": 1, "z": 2}
+
+
+class Node(object):
+    """A node of the scene, with its attributes."""
+
+    def __init__(self, name, type="transform", parent=None):
+        """Initialize the node.
+
+        :param name: The node name, with its namespace. (eg: "ch_hero:RIG")
+        :type name: str
+        :param type: The node type. (eg: "transform", "mesh", "joint")
+        :type type: str
+        :param parent: The parent node name, none if the node is at the root.
+        :type parent: str, none
+        """
+
+        self.name = name
+        self.type = type
+        self.parent = parent
+
+        # the value, type and lock state by attribute name
+        self.attributes = dict()
+        if type in ("transform", "joint"):
+            for attribute, value in TRANSFORM_ATTRIBUTES.items():
+                self.attributes[attribute] = {
+                    "value": list(value) if isinstance(value, list) else value,
+                    "type": None,
+                    "locked": False,
+                }
+
+        # the deformers in the history of the node (eg: blend shapes)
+        self.history = list()
+
+    def to_dict(self):
+        """Get the node as a json serializable dict.
+
+        :return: The node data.
+        :rtype: dict
+        """
+
+        return {
+            "name": self.name,
+            "type": self.type,
+            "parent": self.parent,
+            "attributes": self.attributes,
+            "history": self.history,
+        }
+
+    @classmethod
+    def from_dict(cls, data, names):
+        """Create a node from its data.
+
+        :param data: The node data.
+        :type data: dict
+        :param names: The names of the nodes in the scene by name in the data.
+        :type names: dict
+
+        :return: The node.
+        :rtype: Node
+        """
+
+        node = cls(names[data["name"]], data["type"], names.get(data["parent"]))
+        node.attributes = data["attributes"]
+        node.history = [names.get(name, name) for name in data["history"]]
+        return node
+
+
+class Scene(object):
+    """The scene opened in the fake maya."""
+
+    def __init__(self):
+        """Initialize an empty scene."""
+
+        self.path = ""
+        self.modified = False
+
+        # the nodes by name, in creation order
+        self.nodes = dict()
+        self.selection = list()
+
+        # the source plug by destination plug
+        self.connections = dict()
+
+        self.playback = {"min": 1.0, "max": 120.0}
+        self.baked = dict()
+        self.workspace = os.getcwd()
+
+    # nodes
+
+    def unique_name(self, name):
+        """Get a name no node has, numbering it like maya does.
+
+        :param name: The wanted name.
+        :type name: str
+
+        :return: The name, numbered if needed.
+        :rtype: str
+        """
+
+        if name not in self.nodes:
+            return name
+
+        base = name.rstrip("0123456789")
+        index = 1
+        while "{}{}".format(base, index) in self.nodes:
+            index += 1
+        return "{}{}".format(base, index)
+
+    def create(self, name, type="transform", parent=None):
+        """Create a node.
+
+        :param name: The wanted node name.
+        :type name: str
+        :param type: The node type.
+        :type type: str
+        :param parent: The parent node name.
+        :type parent: str, none
+
+        :return: The node.
+        :rtype: Node
+        """
+
+        if parent is not None:
+            self.get(parent)
+        node = Node(self.unique_name(name), type, parent)
+        self.nodes[node.name] = node
+        self.modified = True
+        return node
+
+    def get(self, name):
+        """Get a node by name.
+
+        :param name: The node name, its last path component is used.
+        :type name: str
+
+        :return: The node.
+        :rtype: Node
+        """
+
+        node = self.nodes.get(self.resolve(name))
+        if node is None:
+            raise ValueError("No object matches name: " + name)
+        return node
+
+    @staticmethod
+    def resolve(name):
+        """Get the short name of a node, without the root namespace.
+
+        :param name: The node name or path. (eg: "|ch_hero|:GEO")
+        :type name: str
+
+        :return: The node name. (eg: "GEO")
+        :rtype: str
+        """
+
+        name = name.rpartition("|")[2]
+        return name[1:] if name.startswith(":") else name
+
+    def ancestors(self, name):
+        """Get the ancestors of a node, its parent first.
+
+        :param name: The node name.
+        :type name: str
+
+        :return: The ancestor nodes.
+        :rtype: list
+        """
+
+        nodes = list()
+        node = self.get(name)
+        while node.parent is not None:
+            node = self.get(node.parent)
+            nodes.append(node)
+        return nodes
+
+    def children(self, name):
+        """Get the children of a node.
+
+        :param name: The node name.
+        :type name: str
+
+        :return: The children nodes.
+        :rtype: list
+        """
+
+        return [node for node in self.nodes.values() if node.parent == name]
+
+    def descendants(self, name):
+        """Get the descendants of a node, depth first.
+
+        :param name: The node name.
+        :type name: str
+
+        :return: The descendant nodes.
+        :rtype: list
+        """
+
+        nodes = list()
+        for child in self.children(name):
+            nodes.append(child)
+            nodes.extend(self.descendants(child.name))
+        return nodes
+
+    def delete(self, name):
+        """Delete a node and its descendants.
+
+        :param name: The node name.
+        :type name: str
+        """
+
+        node = self.get(name)
+        for child in self.descendants(node.name) + [node]:
+            self.nodes.pop(child.name, None)
+            if child.name in self.selection:
+                self.selection.remove(child.name)
+        self.modified = True
+
+    def match(self, pattern):
+        """Get the names matching a pattern, with the namespaces.
+
+        :param pattern: The pattern. (eg: "*:pipe_node")
+        :type pattern: str
+
+        :return: The node names.
+        :rtype: list
+        """
+
+        return [name for name in self.nodes if fnmatch.fnmatchcase(name, pattern)]
+
+    # attributes
+
+    def get_attribute(self, plug):
+        """Get an attribute of a node.
+
+        :param plug: The node and attribute names. (eg: "GEO.translate")
+        :type plug: str
+
+        :return: The attribute and the component index, none for the whole value.
+        :rtype: tuple
+        """
+
+        name, _, attribute = plug.partition(".")
+        node = self.get(name)
+        attribute = attribute.lstrip(".")
+
+        # the components of the vectors (eg: tx, rotateY)
+        index = None
+        if attribute not in node.attributes and attribute not in ALIASES:
+            if attribute[-1:].lower() in COMPONENTS:
+                index = COMPONENTS[attribute[-1].lower()]
+                attribute = attribute[:-1]
+
+        attribute = ALIASES.get(attribute, attribute)
+        if attribute not in node.attributes:
+            raise ValueError("No object matches name: " + plug)
+
+        return node.attributes[attribute], index
+
+    # files
+
+    def to_dict(self):
+        """Get the scene as a json serializable dict.
+
+        :return: The scene data.
+        :rtype: dict
+        """
+
+        return {
+            "nodes": [node.to_dict() for node in self.nodes.values()],
+            "connections": self.connections,
+            "playback": self.playback,
+        }
+
+    def write(self, path, names=None):
+        """Write the scene, or some of its nodes, in a file.
+
+        :param path: The complete path to the file.
+        :type path: str
+        :param names: The names of the nodes to write, with their descendants
+            and ancestors. If none, write every node.
+        :type names: list, none
+        """
+
+        data = self.to_dict()
+        if names is not None:
+            exported = set()
+            for name in names:
+                exported.add(name)
+                exported.update(node.name for node in self.descendants(name))
+                exported.update(node.name for node in self.ancestors(name))
+            data["nodes"] = [node for node in data["nodes"] if node["name"] in exported]
+
+        lines = [HEADER.format(name=os.path.basename(path))]
+        lines.append(SCENE_MARKER + json.dumps(data) + "\n")
+        for node in data["nodes"]:
+            lines.append('createNode {} -n "{}";\n'.format(node["type"], node["name"]))
+
+        with open(path, "w") as scene_file:
+            scene_file.write("".join(lines))
+
+    def read(self, path, namespace=""):
+        """Add the nodes of a file to the scene.
+
+        :param path: The complete path to the file.
+        :type path: str
+        :param namespace: The namespace of the nodes, with its colon.
+            If none, the nodes clashing with the scene ones are numbered.
+        :type namespace: str
+
+        :return: The names of the nodes added.
+        :rtype: list
+        """
+
+        if not os.path.exists(path):
+            raise RuntimeError("File not found: " + path)
+
+        data = {"nodes": list(), "connections": dict(), "playback": None}
+        with open(path, "r") as scene_file:
+            for line in scene_file:
+                if line.startswith(SCENE_MARKER):
+                    data = json.loads(line[len(SCENE_MARKER) :])
+                    break
+
+        # the names in the scene by name in the file
+        names = dict()
+        for node_data in data["nodes"]:
+            name = self.unique_name(namespace + node_data["name"])
+            names[node_data["name"]] = name
+            # reserve the name for the next nodes
+            self.nodes[name] = None
+
+        for node_data in data["nodes"]:
+            node = Node.from_dict(node_data, names)
+            self.nodes[node.name] = node
+        for destination, source in data["connections"].items():
+            self.connections[namespace + destination] = namespace + source
+        if data["playback"] and not namespace:
+            self.playback = data["playback"]
+
+        self.modified = True
+        return list(names.values())
+
+
+# the scene opened
+SCENE = Scene()
+
+
+def call(name):
+    """Count a call to a command and wait its latency.
+
+    :param name: The command name.
+    :type name: str
+    """
+
+    CALLS[name] += 1
+    latency = LATENCY.get(name, DEFAULT_LATENCY)
+    if latency:
+        time.sleep(latency)
+
+
+def set_latency(default=0.0, **commands):
+    """Set the time the commands take.
+
+    :param default: The time in seconds of every command.
+    :type default: float
+    :param commands: The time in seconds of some commands. (eg: file=0.05)
+    """
+
+    global DEFAULT_LATENCY
+
+    DEFAULT_LATENCY = default
+    LATENCY.clear()
+    LATENCY.update(commands)
+
+
+def reset():
+    """Start a new scene and forget the calls."""
+
+    global SCENE
+
+    SCENE = Scene()
+    CALLS.clear()
+
+
+def install(latency=0.0, **commands):
+    """Make the fake maya importable as maya.
+
+    :param latency: The time in seconds of every command.
+    :type latency: float
+    :param commands: The time in seconds of some commands. (eg: file=0.05)
+    """
+
+    directory = os.path.dirname(os.path.abspath(__file__))
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    set_latency(latency, **commands)
@@ -0,0 +1 @@
+"""The fake maya package, importable once fake_maya.install() is called."""
@@ -0,0 +1,449 @@
+"""The maya commands used by the pipeline, on the fake maya scene."""
+
+import functools
+import os
+
+import fake_maya
+
+
+def command(function):
+    """Decorate a command to count its calls and wait its latency.
+
+    :param function: The command.
+    :type function: callable
+
+    :return: The decorated command.
+    :rtype: callable
+    """
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        fake_maya.call(function.__name__)
+        return function(*args, **kwargs)
+
+    return wrapper
+
+
+def _names(objects):
+    """Get the node names of the arguments of a command.
+
+    :param objects: The arguments, names or lists of names.
+    :type objects: tuple
+
+    :return: The node names.
+    :rtype: list
+    """
+
+    names = list()
+    for item in objects:
+        if item is None:
+            continue
+        if isinstance(item, str):
+            names.append(item)
+        else:
+            names.extend(item)
+    return names
+
+
+# files
+
+
+@command
+def file(path=None, **flags):
+    """Create, open, save, import, reference and export the scenes."""
+
+    scene = fake_maya.SCENE
+    query = flags.get("q") or flags.get("query")
+
+    if query:
+        if flags.get("sceneName") or flags.get("sn"):
+            return scene.path
+        if flags.get("modified"):
+            return scene.modified
+        raise TypeError("Unsupported file query: {}".format(sorted(flags)))
+
+    if flags.get("new"):
+        fake_maya.SCENE = fake_maya.Scene()
+        return None
+
+    if "rename" in flags:
+        scene.path = flags["rename"]
+        return scene.path
+
+    if flags.get("save"):
+        if not scene.path:
+            raise RuntimeError("The scene has no name")
+        scene.write(scene.path)
+        scene.modified = False
+        return scene.path
+
+    if flags.get("open") or flags.get("o"):
+        opened = fake_maya.Scene()
+        opened.read(path)
+        opened.path = path
+        opened.modified = False
+        fake_maya.SCENE = opened
+        return path
+
+    if flags.get("i") or flags.get("import"):
+        scene.read(path)
+        return path
+
+    if flags.get("reference") or flags.get("r"):
+        # a new namespace, numbered if it is already used
+        namespace = flags.get("namespace")
+        if not namespace:
+            namespace = os.path.splitext(os.path.basename(path))[0]
+        used = {name.partition(":")[0] for name in scene.nodes if ":" in name}
+        name, index = namespace, 1
+        while name in used:
+            name = "{}{}".format(namespace, index)
+            index += 1
+        scene.read(path, name + ":")
+        return path
+
+    if flags.get("exportSelected") or flags.get("es"):
+        scene.write(path, list(scene.selection))
+        return path
+
+    raise TypeError("Unsupported file flags: {}".format(sorted(flags)))
+
+
+@command
+def Import():
+    """Open the import dialog, nothing to do without a UI."""
+
+    pass
+
+
+@command
+def workspace(**flags):
+    """Query the maya project folder."""
+
+    if flags.get("q") and flags.get("rootDirectory"):
+        return fake_maya.SCENE.workspace.replace("\\", "/") + "/"
+    raise TypeError("Unsupported workspace flags: {}".format(sorted(flags)))
+
+
+# nodes
+
+
+@command
+def createNode(type, name=None, parent=None, **flags):
+    """Create a node of any type."""
+
+    return fake_maya.SCENE.create(name or type + "1", type, parent).name
+
+
+@command
+def group(*objects, **flags):
+    """Group nodes under a new transform, or create an empty one."""
+
+    scene = fake_maya.SCENE
+    names = _names(objects)
+    if not names and not flags.get("empty") and not flags.get("em"):
+        names = list(scene.selection)
+
+    parent = flags.get("parent") or flags.get("p")
+    node = scene.create(flags.get("name") or flags.get("n") or "group1", parent=parent)
+    for name in names:
+        scene.get(name).parent = node.name
+    return node.name
+
+
+@command
+def polyCube(name="pCube1", **flags):
+    """Create a cube transform and its mesh shape."""
+
+    scene = fake_maya.SCENE
+    transform = scene.create(name)
+    shape = scene.create(transform.name + "Shape", "mesh", transform.name)
+    return [transform.name, shape.name]
+
+
+@command
+def joint(name="joint1", parent=None, **flags):
+    """Create a joint."""
+
+    return fake_maya.SCENE.create(name, "joint", parent).name
+
+
+@command
+def parent(*objects, **flags):
+    """Parent the nodes under the last one, or to the world."""
+
+    scene = fake_maya.SCENE
+    names = _names(objects)
+    if flags.get("world") or flags.get("w"):
+        parent_name = None
+    else:
+        parent_name = scene.get(names.pop()).name
+    for name in names:
+        scene.get(name).parent = parent_name
+    scene.modified = True
+    return names
+
+
+@command
+def blendShape(*objects, name="blendShape1", **flags):
+    """Create a blend shape deforming the nodes."""
+
+    scene = fake_maya.SCENE
+    deformer = scene.create(name, "blendShape")
+    for target in _names(objects):
+        scene.get(target).history.append(deformer.name)
+    return [deformer.name]
+
+
+@command
+def delete(*objects, **flags):
+    """Delete the nodes and their descendants."""
+
+    for name in _names(objects):
+        fake_maya.SCENE.delete(name)
+
+
+@command
+def objExists(name):
+    """Get if a node exists."""
+
+    return fake_maya.Scene.resolve(name) in fake_maya.SCENE.nodes
+
+
+@command
+def objectType(name, isType=None, **flags):
+    """Get the type of a node, or check it."""
+
+    node_type = fake_maya.SCENE.get(name).type
+    if isType is not None:
+        return node_type == isType
+    return node_type
+
+
+@command
+def ls(*patterns, **flags):
+    """List the nodes matching the patterns, or the selected ones."""
+
+    scene = fake_maya.SCENE
+    if flags.get("sl") or flags.get("selection"):
+        names = list(scene.selection)
+    elif patterns:
+        names = list()
+        for pattern in _names(patterns):
+            names.extend(name for name in scene.match(pattern) if name not in names)
+    else:
+        names = list(scene.nodes)
+
+    node_type = flags.get("type")
+    if node_type is not None:
+        names = [name for name in names if scene.nodes[name].type == node_type]
+    return names
+
+
+@command
+def listRelatives(*objects, **flags):
+    """List the parent, children or descendants of the nodes."""
+
+    scene = fake_maya.SCENE
+    nodes = list()
+    for name in _names(objects) or scene.selection:
+        node = scene.get(name)
+        if flags.get("parent") or flags.get("p"):
+            if node.parent is not None:
+                nodes.append(scene.get(node.parent))
+        elif flags.get("allDescendents") or flags.get("ad"):
+            nodes.extend(scene.descendants(node.name))
+        else:
+            nodes.extend(scene.children(node.name))
+
+    node_type = flags.get("type")
+    names = [node.name for node in nodes if node_type in (None, node.type)]
+
+    # maya returns none instead of an empty list
+    return names or None
+
+
+@command
+def listHistory(*objects, **flags):
+    """List the nodes and their deformers."""
+
+    scene = fake_maya.SCENE
+    history = list()
+    for name in _names(objects) or scene.selection:
+        node = scene.get(name)
+        history.append(node.name)
+        history.extend(node.history)
+    return history
+
+
+@command
+def select(*objects, **flags):
+    """Select, add to the selection or clear it."""
+
+    scene = fake_maya.SCENE
+    if flags.get("clear") or flags.get("cl"):
+        scene.selection = list()
+        return
+
+    names = [scene.get(name).name for name in _names(objects)]
+    if flags.get("add"):
+        scene.selection.extend(name for name in names if name not in scene.selection)
+    else:
+        scene.selection = names
+
+
+# attributes
+
+
+@command
+def addAttr(*objects, **flags):
+    """Add an attribute to the nodes."""
+
+    name = flags.get("longName") or flags.get("ln")
+    data_type = flags.get("dataType") or flags.get("dt")
+    attribute_type = flags.get("attributeType") or flags.get("at")
+    default = {"bool": False, "short": 0, "long": 0, "double": 0.0}.get(
+        attribute_type, flags.get("defaultValue")
+    )
+
+    for node_name in _names(objects) or fake_maya.SCENE.selection:
+        node = fake_maya.SCENE.get(node_name)
+        if name in node.attributes:
+            raise RuntimeError("Found an attribute already named " + name)
+        node.attributes[name] = {
+            "value": default,
+            "type": data_type or attribute_type,
+            "locked": False,
+        }
+    fake_maya.SCENE.modified = True
+
+
+@command
+def getAttr(plug, **flags):
+    """Get an attribute value or lock state."""
+
+    attribute, index = fake_maya.SCENE.get_attribute(plug)
+    if flags.get("lock") or flags.get("l"):
+        return attribute["locked"]
+
+    value = attribute["value"]
+    if index is not None:
+        return value[index]
+    # maya returns the vectors in a list of tuples
+    if isinstance(value, list):
+        return [tuple(value)]
+    return value
+
+
+@command
+def setAttr(plug, *values, **flags):
+    """Set an attribute value or lock state."""
+
+    attribute, index = fake_maya.SCENE.get_attribute(plug)
+    fake_maya.SCENE.modified = True
+
+    lock = flags.get("lock", flags.get("l"))
+    if lock is not None:
+        attribute["locked"] = bool(lock)
+    if not values:
+        return
+
+    if attribute["locked"]:
+        raise RuntimeError("The attribute '{}' is locked".format(plug))
+
+    if flags.get("type") == "string":
+        value = values[0]
+        # the python 2 maya got lists out of map, and stored their repr
+        if value is not None and not isinstance(value, str):
+            value = str(list(value))
+    elif len(values) > 1:
+        value = [float(value) for value in values]
+    else:
+        value = values[0]
+
+    if index is not None:
+        attribute["value"][index] = value
+    else:
+        attribute["value"] = value
+
+
+@command
+def connectAttr(source, destination, **flags):
+    """Connect two attributes."""
+
+    scene = fake_maya.SCENE
+    scene.get_attribute(source)
+    scene.get_attribute(destination)
+    scene.connections[destination] = source
+    scene.modified = True
+
+
+@command
+def disconnectAttr(source, destination, **flags):
+    """Disconnect two attributes."""
+
+    scene = fake_maya.SCENE
+    if scene.connections.get(destination) != source:
+        raise RuntimeError("{} is not connected to {}".format(source, destination))
+    del scene.connections[destination]
+    scene.modified = True
+
+
+@command
+def listConnections(plug, **flags):
+    """List the plugs connected to an attribute."""
+
+    scene = fake_maya.SCENE
+    node_type = flags.get("type")
+    plugs = flags.get("plugs") or flags.get("p")
+
+    connected = list()
+    for destination, source in scene.connections.items():
+        if flags.get("destination", True) and source == plug:
+            connected.append(destination)
+        if flags.get("source", True) and destination == plug:
+            connected.append(source)
+
+    connected = [
+        connection
+        for connection in connected
+        if node_type is None
+        or scene.get(connection.partition(".")[0]).type == node_type
+    ]
+    if not plugs:
+        connected = [connection.partition(".")[0] for connection in connected]
+    return connected or None
+
+
+# animation
+
+
+@command
+def playbackOptions(**flags):
+    """Query or set the time range."""
+
+    playback = fake_maya.SCENE.playback
+    if flags.get("q") or flags.get("query"):
+        for key in ("min", "max"):
+            if flags.get(key):
+                return playback[key]
+        raise TypeError("Unsupported playbackOptions query: {}".format(sorted(flags)))
+
+    for key in ("min", "max"):
+        if key in flags:
+            playback[key] = float(flags[key])
+
+
+@command
+def bakeResults(*objects, **flags):
+    """Bake the animation of the nodes, a key by frame."""
+
+    scene = fake_maya.SCENE
+    start, end = flags.get("time", (scene.playback["min"], scene.playback["max"]))
+    step = flags.get("sampleBy", 1)
+
+    # a key by baked frame on every object
+    for name in _names(objects):
+        scene.baked[scene.get(name).name] = int((end - start) / step) + 1
+    scene.modified = True
+    return len(scene.baked)
@@ -0,0 +1,29 @@
+"""The mel commands used by the pipeline, on the fake maya options."""
+
+import fake_maya
+
+# the fbx export options by mel command
+FBX_OPTIONS = {"FBXExportIncludeChildren": True, "FBXExportInputConnections": True}
+
+
+def eval(command):
+    """Run the FBX export options commands, the other ones do nothing.
+
+    :param command: The mel command. (eg: "FBXExportIncludeChildren -v false")
+    :type command: str
+
+    :return: The option value if queried, else none.
+    :rtype: bool, none
+    """
+
+    fake_maya.call("mel.eval")
+
+    words = command.replace(";", " ").split()
+    if not words or words[0] not in FBX_OPTIONS:
+        return None
+
+    if "-q" in words:
+        return FBX_OPTIONS[words[0]]
+    if "-v" in words:
+        FBX_OPTIONS[words[0]] = words[words.index("-v") + 1] == "true"
+    return None
@@ -0,0 +1,127 @@
+"""Benchmark the workspace fingerprint on a synthetic tree.
+
+Usage : python fingerprint_benchmark.py [--files 1000000] [--directory path]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from pipeline.api.storage import fingerprint
+
+# the number of files in every synthetic folder
+FILES_PER_FOLDER = 100
+
+
+def generate(root, count):
+    """Create a synthetic tree of empty files.
+
+    :param root: The complete path to the directory to create the tree in.
+    :type root: str
+    :param count: The number of files to create.
+    :type count: int
+
+    :return: The complete paths to the folders created.
+    :rtype: list
+    """
+
+    folders = list()
+    for index in range(0, count, FILES_PER_FOLDER):
+        folder = index // FILES_PER_FOLDER
+        directory = os.path.join(
+            root,
+            "type{}".format(folder // 100 // 100),
+            "asset{}".format(folder // 100),
+            "task{}".format(folder % 100),
+        )
+        os.makedirs(directory)
+        for file in range(min(FILES_PER_FOLDER, count - index)):
+            open(os.path.join(directory, "file{}.ma".format(file)), "wb").close()
+        folders.append(directory)
+
+    return folders
+
+
+def timed(label, function, *args):
+    """Call a function and print the time it took.
+
+    :param label: The name to print.
+    :type label: str
+    :param function: The function to call.
+    :type function: callable
+
+    :return: The function result.
+    :rtype: object
+    """
+
+    start = time.perf_counter()
+    result = function(*args)
+    print("{:<32} {:.3f} s".format(label, time.perf_counter() - start))
+    return result
+
+
+def main():
+    """Run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=1000000)
+    parser.add_argument("--directory", default=None)
+    arguments = parser.parse_args()
+
+    root = tempfile.mkdtemp(dir=arguments.directory)
+    data = tempfile.mkdtemp(dir=arguments.directory)
+    try:
+        folders = timed(
+            "generate {} files".format(arguments.files),
+            generate,
+            root,
+            arguments.files,
+        )
+        old = timed("snapshot", fingerprint.snapshot, root)
+
+        # keep the snapshot out of the tree, it would change it
+        path = os.path.join(data, "snapshot.json")
+        timed("save", fingerprint.save, old, path)
+        timed("load", fingerprint.load, path)
+
+        new = timed("snapshot unchanged", fingerprint.snapshot, root)
+        changed = timed("diff unchanged", lambda: list(fingerprint.diff(old, new)))
+        assert not changed
+
+        # the previous snapshot is only trusted after the racy window
+        time.sleep(fingerprint.RACY_WINDOW / 10**9)
+        old = fingerprint.snapshot(root)
+        time.sleep(fingerprint.RACY_WINDOW / 10**9)
+        new = timed(
+            "snapshot unchanged, reused",
+            lambda: fingerprint.snapshot(root, previous=old),
+        )
+        assert new["hash"] == old["hash"]
+
+        # replace a single file deep in the tree, like the pipeline writes
+        directory = folders[len(folders) // 2]
+        with open(os.path.join(directory, "file0.ma.tmp"), "wb") as file:
+            file.write(b"changed")
+        os.replace(
+            os.path.join(directory, "file0.ma.tmp"),
+            os.path.join(directory, "file0.ma"),
+        )
+        new = timed("snapshot one change", fingerprint.snapshot, root)
+        changed = timed("diff one change", lambda: list(fingerprint.diff(old, new)))
+        assert len(changed) == 1, changed
+
+        new = timed(
+            "snapshot one change, reused",
+            lambda: fingerprint.snapshot(root, previous=old),
+        )
+        changed = list(fingerprint.diff(old, new))
+        assert len(changed) == 1, changed
+    finally:
+        shutil.rmtree(root)
+        shutil.rmtree(data)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""Time the hot paths of the pipeline on a synthetic workspace.
+
+The results are written in json, compare them to the results of an other run
+to catch the regressions : the command fails if a hot path got slower.
+
+Usage : python hot_paths_benchmark.py [--output results.json]
+    [--compare previous.json] [--types 3] [--assets 20] [--versions 5]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import workspace_generator
+
+# the median ratio to the compared results above which a hot path regressed
+THRESHOLD = 1.2
+
+
+def measure(function, repeat):
+    """Call a function several times, silently.
+
+    :param function: The function to call.
+    :type function: callable
+    :param repeat: The number of calls.
+    :type repeat: int
+
+    :return: The duration of every call in seconds.
+    :rtype: list
+    """
+
+    durations = list()
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            function()
+            durations.append(time.perf_counter() - start)
+
+    return durations
+
+
+def get_hot_paths(tasks):
+    """Get the hot paths to time on the generated workspace.
+
+    :param tasks: The names of the WIP files by complete path to their task folder.
+    :type tasks: dict
+
+    :return: The functions to time by name, in order.
+    :rtype: list
+    """
+
+    # the pipeline is imported once the data folder is set by the generator
+    from pipeline.api.assets import assets, catalog
+    from pipeline.api.checks import git
+    from pipeline.api.maya_api import exports, studient_warning
+
+    asset = assets.Assets()
+    names = [name for task_names in tasks.values() for name in task_names]
+    asset_types = sorted(asset.db.app_data["assets"])
+
+    def list_assets(validate):
+        # the assets list lists every type, with every task filter
+        workspace_catalog = catalog.get_catalog()
+        for asset_type in asset_types:
+            for task in ["all"] + asset.db.app_data["assets"][asset_type]["tasks"]:
+                workspace_catalog.list_assets(asset_type, task, validate=validate)
+
+    def list_assets_cold():
+        catalog._CATALOGS.clear()
+        list_assets(True)
+
+    def get_latest_files():
+        for directory in tasks:
+            asset.get_latest_file(directory, ".ma")
+
+    def get_informations():
+        for name in names:
+            asset.get_informations_from_name(name)
+
+    def populate_recents():
+        # what the recent menu does when shown
+        # the paths are built with backslashes, only windows would find the files
+        prefs = asset.db.prefs
+        for file in prefs.get("recents", list()):
+            path = os.path.join(asset.get_path_from_name(file), file)
+            os.path.exists(path.replace("\\", os.sep))
+        asset.db.prefs = prefs
+
+    def copy_defs():
+        for directory, task_names in tasks.items():
+            def_directory = os.path.join(os.path.dirname(directory), "DEF")
+            exports._copy_def(
+                os.path.join(directory, task_names[-1]),
+                def_directory,
+                "_".join(task_names[-1].split("_")[:2]),
+            )
+
+    return [
+        ("assets list cold", list_assets_cold),
+        ("assets list", lambda: list_assets(True)),
+        ("assets list unvalidated", lambda: list_assets(False)),
+        ("get_latest_file", get_latest_files),
+        ("get_informations_from_name", get_informations),
+        ("recents", populate_recents),
+        ("update_gitignore", git.update_gitignore),
+        ("ignore_oversized_files", git.ignore_oversized_files),
+        ("studient warnings", lambda: studient_warning.remove_from_all_files(["DEF"])),
+        ("DEF copies", copy_defs),
+    ]
+
+
+def compare(results, previous, threshold=THRESHOLD):
+    """Print the ratio of the results to the previous ones.
+
+    :param results: The results of this run.
+    :type results: dict
+    :param previous: The results to compare to.
+    :type previous: dict
+    :param threshold: The median ratio above which a hot path regressed.
+    :type threshold: float
+
+    :return: The names of the hot paths that regressed.
+    :rtype: list
+    """
+
+    if previous["parameters"] != results["parameters"]:
+        print("The workspaces differ, the comparison may not be relevant")
+
+    regressions = list()
+    for name, result in results["results"].items():
+        old = previous["results"].get(name)
+        if old is None:
+            continue
+
+        ratio = result["median"] / old["median"] if old["median"] else 1
+        regressed = ratio > threshold
+        if regressed:
+            regressions.append(name)
+        print(
+            "{:<32} {:.3f} s -> {:.3f} s  x{:.2f}{}".format(
+                name,
+                old["median"],
+                result["median"],
+                ratio,
+                "  REGRESSION" if regressed else "",
+            )
+        )
+
+    return regressions
+
+
+def main():
+    """Run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--types", type=int, default=3)
+    parser.add_argument("--assets", type=int, default=20)
+    parser.add_argument("--versions", type=int, default=5)
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="hot_paths.json")
+    parser.add_argument("--compare", default=None)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--directory", default=None)
+    arguments = parser.parse_args()
+
+    parameters = {
+        "types": arguments.types,
+        "assets": arguments.assets,
+        "versions": arguments.versions,
+        "size": arguments.size,
+    }
+
+    output = os.path.abspath(arguments.output)
+    root = tempfile.mkdtemp(dir=arguments.directory)
+    cwd = os.getcwd()
+    try:
+        tasks = workspace_generator.generate(root, **parameters)
+
+        # the workspace is relative to the root
+        os.chdir(root)
+
+        import pipeline
+
+        results = {
+            "version": pipeline.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": parameters,
+            "results": dict(),
+        }
+        for name, function in get_hot_paths(tasks):
+            durations = measure(function, arguments.repeat)
+            results["results"][name] = {
+                "median": statistics.median(durations),
+                "min": min(durations),
+                "durations": durations,
+            }
+            print("{:<32} {:.3f} s".format(name, statistics.median(durations)))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root)
+
+    with open(output, "w") as output_file:
+        json.dump(results, output_file, indent=4)
+    print("Results -> " + output)
+
+    if arguments.compare:
+        with open(arguments.compare, "r") as previous_file:
+            previous = json.load(previous_file)
+        if compare(results, previous, arguments.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Check the api imports no Qt and measure what it saves at import.
+
+Every module of pipeline.api is imported in a fresh interpreter,
+then the same with the dialogs of the UI, when Qt is available.
+The command line is then timed from the interpreter start to the answer,
+in a synthetic workspace, and fails above cli.COLD_START_TARGET.
+
+Usage : python import_benchmark.py [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import pkgutil
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import workspace_generator
+
+import pipeline.api
+from pipeline import cli
+
+# the modules that must never be imported by the api
+QT_MODULES = ("PySide2", "shiboken2", "python_core.pyside2", "pipeline.ui")
+
+# imports the modules and prints the time, peak memory and Qt modules loaded
+SCRIPT = """
+import importlib, json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    importlib.import_module(name)
+duration = time.perf_counter() - start
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss *= 1 if sys.platform == "darwin" else 1024
+except ImportError:
+    rss = None
+qt = [name for name in sys.modules if name.startswith({qt!r})]
+print(json.dumps({{"time": duration, "rss": rss, "qt": qt}}))
+"""
+
+
+def get_api_modules():
+    """Get every module of the api.
+
+    :return: The module names.
+    :rtype: list
+    """
+
+    return ["pipeline.api"] + [
+        module.name
+        for module in pkgutil.walk_packages(pipeline.api.__path__, "pipeline.api.")
+    ]
+
+
+def measure(modules, runs):
+    """Import modules in fresh interpreters.
+
+    :param modules: The names of the modules to import.
+    :type modules: list
+    :param runs: The number of interpreters to average.
+    :type runs: int
+
+    :return: The average time, the peak memory and the Qt modules loaded.
+        None if the modules can't be imported.
+    :rtype: dict, none
+    """
+
+    script = SCRIPT.format(modules=modules, qt=QT_MODULES)
+    results = list()
+    for _ in range(runs):
+        process = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True
+        )
+        if process.returncode:
+            print(process.stderr.strip().splitlines()[-1])
+            return None
+        results.append(json.loads(process.stdout.strip().splitlines()[-1]))
+
+    rss = [result["rss"] for result in results if result["rss"] is not None]
+    return {
+        "time": sum(result["time"] for result in results) / runs,
+        "rss": max(rss) if rss else None,
+        "qt": results[0]["qt"],
+    }
+
+
+def measure_cold_start(runs):
+    """Time a command line query, from the interpreter start to the answer.
+
+    :param runs: The number of queries to take the median of.
+    :type runs: int
+
+    :return: The median duration in seconds.
+    :rtype: float
+    """
+
+    root = tempfile.mkdtemp()
+    try:
+        workspace_generator.generate(root)
+        command = [sys.executable, "-m", "pipeline", "ls", "props"]
+        # the interpreter started by the query has to find the pipeline
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+
+        durations = list()
+        for _ in range(runs):
+            start = time.perf_counter()
+            process = subprocess.run(
+                command, cwd=root, env=env, capture_output=True, text=True
+            )
+            durations.append(time.perf_counter() - start)
+            assert not process.returncode, process.stderr.strip()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    return statistics.median(durations)
+
+
+def display(label, result):
+    """Print a measure.
+
+    :param label: The name to print.
+    :type label: str
+    :param result: The measure.
+    :type result: dict
+    """
+
+    rss = "-" if result["rss"] is None else "{:.1f} MB".format(result["rss"] / 1e6)
+    print("{:<32} {:.3f} s {:>10}".format(label, result["time"], rss))
+
+
+def main():
+    """Run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    arguments = parser.parse_args()
+
+    modules = get_api_modules()
+    headless = measure(modules, arguments.runs)
+    assert headless is not None, "The api can't be imported"
+    assert not headless["qt"], "The api imports Qt : {}".format(headless["qt"])
+    display("api ({} modules)".format(len(modules)), headless)
+
+    cold_start = measure_cold_start(arguments.runs)
+    print("{:<32} {:.3f} s".format("python -m pipeline ls", cold_start))
+    assert cold_start <= cli.COLD_START_TARGET, (
+        "The command line takes {:.3f} s, more than the {} s target".format(
+            cold_start, cli.COLD_START_TARGET
+        )
+    )
+
+    with_ui = measure(modules + ["pipeline.ui.dialogs.popups"], arguments.runs)
+    if with_ui is None:
+        print("Qt isn't available, nothing to compare to")
+        return
+    display("api + dialogs", with_ui)
+
+    print("{:<32} {:.3f} s".format("saved", with_ui["time"] - headless["time"]))
+    if headless["rss"] is not None:
+        print(
+            "{:<32} {:.1f} MB".format(
+                "saved", (with_ui["rss"] - headless["rss"]) / 1e6
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
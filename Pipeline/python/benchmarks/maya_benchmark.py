@@ -0,0 +1,232 @@
+"""Count the maya calls of the maya api operations and time them, without maya.
+
+The operations run on the fake maya, in a synthetic workspace, from the creation
+of a prop modeling scene to the publish of an animation referencing its rig.
+Every maya command can be given a latency to see what the calls cost in maya.
+
+Usage : python maya_benchmark.py [--latency 0.001] [--file-latency 0.05]
+    [--meshes 50] [--joints 30] [--references 3] [--output maya.json]
+"""
+
+import argparse
+import collections
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import fake_maya
+import workspace_generator
+
+# the assets the operations work on
+PROP = "pr_asset0000"
+SHOT = "sh_asset0000"
+
+
+def get_operations(meshes, joints, references):
+    """Get the operations to run in order, each one needing the previous ones.
+
+    :param meshes: The number of meshes of the modeling.
+    :type meshes: int
+    :param joints: The number of joints of the rig.
+    :type joints: int
+    :param references: The number of times the rig is referenced in the shot.
+    :type references: int
+
+    :return: The name, setup and operation of every step.
+        The setup is done before the calls are counted.
+    :rtype: list
+    """
+
+    # the pipeline is imported once the data folder is set by the generator
+    from maya import cmds
+
+    from pipeline.api.maya_api import creation, exports, maya_asset
+    from pipeline.api.maya_api.tools import animation, rig
+
+    asset = maya_asset.MayaAsset()
+
+    def create_scene(name):
+        # the task folder is created by the UI before the scene
+        asset.create_directories(asset.get_path_from_name(name))
+        return lambda: creation.create_maya_scenes(name)
+
+    def model():
+        for index in range(meshes):
+            cmds.parent(cmds.polyCube(name="mesh{}".format(index))[0], "GEO")
+
+    def skeleton():
+        parent = "RIG"
+        for index in range(joints):
+            parent = cmds.joint(name="joint{}".format(index), parent=parent)
+        cmds.select(cmds.ls(type="joint"))
+
+    def animate():
+        cmds.playbackOptions(min=1, max=100)
+
+    operations = [
+        ("create modeling", None, create_scene(PROP + "_mod_000.ma")),
+        ("export modeling", model, exports.export),
+        ("save def", None, exports.save_def),
+        ("publish modeling", None, exports.publish),
+        ("create rig", None, create_scene(PROP + "_rig_000.ma")),
+        ("set joints to export", skeleton, rig.set_joints_to_export),
+        ("export rig", None, exports.export),
+        ("publish rig", None, exports.publish),
+        ("create animation", None, create_scene(SHOT + "_anim_000.ma")),
+        (
+            "import references",
+            None,
+            lambda: animation.import_reference(PROP, references),
+        ),
+        ("publish animation", animate, exports.publish),
+    ]
+
+    # the incremented scene paths are only valid on windows
+    if os.name == "nt":
+        operations.append(
+            ("increment save", None, lambda: creation.increment_save("bench"))
+        )
+
+    return operations
+
+
+def run(root, meshes, joints, references):
+    """Run the operations in a new workspace.
+
+    :param root: The complete path to the directory to create the workspace in,
+        emptied before.
+    :type root: str
+    :param meshes: The number of meshes of the modeling.
+    :type meshes: int
+    :param joints: The number of joints of the rig.
+    :type joints: int
+    :param references: The number of times the rig is referenced in the shot.
+    :type references: int
+
+    :return: The duration, the maya calls by command and the error of every step.
+    :rtype: collections.OrderedDict
+    """
+
+    # the pipeline keeps the data folder it was imported with, so start over in it
+    shutil.rmtree(root, ignore_errors=True)
+    workspace_generator.generate(root, assets=0)
+    os.chdir(root)
+    fake_maya.reset()
+
+    results = collections.OrderedDict()
+    for name, setup, operation in get_operations(meshes, joints, references):
+        result = {"duration": None, "calls": dict(), "error": None}
+        results[name] = result
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                if setup is not None:
+                    setup()
+                fake_maya.CALLS.clear()
+                start = time.perf_counter()
+                operation()
+                result["duration"] = time.perf_counter() - start
+            except Exception as error:
+                result["error"] = "{}: {}".format(type(error).__name__, error)
+
+        result["calls"] = dict(fake_maya.CALLS.most_common())
+
+        # the next operations need this one
+        if result["error"]:
+            break
+
+    return results
+
+
+def main():
+    """Run the benchmark."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--file-latency", type=float, default=None)
+    parser.add_argument("--meshes", type=int, default=50)
+    parser.add_argument("--joints", type=int, default=30)
+    parser.add_argument("--references", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="maya.json")
+    parser.add_argument("--directory", default=None)
+    arguments = parser.parse_args()
+
+    latencies = dict()
+    if arguments.file_latency is not None:
+        latencies["file"] = arguments.file_latency
+    fake_maya.install(arguments.latency, **latencies)
+
+    output = os.path.abspath(arguments.output)
+    cwd = os.getcwd()
+    root = tempfile.mkdtemp(dir=arguments.directory)
+    runs = list()
+    try:
+        for _ in range(arguments.repeat):
+            runs.append(
+                run(root, arguments.meshes, arguments.joints, arguments.references)
+            )
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root, ignore_errors=True)
+
+    import pipeline
+
+    results = {
+        "version": pipeline.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "meshes": arguments.meshes,
+            "joints": arguments.joints,
+            "references": arguments.references,
+            "latency": arguments.latency,
+            "file_latency": arguments.file_latency,
+        },
+        "results": dict(),
+    }
+    for name, result in runs[0].items():
+        durations = [
+            run[name]["duration"]
+            for run in runs
+            if run.get(name, {}).get("duration") is not None
+        ]
+        results["results"][name] = {
+            "median": statistics.median(durations) if durations else None,
+            "calls": result["calls"],
+            "total_calls": sum(result["calls"].values()),
+            "error": result["error"],
+        }
+
+        if result["error"]:
+            print("{:<24} {}".format(name, result["error"]))
+            continue
+        print(
+            "{:<24} {:.3f} s {:>6} calls  {}".format(
+                name,
+                results["results"][name]["median"],
+                results["results"][name]["total_calls"],
+                ", ".join(
+                    "{} {}".format(command, count)
+                    for command, count in list(result["calls"].items())[:4]
+                ),
+            )
+        )
+
+    with open(output, "w") as output_file:
+        json.dump(results, output_file, indent=4)
+    print("Results -> " + output)
+
+    if any(result["error"] for result in results["results"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
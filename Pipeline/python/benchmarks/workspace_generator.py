@@ -0,0 +1,201 @@
+"""Generate a synthetic workspace with its data folder to benchmark the pipeline.
+
+The workspace has every asset type of the default appData.json, duplicated
+to reach the number of types asked, with their assets, tasks and versions :
+
+    root/
+        data/appData.json, prefs.json
+        workspace/assets/props/pr_asset0000/modeling/WIP/pr_asset0000_mod_001_wip.ma
+                                                    /DEF/pr_asset0000_mod_005_wip.ma
+
+The prefs point to the workspace relatively to the root, the pipeline must be
+used from the root. The paths it builds have backslash separators : they only
+resolve on windows, the benchmarks replace them by os.sep to check the files.
+
+Usage : python workspace_generator.py root [--types 3] [--assets 20] [--versions 5]
+"""
+
+import argparse
+import os
+import random
+import time
+
+from pipeline.utils import database, properties
+
+# the folder of the workspace in the root, the workspace path in the prefs
+WORKSPACE = "workspace"
+
+# the header maya writes on top of the .ma files, saved with a student license
+HEADER = """//Maya ASCII 2022 scene
+//Name: {name}
+//Last modified: {date}
+//Codeset: 1252
+requires maya "2022";
+currentUnit -l centimeter -a degree -t film;
+fileInfo "application" "maya";
+fileInfo "product" "Maya 2022";
+fileInfo "version" "2022";
+fileInfo "cutIdentifier" "202102181415-29bfc1879c";
+fileInfo "osv" "Windows 10 Pro v2009 (Build: 19042)";
+fileInfo "license" "student";
+"""
+
+# the nodes filling the scene up to its size
+NODE = """createNode transform -n "{name}{index}" -p "{parent}";
+\tsetAttr ".t" -type "double3" {index} 0 0 ;
+createNode mesh -n "{name}Shape{index}" -p "{name}{index}";
+\tsetAttr -k off ".v";
+\tsetAttr ".vir" yes;
+"""
+
+
+def get_scene(name, size):
+    """Get the content of a .ma scene.
+
+    :param name: The file name.
+    :type name: str
+    :param size: The approximate size of the scene in bytes.
+    :type size: int
+
+    :return: The scene content.
+    :rtype: bytes
+    """
+
+    lines = [HEADER.format(name=name, date=time.ctime())]
+    lines.append('createNode transform -n "{}";\n'.format(name.split("_")[2].upper()))
+
+    length = sum(len(line) for line in lines)
+    index = 0
+    while length < size:
+        node = NODE.format(name="node", index=index, parent="GEO")
+        lines.append(node)
+        length += len(node)
+        index += 1
+
+    return "".join(lines).encode()
+
+
+def get_app_data(types):
+    """Get the default app data with more asset types.
+
+    :param types: The number of asset types.
+    :type types: int
+
+    :return: The app data.
+    :rtype: dict
+    """
+
+    db = database.Database()
+    db.set_default_app_data()
+    app_data = db.app_data
+
+    # duplicate the default asset types
+    defaults = sorted(app_data["assets"].items())
+    for index in range(len(defaults), types):
+        asset_type, data = defaults[index % len(defaults)]
+        app_data["assets"]["{}{}".format(asset_type, index)] = dict(
+            data,
+            prefix="{}{}".format(data["prefix"], index),
+            path="{}{}".format(data["path"], index),
+        )
+    for asset_type, _ in defaults[types:]:
+        del app_data["assets"][asset_type]
+
+    return app_data
+
+
+def generate(root, types=3, assets=20, versions=5, size=50000, seed=0):
+    """Create a synthetic workspace and its data folder.
+
+    The PIPELINE_DATA_PATH environment variable is set to the data folder,
+    the pipeline must be used from the root to find the workspace.
+
+    :param root: The complete path to the directory to create everything in.
+    :type root: str
+    :param types: The number of asset types.
+    :type types: int
+    :param assets: The number of assets of every type.
+    :type assets: int
+    :param versions: The number of WIP versions of every task.
+    :type versions: int
+    :param size: The average size of the scenes in bytes.
+    :type size: int
+    :param seed: The seed of the scene sizes, to generate the same workspace.
+    :type seed: int
+
+    :return: The names of the WIP files by complete path to their task folder.
+    :rtype: dict
+    """
+
+    randomizer = random.Random(seed)
+
+    data = os.path.join(root, "data")
+    os.makedirs(data, exist_ok=True)
+    os.environ[properties.DATA_PATH_VARIABLE] = data
+
+    app_data = get_app_data(types)
+    database.Database().app_data = app_data
+
+    tasks = dict()
+    for asset_type, type_data in sorted(app_data["assets"].items()):
+        directory = os.path.join(root, WORKSPACE, *type_data["path"].split("\\"))
+        for asset in range(assets):
+            asset_name = "{}_asset{:04d}".format(type_data["prefix"], asset)
+            for task in type_data["tasks"]:
+                suffix = app_data["tasks"][task]["suffix"]
+                task_directory = os.path.join(directory, asset_name, task)
+
+                # the WIP increments, the latest one saved as DEF
+                names = [
+                    "_".join([asset_name, suffix, str(version).zfill(3), "wip.ma"])
+                    for version in range(1, versions + 1)
+                ]
+                for folder, folder_names in (("WIP", names), ("DEF", names[-1:])):
+                    os.makedirs(os.path.join(task_directory, folder))
+                    for name in folder_names:
+                        scene_size = int(size * randomizer.uniform(0.5, 1.5))
+                        scene = get_scene(name, scene_size)
+                        path = os.path.join(task_directory, folder, name)
+                        with open(path, "wb") as scene_file:
+                            scene_file.write(scene)
+
+                tasks[os.path.join(task_directory, "WIP")] = names
+
+    # the latest files opened
+    recents = [names[-1] for names in list(tasks.values())[-10:]]
+    database.Database().prefs = {"workspace": WORKSPACE, "recents": recents}
+
+    return tasks
+
+
+def main():
+    """Generate a workspace."""
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("root")
+    parser.add_argument("--types", type=int, default=3)
+    parser.add_argument("--assets", type=int, default=20)
+    parser.add_argument("--versions", type=int, default=5)
+    parser.add_argument("--size", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    tasks = generate(
+        arguments.root,
+        arguments.types,
+        arguments.assets,
+        arguments.versions,
+        arguments.size,
+        arguments.seed,
+    )
+    print(
+        "{} tasks generated, set {} to {} to use them".format(
+            len(tasks),
+            properties.DATA_PATH_VARIABLE,
+            os.path.join(arguments.root, "data"),
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
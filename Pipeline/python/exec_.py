@@ -1,25 +1,36 @@
 """Execute the script from the computer."""
 
-from PySide2.QtWidgets import QApplication
-from python_core.pyside2.config import config
+from pipeline.utils import startup
 
-from pipeline.ui import main, theme
-from pipeline.utils import database
+# the imports of the ui are profiled too
+with startup.phase("imports"):
+    from PySide2.QtCore import QTimer
+    from PySide2.QtWidgets import QApplication
+    from python_core.pyside2.config import config
+
+    from pipeline.ui import main, theme
+    from pipeline.utils import database
 
 # Make sure the application runs on safe basis
-db = database.Database()
-db.start_checks()
+with startup.phase("start checks"):
+    db = database.Database()
+    db.start_checks()
 
 # display tooltips to have informations on items
 config.set("debug.show_tooltip", False)
 
 # create the window
-app = QApplication()
-theme.theme(app)
+with startup.phase("theme"):
+    app = QApplication()
+    theme.theme(app)
+
+with startup.phase("main window"):
+    window = main.Main()
+    window.window_size = (300, 600)
+    window.populate()
+    window.show()
 
-window = main.Main()
-window.window_size = (300, 600)
-window.populate()
-window.show()
+# stop profiling once the window is painted
+QTimer.singleShot(0, startup.stop)
 
 app.exec_()
@@ -18,6 +18,13 @@
         - a texture folder
 """
 
+from pipeline.utils import startup
+
+__version__ = "1.0.0"
+
+# profile the launch if the PIPELINE_PROFILE_STARTUP environment variable is set
+startup.start()
+
 # TODO :
 #   - changer liste par tree widget pour avoir les taches
 
@@ -0,0 +1,7 @@
+"""Query the assets of the workspace from the command line, see pipeline.cli."""
+
+import sys
+
+from pipeline import cli
+
+sys.exit(cli.main())
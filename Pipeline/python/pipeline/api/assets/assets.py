@@ -1,11 +1,9 @@
 """Manage the project assets."""
 
 import os
-import shutil
 
-from python_core.pyside2 import base_ui
-
-from pipeline.api.assets import paths
+from pipeline.api.assets import paths, versions
+from pipeline.utils import executor, files, interaction, tracing
 
 
 class Assets(paths.Paths):
@@ -64,6 +62,7 @@ class Assets(paths.Paths):
 
         return None
 
+    @tracing.traced("open latest")
     def open_latest(self, name):
         """Open the latest scene for this asset task name.
 
@@ -72,7 +71,7 @@ class Assets(paths.Paths):
         """
 
         from maya import cmds
-        from pipeline.ui.dialogs import popups, dialogs
+        from pipeline.api.maya_api import creation
 
         # get informations from the name
         informations = self.get_informations_from_name(name)
@@ -83,21 +82,19 @@ class Assets(paths.Paths):
         latest_file = self.get_latest_file(directory, ".ma")
 
         # if the latest file doesn't exists, try to deduce it from def
+        # copied right away, the file is opened next
         if not latest_file:
-            self.deduce_wip_from_def(name)
+            self.deduce_wip_from_def(name, wait=True)
         latest_file = self.get_latest_file(directory, ".ma")
 
         # if there is no file, ask if we want to create one
         if latest_file is None:
-            # build a dialog to ask if we want to create a new scene
-            dialog = dialogs.YesNoDialog()
-
-            # set the elements to display in the dialog
-            dialog.title = "Create {}?".format(task)
-            dialog.title_msg = task.upper()
-            dialog.msg = "No {} task found.\nStart one?".format(task)
-
-            if not dialog.exec_():
+            # ask if we want to create a new scene
+            if not interaction.confirm(
+                "No {} task found.\nStart one?".format(task),
+                title="Create {}?".format(task),
+                title_msg=task.upper(),
+            ):
                 print("# Pipeline : No {} task was created".format(task))
                 return
 
@@ -105,11 +102,12 @@ class Assets(paths.Paths):
             path = self.create(name + "_000.ma")
 
         else:
-            # get the full path to the latest file
+            # get the full path to the latest file, decompressed if it was archived
+            latest_file = self.restore_file(os.path.join(directory, latest_file))
             path = os.path.join(directory, latest_file)
 
         # save the current file before
-        popups.save_popup()
+        creation.save_changes()
 
         # open the file in maya
         cmds.file(path, open=True, force=True)
@@ -127,7 +125,7 @@ class Assets(paths.Paths):
         """
 
         from maya import cmds
-        from pipeline.ui.dialogs import popups
+        from pipeline.api.maya_api import creation
 
         # get informations from the name
         informations = self.get_informations_from_name(name)
@@ -144,32 +142,45 @@ class Assets(paths.Paths):
             return
 
         # browse to the directory to get the file to open
-        dialog = base_ui.BrowseDialog()
-        dialog.title = "Browse to file"
-
-        file = dialog.browse(directory=directory, extensions=".ma")
+        file = interaction.browse(
+            title="Browse to file",
+            directory=directory,
+            extensions=[
+                ".ma",
+                ".ma" + files.ARCHIVE_EXTENSION,
+                ".ma" + versions.DELTA_EXTENSION,
+            ],
+        )
         if file is None:
             return
 
+        # decompress the file if an archived version was selected
+        path = os.path.join(os.path.dirname(file[0]), self.restore_file(file[0]))
+
         # save before
-        popups.save_popup()
+        creation.save_changes()
 
         # open the selected file
-        cmds.file(file[0], open=True, force=True)
+        cmds.file(path, open=True, force=True)
 
         # save the opend file as a recently opend file
-        self.update_recents(os.path.basename(file[0]))
+        self.update_recents(os.path.basename(path))
 
-        print("# Pipeline : Open specific -> " + file[0])
+        print("# Pipeline : Open specific -> " + path)
 
-    def deduce_wip_from_def(self, name):
+    def deduce_wip_from_def(self, name, wait=False):
         """Copy the DEF version of the asset to the WIP folder.
 
         :param name: The asset task name to open.
         :type name: str
-        """
+        :param wait: Wether or not to copy in the current thread, not to wait
+            behind the file operations already running in background.
+        :type wait: bool
 
-        from pipeline.ui.dialogs import popups
+        :return: The job copying the file, None if nothing was copied
+            or if the copy is already over.
+        :rtype: Job, none
+        """
 
         # get the directories to copy and paste from
         source_directory = self.get_path_from_name(name, def_path=True)
@@ -181,7 +192,8 @@ class Assets(paths.Paths):
             print("# Pipeline : No DEF file found.")
             return
 
-        # deduce the source and destination files
+        # deduce the source and destination files, the DEF may be archived
+        file_name = self.restore_file(os.path.join(source_directory, file_name))
         source = os.path.join(source_directory, file_name)
         destination = os.path.join(destination_directory, file_name)
 
@@ -191,7 +203,7 @@ class Assets(paths.Paths):
 
         # copy the DEF file
         if os.path.exists(destination):
-            if not popups.confirm(
+            if not interaction.confirm(
                 "A WIP file already exists with the name "
                 + file_name
                 + "\nDo you want to replace it?"
@@ -199,8 +211,17 @@ class Assets(paths.Paths):
                 print("# Pipeline : Deduce WIP from DEF aborted.")
                 return
 
-        shutil.copy2(source, destination)
-        print('# Pipeline : DEF file "{}" set as WIP.'.format(file_name))
+        def done(path):
+            print('# Pipeline : DEF file "{}" set as WIP.'.format(file_name))
+
+        if wait:
+            done(files.copy_file(source, destination))
+            return None
+
+        # copy the file in background
+        return executor.submit(
+            "Deduce WIP from DEF", files.copy_file, source, destination, callback=done
+        )
 
     # data management
 
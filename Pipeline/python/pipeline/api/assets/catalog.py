@@ -0,0 +1,293 @@
+"""List the assets of the workspace, whatever their folder layout.
+
+The listings of the folders are cached with their modification time,
+so listing the assets again only stats the folders that didn't change.
+A catalog is kept in memory for each of the latest workspaces used,
+so switching back to one of them doesn't list everything again.
+"""
+
+import collections
+import os
+import threading
+import time
+
+from pipeline.api.assets import sharding
+from pipeline.utils import database, metrics
+
+# the number of workspaces whose catalog is kept in memory
+MAX_WORKSPACES = 3
+
+LISTINGS = metrics.counter(
+    "catalog_listings_total", "The folder listings, by cache result."
+)
+JSON_READS_AVOIDED = metrics.counter(
+    "database_json_reads_avoided_total", "The json files read from memory instead."
+)
+
+# a folder modified less than this many seconds ago may still change
+# within the same modification time, its listing isn't cached
+RACY_DELAY = 2
+
+
+class Catalog(object):
+    """List the assets of every asset type of a workspace."""
+
+    def __init__(self, workspace):
+        """Initialize the catalog.
+
+        :param workspace: The complete path to the workspace.
+        :type workspace: str
+        """
+
+        self.workspace = workspace
+        self.db = database.Database()
+
+        # the (modification time, [(name, is a folder)]) by complete path
+        self._listings = dict()
+
+        # the (modification time, app data, asset types by prefix,
+        # task types by suffix) of the appData.json file
+        self._app_data = (None, None, None, None)
+
+    @property
+    def app_data(self):
+        """Get the app data, only read again if the appData.json file changed.
+
+        :return: All the app_data
+        :rtype: dict
+        """
+
+        return self._get_app_data()[1]
+
+    @property
+    def asset_types(self):
+        """Get the asset types by prefix, from the cached app data.
+
+        :return: The asset types by prefix. (eg: {"ch": "characters"})
+        :rtype: dict
+        """
+
+        return self._get_app_data()[2]
+
+    @property
+    def task_types(self):
+        """Get the task types by suffix, from the cached app data.
+
+        :return: The task types by suffix. (eg: {"mod": "modeling"})
+        :rtype: dict
+        """
+
+        return self._get_app_data()[3]
+
+    def _get_app_data(self):
+        """Get the app data and its path templates, read again if the file changed.
+
+        :return: The modification time, the app data, the asset types by prefix
+            and the task types by suffix.
+        :rtype: tuple
+        """
+
+        mtime = os.stat(self.db.app_data_file).st_mtime_ns
+        app_data = self._app_data
+        if app_data[0] != mtime:
+            data = self.db.app_data
+            app_data = (
+                mtime,
+                data,
+                {value["prefix"]: key for key, value in data["assets"].items()},
+                {value["suffix"]: key for key, value in data["tasks"].items()},
+            )
+            self._app_data = app_data
+        else:
+            JSON_READS_AVOIDED.inc(file="appData")
+
+        return app_data
+
+    def is_cached(self, asset_type):
+        """Get if the assets of a type were already listed.
+
+        :param asset_type: The asset type (props, character, shots...)
+        :type asset_type: str
+
+        :return: True if the asset type folder listing is in the cache.
+        :rtype: bool
+        """
+
+        data = self.app_data["assets"][asset_type]
+        return sharding.get_type_directory(self.workspace, data) in self._listings
+
+    def list_directory(self, directory, validate=True):
+        """Get the content of a directory, from the cache if it didn't change.
+
+        :param directory: The complete path to the directory.
+        :type directory: str
+        :param validate: Wether or not to check the directory didn't change
+            before using its cached listing.
+        :type validate: bool
+
+        :return: The name of the entries and wether they are folders.
+            Empty if the directory doesn't exist.
+        :rtype: list
+        """
+
+        listing = self._listings.get(directory)
+        if listing is not None and not validate:
+            LISTINGS.inc(result="unvalidated")
+            return listing[1]
+
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            self._listings.pop(directory, None)
+            return list()
+
+        if listing is None or listing[0] != mtime:
+            LISTINGS.inc(result="miss")
+            with os.scandir(directory) as entries:
+                listing = (mtime, [(entry.name, entry.is_dir()) for entry in entries])
+
+            if time.time() - mtime / 1e9 > RACY_DELAY:
+                self._listings[directory] = listing
+            else:
+                self._listings.pop(directory, None)
+        else:
+            LISTINGS.inc(result="hit")
+
+        return listing[1]
+
+    def get_asset_directory(self, asset_type, asset_name):
+        """Get the folder of an asset, without listing anything.
+
+        :param asset_type: The asset type (props, character, shots...)
+        :type asset_type: str
+        :param asset_name: The asset name with prefix. (eg: "ch_character")
+        :type asset_name: str
+
+        :return: The complete path to the asset folder, it may not exist.
+        :rtype: str
+        """
+
+        data = self.app_data["assets"][asset_type]
+        return os.path.join(
+            sharding.get_type_directory(self.workspace, data),
+            sharding.get_shard(asset_name, data.get("shard")),
+            asset_name,
+        )
+
+    def get_asset_directories(self, asset_type, validate=True):
+        """Get the folders of the assets of a type.
+
+        :param asset_type: The asset type (props, character, shots...)
+        :type asset_type: str
+        :param validate: Wether or not to check the folders didn't change
+            before using their cached listing.
+        :type validate: bool
+
+        :return: The complete path to the asset folders by asset name.
+        :rtype: dict
+        """
+
+        data = self.app_data["assets"][asset_type]
+        directory = sharding.get_type_directory(self.workspace, data)
+        prefix = data["prefix"] + "_"
+
+        # list the shards of a sharded asset type, else the asset type folder itself
+        if data.get("shard"):
+            directories = [
+                os.path.join(directory, name)
+                for name, is_dir in self.list_directory(directory, validate)
+                if is_dir and sharding.is_shard(name, data["shard"])
+            ]
+        else:
+            directories = [directory]
+
+        assets = dict()
+        for directory in directories:
+            for name, is_dir in self.list_directory(directory, validate):
+                if is_dir and name.startswith(prefix):
+                    assets[name] = os.path.join(directory, name)
+
+        return assets
+
+    def list_assets(self, asset_type, task_type="all", validate=True):
+        """Get the assets of a type having a task.
+
+        :param asset_type: The asset type (props, character, shots...)
+        :type asset_type: str
+        :param task_type: The task type (all, modeling, rig, texturing...)
+            If "all", get every asset.
+        :type task_type: str
+        :param validate: Wether or not to check the folders didn't change
+            before using their cached listing.
+        :type validate: bool
+
+        :return: The sorted asset names.
+        :rtype: list
+        """
+
+        assets = list()
+        for name, path in self.get_asset_directories(asset_type, validate).items():
+            # only keep the assets whose task folder isn't empty
+            if task_type == "all" or self.list_directory(
+                os.path.join(path, task_type), validate
+            ):
+                assets.append(name)
+
+        return sorted(assets)
+
+
+# the catalogs of the latest workspaces used, the latest last
+_CATALOGS = collections.OrderedDict()
+_LOCK = threading.Lock()
+
+
+def get_catalog(workspace=None):
+    """Get the catalog of a workspace, kept in memory with the latest ones used.
+
+    :param workspace: The complete path to the workspace.
+        If none, use the current workspace.
+    :type workspace: str, none
+
+    :return: The workspace catalog. None if there is no workspace.
+    :rtype: Catalog, none
+    """
+
+    if workspace is None:
+        # the prefs don't exist until the app is launched once
+        db = database.Database()
+        if os.path.exists(db.prefs_file):
+            workspace = db.prefs.get("workspace", None)
+    if not workspace:
+        return None
+
+    key = os.path.normcase(os.path.normpath(workspace))
+    with _LOCK:
+        catalog = _CATALOGS.pop(key, None) or Catalog(workspace)
+        _CATALOGS[key] = catalog
+
+        # forget the least recently used workspaces
+        while len(_CATALOGS) > MAX_WORKSPACES:
+            _CATALOGS.popitem(last=False)
+
+    return catalog
+
+
+def list_directory(directory):
+    """Get the content of a directory, cached by the current workspace catalog.
+
+    :param directory: The complete path to the directory.
+    :type directory: str
+
+    :return: The name of the entries and wether they are folders.
+        Empty if the directory doesn't exist.
+    :rtype: list
+    """
+
+    catalog = get_catalog()
+    if catalog is not None:
+        return catalog.list_directory(directory)
+
+    if not os.path.isdir(directory):
+        return list()
+    with os.scandir(directory) as entries:
+        return [(entry.name, entry.is_dir()) for entry in entries]
@@ -0,0 +1,130 @@
+"""Compact the old WIP increments to reclaim disk space."""
+
+import os
+from concurrent import futures
+
+from pipeline.api.assets import paths, versions
+from pipeline.utils import files, tracing, units
+
+PATHS = paths.Paths()
+
+# the number of latest increments to keep uncompressed in every WIP folder
+KEEP_INCREMENTS = 10
+
+# the number of latest bake files to keep in every WIP folder
+KEEP_BAKES = 1
+
+
+def get_wip_directories(workspace):
+    """Get every WIP folders of the workspace.
+
+    :param workspace: The path to the workspace to look in.
+    :type workspace: str
+
+    :return: The complete paths to the WIP folders.
+    :rtype: list
+    """
+
+    directories = list()
+    for root, dirs, _ in os.walk(workspace, topdown=True):
+        if os.path.basename(root) == "WIP":
+            directories.append(root)
+            # a WIP folder only holds scenes, no need to go deeper
+            dirs[:] = []
+
+    return directories
+
+
+def compact_task(directory, keep=KEEP_INCREMENTS, keep_bakes=KEEP_BAKES, delta=False):
+    """Compress the old increments and prune the old bake files of a WIP folder.
+
+    :param directory: The complete path to the WIP folder.
+    :type directory: str
+    :param keep: The number of latest increments to keep uncompressed.
+    :type keep: int
+    :param keep_bakes: The number of latest bake files to keep.
+    :type keep_bakes: int
+    :param delta: Wether to store the old increments as deltas
+        against their successor instead of compressing them.
+    :type delta: bool
+
+    :return: The number of bytes reclaimed.
+    :rtype: int
+    """
+
+    # sort the maya files, the finalize files are never touched
+    increments = list()
+    bakes = list()
+    for file in sorted(os.listdir(directory)):
+        if file.endswith("_bake.ma"):
+            bakes.append(file)
+        elif file.endswith(".ma") and not file.endswith("_finalize.ma"):
+            increments.append(file)
+
+    reclaimed = 0
+
+    # compress every increments but the latest ones
+    if delta:
+        reclaimed += versions.VersionStore(directory).encode(keep)
+    else:
+        for file in increments[: max(len(increments) - keep, 0)]:
+            reclaimed += files.compress_file(os.path.join(directory, file))
+
+    # delete every bake files but the latest ones
+    for file in bakes[: max(len(bakes) - keep_bakes, 0)]:
+        path = os.path.join(directory, file)
+        reclaimed += os.path.getsize(path)
+        os.remove(path)
+
+    return reclaimed
+
+
+@tracing.traced("compact workspace")
+def compact_workspace(
+    keep=KEEP_INCREMENTS, keep_bakes=KEEP_BAKES, delta=False, workers=None
+):
+    """Compact every WIP folders of the workspace in parallel.
+
+    :param keep: The number of latest increments to keep uncompressed.
+    :type keep: int
+    :param keep_bakes: The number of latest bake files to keep.
+    :type keep_bakes: int
+    :param delta: Wether to store the old increments as deltas
+        against their successor instead of compressing them.
+    :type delta: bool
+    :param workers: The number of tasks to compact at the same time.
+        If none, let the executor decide.
+    :type workers: int, none
+
+    :return: The number of bytes reclaimed.
+    :rtype: int
+    """
+
+    directories = get_wip_directories(PATHS.get_workspace())
+
+    # count what the tasks write in the compaction span
+    compact = tracing.bind(compact_task)
+
+    reclaimed = 0
+    with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        jobs = {
+            executor.submit(compact, directory, keep, keep_bakes, delta): directory
+            for directory in directories
+        }
+        for job in futures.as_completed(jobs):
+            task_reclaimed = job.result()
+            if task_reclaimed:
+                print(
+                    "# Pipeline : Compacted -> {} (~ {} {})".format(
+                        jobs[job], *units.convert_byte(task_reclaimed)
+                    )
+                )
+            reclaimed += task_reclaimed
+
+    print(
+        "# Pipeline : {} WIP folders compacted, ~ {} {} reclaimed".format(
+            len(directories), *units.convert_byte(reclaimed)
+        )
+    )
+
+    return reclaimed
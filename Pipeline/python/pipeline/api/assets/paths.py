@@ -5,7 +5,15 @@ import subprocess
 
 from python_core.types import strings
 
-from pipeline.utils import database
+from pipeline.api.assets import catalog, sharding, versions
+from pipeline.utils import database, files, metrics
+
+# the extensions of the files stored in an other way than the raw file
+STORED_EXTENSIONS = (files.ARCHIVE_EXTENSION, versions.DELTA_EXTENSION)
+
+LATEST_FILES = metrics.counter(
+    "paths_latest_files_total", "The latest file lookups, by result."
+)
 
 
 class Paths(object):
@@ -73,76 +81,110 @@ class Paths(object):
         :return: The path to name
         :rtype: str
         """
-        # use app data to figure out paths
-        app_data = self.db.app_data
+        # use the app data cached with the workspace to figure out paths
+        workspace = self.get_workspace()
+        app_data = self._get_app_data(workspace)
 
         # get prefix from name
         splitted_name = name.split("_")
 
         # deduce asset type
-        asset_type = self.get_asset_type_from_prefix(splitted_name[0])
+        asset_type = self.get_asset_type_from_prefix(splitted_name[0], workspace)
+        asset_data = app_data["assets"][asset_type]
+
+        # the asset folder may be in a shard of the asset type folder
+        asset_name = "_".join([splitted_name[0], splitted_name[1]])
+        asset_path = os.path.join(
+            workspace,
+            asset_data["path"],
+            sharding.get_shard(asset_name, asset_data.get("shard")),
+            asset_name,
+        )
 
         # if the name is the asset name
         if len(splitted_name) == 2:
-            return os.path.join(
-                self.get_workspace(),
-                app_data["assets"][asset_type]["path"],
-                name,
-            ).replace("/", "\\")
+            return asset_path.replace("/", "\\")
 
         # if the name is longer it means that the name is a task or a file
         elif len(splitted_name) > 2:
             # return the def path
             if def_path:
                 return os.path.join(
-                    self.get_workspace(),
-                    app_data["assets"][asset_type]["path"],
-                    "_".join([splitted_name[0], splitted_name[1]]),
-                    self.get_task_type_from_suffix(splitted_name[2]),
+                    asset_path,
+                    self.get_task_type_from_suffix(splitted_name[2], workspace),
                     "DEF",
                 ).replace("/", "\\")
 
             # return the wip path
             return os.path.join(
-                self.get_workspace(),
-                app_data["assets"][asset_type]["path"],
-                "_".join([splitted_name[0], splitted_name[1]]),
-                self.get_task_type_from_suffix(splitted_name[2]),
+                asset_path,
+                self.get_task_type_from_suffix(splitted_name[2], workspace),
                 "WIP",
             ).replace("/", "\\")
 
-    def get_asset_type_from_prefix(self, prefix):
+    def get_asset_type_from_prefix(self, prefix, workspace=None):
         """Get the asset type from the prefix.
 
         :param prefix: The asset prefix
         :type prefix: str
+        :param workspace: The workspace whose cached app data to use.
+            If none, use the current workspace.
+        :type workspace: str, none
 
         :return: The asset type. None if found no matching suffix.
         :rtype: str
         """
 
+        workspace_catalog = catalog.get_catalog(workspace)
+        if workspace_catalog is not None:
+            return workspace_catalog.asset_types.get(prefix, None)
+
         app_data = self.db.app_data
 
         dico = {data["prefix"]: asset for asset, data in app_data["assets"].items()}
 
         return dico.get(prefix, None)
 
-    def get_task_type_from_suffix(self, suffix):
+    def get_task_type_from_suffix(self, suffix, workspace=None):
         """Get the task type from the suffix.
 
         :param suffix: The asset suffix
         :type suffix: str
+        :param workspace: The workspace whose cached app data to use.
+            If none, use the current workspace.
+        :type workspace: str, none
 
         :return: The task type. None if found no matching suffix.
         :rtype: str
         """
 
+        workspace_catalog = catalog.get_catalog(workspace)
+        if workspace_catalog is not None:
+            return workspace_catalog.task_types.get(suffix, None)
+
         app_data = self.db.app_data
 
         dico = {data["suffix"]: task for task, data in app_data["tasks"].items()}
 
         return dico.get(suffix, None)
 
+    def _get_app_data(self, workspace=None):
+        """Get the app data, from the workspace catalog cache if possible.
+
+        :param workspace: The workspace whose cached app data to use.
+            If none, use the current workspace.
+        :type workspace: str, none
+
+        :return: All the app_data
+        :rtype: dict
+        """
+
+        workspace_catalog = catalog.get_catalog(workspace)
+        if workspace_catalog is not None:
+            return workspace_catalog.app_data
+
+        return self.db.app_data
+
     def get_informations_from_name(self, name):
         """Figure out the asset information from the full file name.
 
@@ -248,7 +290,7 @@ class Paths(object):
 
         return path
 
-    def get_latest_file(self, directory, extension=None):
+    def get_latest_file(self, directory, extension=None, restore=False):
         """Get the last alphabetical file in directory.
 
         :param directory: The directory to look in
@@ -256,6 +298,10 @@ class Paths(object):
         :param extension: The file extention to fiter.
             If none, get the latest file of all.
         :type extention: str, none
+        :param restore: Wether or not to restore the latest file
+            if it is compressed or stored as a delta. Only restore the files opened,
+            see restore_file.
+        :type restore: bool
 
         :return: The last alphabetical file in the directory. None if directroy is empty
         :rtype: str, none
@@ -263,32 +309,77 @@ class Paths(object):
 
         # if the directory doesn't exists, abort
         if not os.path.exists(directory):
+            LATEST_FILES.inc(result="missing")
             return None
 
         # get all the files that endswith extension in the directory
-        content = os.listdir(directory)
-        files = list()
+        listing = catalog.list_directory(directory)
+        content = [file for file, _ in listing]
+        found = list()
 
         if extension:
+            # compressed and delta files are listed under their original name
             for file in content:
+                for stored_extension in STORED_EXTENSIONS:
+                    if file.endswith(extension + stored_extension):
+                        file = file[: -len(stored_extension)]
+                        break
+
                 if file.endswith(extension):
-                    files.append(file)
-            files = sorted(files)
+                    found.append(file)
+            found = sorted(set(found))
         else:
-            for file in content:
-                if os.path.isfile(os.path.join(directory, file)):
-                    files.append(file)
-            files = sorted(files)
+            for file, is_dir in listing:
+                # skip the files the pipeline writes next to the files
+                if not is_dir and not file.endswith(files.SIDECAR_EXTENSIONS):
+                    found.append(file)
+            found = sorted(found)
 
         # if no files were found return none. Else retrun the last alphabetical one.
-        if not files:
+        if not found:
+            LATEST_FILES.inc(result="empty")
             return None
+        LATEST_FILES.inc(result="found")
 
         # open the latest file wich is not a bake or finalize file
-        for file in list(reversed(files)):
+        for file in list(reversed(found)):
             if not file.endswith("_finalize.ma") and not file.endswith("_bake.ma"):
-                origin_file = file
-                if os.path.exists(os.path.join(directory, origin_file)):
-                    return origin_file
+                latest = file
+                break
+        else:
+            latest = found[-1]
+
+        if not restore:
+            return latest
+
+        return self.restore_file(os.path.join(directory, latest))
+
+    def restore_file(self, path):
+        """Make sure a file is readable, rebuilding it if it was stored otherwise.
 
-        return files[-1]
+        :param path: The complete path to the file, to its compressed archive
+            or to its delta.
+        :type path: str
+
+        :return: The name of the restored file.
+        :rtype: str
+        """
+
+        for stored_extension in STORED_EXTENSIONS:
+            if path.endswith(stored_extension):
+                path = path[: -len(stored_extension)]
+                break
+
+        if not os.path.exists(path):
+            # decompress the file if only its archive exists
+            if os.path.exists(path + files.ARCHIVE_EXTENSION):
+                files.decompress_file(path + files.ARCHIVE_EXTENSION)
+                print("# Pipeline : Decompressed -> " + path)
+
+            # rebuild the file from the next increments if only its delta exists
+            elif os.path.exists(path + versions.DELTA_EXTENSION):
+                directory, name = os.path.split(path)
+                versions.VersionStore(directory).restore(name)
+                print("# Pipeline : Rebuilt from deltas -> " + path)
+
+        return os.path.basename(path)
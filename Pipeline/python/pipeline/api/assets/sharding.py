@@ -0,0 +1,318 @@
+"""Spread the assets of a type in sub folders, so no folder gets too big to list.
+
+An asset type is sharded by adding a "shard" entry to its appData.json data :
+    - {"by": "sequence", "length": 6} : the sub folder is the beginning
+      of the asset basename, "sh_seq010Shot020" goes in "seq010".
+    - {"by": "hash", "buckets": 64} : the sub folder is a bucket
+      deduced from the asset name, "sh_seq010Shot020" goes in "35".
+Without a "shard" entry the assets are direct children of the asset type folder.
+
+Migrate the existing assets from a layout to an other with :
+    python -m pipeline.api.assets.sharding shot hash --buckets 64
+
+The maya scenes referencing the files of the moved assets would lose them,
+so the migration lists them and refuses to move anything unless forced.
+"""
+
+import argparse
+import hashlib
+import os
+
+from pipeline.utils import database
+
+SEQUENCE = "sequence"
+HASH = "hash"
+
+
+def get_shard(asset_name, shard=None):
+    """Get the sub folder an asset is stored in.
+
+    :param asset_name: The asset name with prefix. (eg: "sh_seq010Shot020")
+    :type asset_name: str
+    :param shard: The "shard" data of the asset type. If none, the layout is flat.
+    :type shard: dict, none
+
+    :return: The sub folder name, empty if the layout is flat.
+    :rtype: str
+    """
+
+    if not shard:
+        return ""
+
+    if shard["by"] == SEQUENCE:
+        return asset_name.partition("_")[2][: shard["length"]]
+
+    if shard["by"] == HASH:
+        buckets = shard["buckets"]
+        digest = hashlib.blake2b(asset_name.encode("utf-8"), digest_size=8).digest()
+        return str(int.from_bytes(digest, "big") % buckets).zfill(
+            len(str(buckets - 1))
+        )
+
+    raise ValueError("# Pipeline : Unknown shard layout -> " + str(shard["by"]))
+
+
+def is_shard(name, shard=None):
+    """Get if a folder name is one get_shard can produce.
+
+    :param name: The folder name.
+    :type name: str
+    :param shard: The "shard" data of the asset type. If none, the layout is flat.
+    :type shard: dict, none
+
+    :return: True if the folder may be a shard of the layout.
+    :rtype: bool
+    """
+
+    if not shard:
+        return False
+
+    if shard["by"] == SEQUENCE:
+        return 0 < len(name) <= shard["length"] and "_" not in name
+
+    if shard["by"] == HASH:
+        buckets = shard["buckets"]
+        return (
+            name.isdigit()
+            and len(name) == len(str(buckets - 1))
+            and int(name) < buckets
+        )
+
+    return False
+
+
+def get_type_directory(workspace, asset_type_data):
+    """Get the folder of an asset type.
+
+    :param workspace: The complete path to the workspace.
+    :type workspace: str
+    :param asset_type_data: The appData.json data of the asset type.
+    :type asset_type_data: dict
+
+    :return: The complete path to the asset type folder.
+    :rtype: str
+    """
+
+    return os.path.join(
+        workspace, *asset_type_data["path"].replace("\\", "/").split("/")
+    )
+
+
+def find_assets(directory, prefix, shards=()):
+    """Find the assets of a type whatever the layout, even a half migrated one.
+
+    :param directory: The complete path to the asset type folder.
+    :type directory: str
+    :param prefix: The asset type prefix.
+    :type prefix: str
+    :param shards: The "shard" data of the layouts the assets may be stored with.
+    :type shards: iterable
+
+    :return: The complete path to the asset folders by asset name.
+    :rtype: dict
+    """
+
+    assets = dict()
+    if not os.path.isdir(directory):
+        return assets
+
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            if entry.name.startswith(prefix + "_"):
+                assets[entry.name] = entry.path
+                continue
+
+            # only look in the folders a layout can create, not any folder
+            if not any(is_shard(entry.name, shard) for shard in shards):
+                continue
+            with os.scandir(entry.path) as shard_entries:
+                for shard_entry in shard_entries:
+                    if shard_entry.is_dir() and shard_entry.name.startswith(
+                        prefix + "_"
+                    ):
+                        assets[shard_entry.name] = shard_entry.path
+
+    return assets
+
+
+def find_referencing_scenes(workspace, moves):
+    """Find the maya scenes referencing files of the assets to move.
+
+    :param workspace: The complete path to the workspace.
+    :type workspace: str
+    :param moves: The complete path to the asset folders to move.
+    :type moves: list
+
+    :return: The referenced files by complete path to the scene referencing them.
+    :rtype: dict
+    """
+
+    # imported here, the prefetch needs the paths which need the shards
+    from pipeline.api.storage import prefetch
+
+    # the references may be stored with other separators or an other drive letter
+    relatives = [
+        "/" + os.path.relpath(path, workspace).replace("\\", "/").lower() + "/"
+        for path in moves
+    ]
+
+    scenes = dict()
+    for root, _, walk_files in os.walk(workspace):
+        for name in walk_files:
+            if not name.endswith(".ma"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                references = prefetch.get_references(path)
+            except OSError:
+                continue
+
+            moved = [
+                reference
+                for reference in references
+                if any(
+                    relative in reference.replace("\\", "/").lower()
+                    for relative in relatives
+                )
+            ]
+            if moved:
+                scenes[path] = moved
+
+    return scenes
+
+
+def migrate(asset_type, shard=None, workspace=None, dry_run=False, force=False):
+    """Move the assets of a type to a new layout and save it in appData.json.
+
+    An interrupted migration can be run again, it only moves the assets
+    that are not in place yet. The scenes referencing the moved assets
+    are printed first, nothing is moved if there is any unless forced.
+
+    :param asset_type: The asset type to migrate (eg: "props", "shot").
+    :type asset_type: str
+    :param shard: The new "shard" data of the asset type. If none, use a flat layout.
+    :type shard: dict, none
+    :param workspace: The complete path to the workspace.
+        If none, use the current workspace.
+    :type workspace: str, none
+    :param dry_run: Wether or not to only print the moves.
+    :type dry_run: bool
+    :param force: Wether or not to move the assets even if scenes reference them,
+        the references need to be fixed afterwards.
+    :type force: bool
+
+    :return: The number of assets moved.
+    :rtype: int
+    """
+
+    db = database.Database()
+    workspace = workspace or db.prefs.get("workspace")
+    if not workspace:
+        raise ValueError("# Pipeline : Please specify a workspace path first")
+    app_data = db.app_data
+    data = app_data["assets"][asset_type]
+
+    # make sure the layout is valid before moving anything
+    get_shard(data["prefix"] + "_test", shard)
+
+    directory = get_type_directory(workspace, data)
+    layouts = (data.get("shard"), shard)
+    assets = find_assets(directory, data["prefix"], layouts)
+    moves = list()
+    for asset_name, path in sorted(assets.items()):
+        destination = os.path.join(directory, get_shard(asset_name, shard), asset_name)
+        if os.path.normcase(path) != os.path.normcase(destination):
+            moves.append((path, destination))
+
+    # the references to the moved files would be left dangling
+    scenes = dict()
+    if moves:
+        scenes = find_referencing_scenes(workspace, [path for path, _ in moves])
+    for scene, references in sorted(scenes.items()):
+        print(
+            "# Pipeline : {} references a moved asset -> {}".format(
+                scene, ", ".join(references)
+            )
+        )
+    if scenes and not force and not dry_run:
+        raise ValueError(
+            "# Pipeline : {} scenes reference the assets to move, ".format(len(scenes))
+            + "migrate with --force and fix their references"
+        )
+
+    moved = 0
+    for path, destination in moves:
+        print("# Pipeline : Move {} -> {}".format(path, destination))
+        if os.path.exists(destination):
+            print("# Pipeline : Already exists, skipped -> " + destination)
+            continue
+        if not dry_run:
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            os.rename(path, destination)
+        moved += 1
+
+    if dry_run:
+        return moved
+
+    # remove the shards left empty
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if (
+                entry.is_dir()
+                and any(is_shard(entry.name, layout) for layout in layouts)
+                and not os.listdir(entry.path)
+            ):
+                os.rmdir(entry.path)
+
+    if shard:
+        data["shard"] = shard
+    else:
+        data.pop("shard", None)
+    db.app_data = app_data
+
+    print("# Pipeline : {} {} assets migrated".format(moved, asset_type))
+    return moved
+
+
+def main():
+    """Migrate an asset type from the command line."""
+
+    parser = argparse.ArgumentParser(
+        description="Move the assets of a type to a new folder layout."
+    )
+    parser.add_argument("asset_type", help="The asset type to migrate.")
+    parser.add_argument(
+        "layout", choices=["flat", SEQUENCE, HASH], help="The new folder layout."
+    )
+    parser.add_argument(
+        "--length",
+        type=int,
+        default=6,
+        help="The number of basename characters of the sequence shards.",
+    )
+    parser.add_argument(
+        "--buckets", type=int, default=64, help="The number of hash shards."
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only print the moves.")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Move the assets even if scenes reference them.",
+    )
+    arguments = parser.parse_args()
+
+    shard = None
+    if arguments.layout == SEQUENCE:
+        shard = {"by": SEQUENCE, "length": arguments.length}
+    elif arguments.layout == HASH:
+        shard = {"by": HASH, "buckets": arguments.buckets}
+
+    migrate(
+        arguments.asset_type, shard, dry_run=arguments.dry_run, force=arguments.force
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""Store the old increments of a task as deltas against their successor.
+
+Consecutive increments of a maya ascii scene only differ by a few lines.
+So instead of keeping every increment in full, an old increment can be stored
+as the list of line ranges to copy from the next increment
+and the few lines to insert between them.
+
+A delta file is a lzma compressed file written next to the increment it replaces
+("ch_bob_rig_003.ma" -> "ch_bob_rig_003.ma.delta"), holding :
+    - a "PIPELINE_DELTA 1" header line
+    - the name of the successor increment
+    - the size and the blake2b checksum of the increment
+    - the operations to rebuild the increment from its successor :
+        - "=start end" : copy the successor lines from start to end
+        - "+count" followed by count lines : insert those lines
+"""
+
+import difflib
+import hashlib
+import io
+import itertools
+import lzma
+import os
+
+from pipeline.utils import files
+
+# the extension of the delta files
+DELTA_EXTENSION = ".delta"
+
+# the first line of every delta file
+HEADER = b"PIPELINE_DELTA 1\n"
+
+# keep an increment in full every so often to bound the reconstruction chains
+KEYFRAME_INTERVAL = 50
+
+
+class VersionStore(object):
+    """Manage the increments of a task folder as a chain of deltas."""
+
+    def __init__(self, directory):
+        """Initialize the store on a task folder.
+
+        :param directory: The complete path to the task folder (eg: the WIP folder).
+        :type directory: str
+        """
+
+        self.directory = directory
+
+    # get informations
+
+    def increments(self):
+        """Get the increments of the task, whatever the way they are stored.
+
+        Bake and finalize files are not increments.
+
+        :return: The sorted increments names.
+        :rtype: list
+        """
+
+        names = set()
+        for file in os.listdir(self.directory):
+            for extension in (DELTA_EXTENSION, files.ARCHIVE_EXTENSION):
+                if file.endswith(".ma" + extension):
+                    file = file[: -len(extension)]
+                    break
+
+            if file.endswith(".ma") and not file.endswith(("_bake.ma", "_finalize.ma")):
+                names.add(file)
+
+        return sorted(names)
+
+    def is_delta(self, name):
+        """Get if an increment is stored as a delta.
+
+        :param name: The increment name.
+        :type name: str
+
+        :return: True if the increment only exists as a delta.
+        :rtype: bool
+        """
+
+        path = os.path.join(self.directory, name)
+        return not os.path.exists(path) and os.path.exists(path + DELTA_EXTENSION)
+
+    def read_header(self, name):
+        """Get the informations stored in the header of a delta.
+
+        :param name: The increment name.
+        :type name: str
+
+        :return: The successor name, the increment size and its checksum.
+        :rtype: tuple
+        """
+
+        path = os.path.join(self.directory, name + DELTA_EXTENSION)
+        with lzma.open(path, "rb") as delta_file:
+            return self._read_header(delta_file, path)
+
+    # reconstruct increments
+
+    def iter_lines(self, name):
+        """Stream the lines of an increment, rebuilding it from its deltas if needed.
+
+        :param name: The increment name.
+        :type name: str
+
+        :return: The increment lines as bytes.
+        :rtype: generator
+        """
+
+        path = os.path.join(self.directory, name)
+
+        if os.path.exists(path):
+            with open(path, "rb") as maya_file:
+                yield from maya_file
+
+        elif os.path.exists(path + files.ARCHIVE_EXTENSION):
+            with lzma.open(path + files.ARCHIVE_EXTENSION, "rb") as archive_file:
+                yield from archive_file
+
+        elif os.path.exists(path + DELTA_EXTENSION):
+            yield from self._apply_delta(path + DELTA_EXTENSION)
+
+        else:
+            raise ValueError("# Pipeline : Increment not found -> " + path)
+
+    def reconstruct(self, name, destination):
+        """Write an increment in full to a destination file.
+
+        :param name: The increment name.
+        :type name: str
+        :param destination: The complete path to the file to write.
+        :type destination: str
+
+        :return: The complete path to the destination file.
+        :rtype: str
+        """
+
+        def write(temp_path):
+            with open(temp_path, "wb") as temp_file:
+                temp_file.writelines(self.iter_lines(name))
+
+        path = os.path.join(self.directory, name + DELTA_EXTENSION)
+        return files.write_atomic(path, destination, write)
+
+    def restore(self, name):
+        """Rebuild an increment stored as a delta in place and remove its delta.
+
+        The deltas of the previous increments stay valid
+        since the increment content is the same.
+
+        :param name: The increment name.
+        :type name: str
+
+        :return: The complete path to the restored increment.
+        :rtype: str
+        """
+
+        path = os.path.join(self.directory, name)
+        self.reconstruct(name, path)
+        os.remove(path + DELTA_EXTENSION)
+
+        return path
+
+    # encode increments
+
+    def encode(self, keep=1, verify=True):
+        """Store every old increment as a delta against its successor.
+
+        :param keep: The number of latest increments to keep in full.
+        :type keep: int
+        :param verify: Wether or not to check every delta rebuilds its increment
+            byte for byte before deleting the increment.
+        :type verify: bool
+
+        :return: The number of bytes reclaimed.
+        :rtype: int
+        """
+
+        increments = self.increments()
+
+        # the latest increment always stays in full, it has no successor
+        count = max(len(increments) - max(keep, 1), 0)
+
+        reclaimed = 0
+        # go from the oldest so the successor of each increment is still in full
+        for index, name in enumerate(increments[:count]):
+            # keep a full increment every so often to bound the chains
+            if index % KEYFRAME_INTERVAL == KEYFRAME_INTERVAL - 1:
+                continue
+
+            path = os.path.join(self.directory, name)
+            if not os.path.exists(path):
+                continue
+
+            self._write_delta(name, increments[index + 1])
+            if verify and not self._same_content(name, path):
+                os.remove(path + DELTA_EXTENSION)
+                print("# Pipeline : Delta mismatch, file kept -> " + path)
+                continue
+
+            reclaimed += os.path.getsize(path) - os.path.getsize(path + DELTA_EXTENSION)
+            os.remove(path)
+
+        return reclaimed
+
+    def verify(self):
+        """Check every delta rebuilds its increment with the stored checksum.
+
+        :return: The names of the increments that can't be rebuilt correctly.
+        :rtype: list
+        """
+
+        corrupted = list()
+        for name in self.increments():
+            if not self.is_delta(name):
+                continue
+
+            try:
+                successor, size, digest = self.read_header(name)
+                checksum = hashlib.blake2b()
+                length = 0
+                for line in self.iter_lines(name):
+                    checksum.update(line)
+                    length += len(line)
+
+                if length != size or checksum.hexdigest() != digest:
+                    corrupted.append(name)
+
+            except (ValueError, EOFError, lzma.LZMAError):
+                corrupted.append(name)
+
+        for name in corrupted:
+            print("# Pipeline : Corrupted delta -> " + name)
+
+        return corrupted
+
+    # private methods
+
+    def _write_delta(self, name, successor):
+        """Write the delta rebuilding an increment from its successor.
+
+        :param name: The increment name.
+        :type name: str
+        :param successor: The successor increment name.
+        :type successor: str
+        """
+
+        path = os.path.join(self.directory, name)
+        with open(path, "rb") as maya_file:
+            content = maya_file.read()
+
+        # split on the line feeds only, like the files are read back
+        lines = list(io.BytesIO(content))
+        successor_lines = list(self.iter_lines(successor))
+
+        def write(temp_path):
+            with lzma.open(temp_path, "wb") as delta_file:
+                delta_file.write(HEADER)
+                delta_file.write(successor.encode("utf-8") + b"\n")
+                delta_file.write(
+                    "{} {}\n".format(
+                        len(content), hashlib.blake2b(content).hexdigest()
+                    ).encode("utf-8")
+                )
+
+                # copy the common lines and insert the others
+                matcher = difflib.SequenceMatcher(None, lines, successor_lines)
+                for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                    if tag == "equal":
+                        delta_file.write("={} {}\n".format(j1, j2).encode("utf-8"))
+                    elif tag in ("replace", "delete"):
+                        delta_file.write("+{}\n".format(i2 - i1).encode("utf-8"))
+                        delta_file.writelines(lines[i1:i2])
+
+        files.write_atomic(path, path + DELTA_EXTENSION, write)
+
+    def _read_header(self, delta_file, path):
+        """Read the header of an opened delta file.
+
+        :param delta_file: The opened delta file.
+        :type delta_file: file
+        :param path: The complete path to the delta file, to report errors.
+        :type path: str
+
+        :return: The successor name, the increment size and its checksum.
+        :rtype: tuple
+        """
+
+        if delta_file.readline() != HEADER:
+            raise ValueError("# Pipeline : Not a delta file -> " + path)
+
+        successor = delta_file.readline().decode("utf-8").rstrip("\n")
+        size, digest = delta_file.readline().decode("utf-8").split()
+
+        return successor, int(size), digest
+
+    def _apply_delta(self, path):
+        """Stream the lines of an increment by applying its delta on its successor.
+
+        :param path: The complete path to the delta file.
+        :type path: str
+
+        :return: The increment lines as bytes.
+        :rtype: generator
+        """
+
+        with lzma.open(path, "rb") as delta_file:
+            successor, size, digest = self._read_header(delta_file, path)
+
+            # the copied ranges always move forward in the successor
+            successor_lines = self.iter_lines(successor)
+            position = 0
+
+            try:
+                for operation in iter(delta_file.readline, b""):
+                    if operation.startswith(b"="):
+                        start, end = map(int, operation[1:].split())
+                        for _ in itertools.islice(successor_lines, start - position):
+                            pass
+                        yield from itertools.islice(successor_lines, end - start)
+                        position = end
+
+                    elif operation.startswith(b"+"):
+                        for _ in range(int(operation[1:])):
+                            yield delta_file.readline()
+
+                    else:
+                        raise ValueError("# Pipeline : Corrupted delta -> " + path)
+
+            finally:
+                successor_lines.close()
+
+    def _same_content(self, name, path):
+        """Check if the rebuilt increment is exactly the file on disk.
+
+        :param name: The increment name.
+        :type name: str
+        :param path: The complete path to the file to compare with.
+        :type path: str
+
+        :return: True if the contents are the same byte for byte.
+        :rtype: bool
+        """
+
+        with open(path, "rb") as maya_file:
+            for line in self._apply_delta(path + DELTA_EXTENSION):
+                if maya_file.read(len(line)) != line:
+                    return False
+
+            return maya_file.read(1) == b""
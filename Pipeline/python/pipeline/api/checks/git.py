@@ -3,10 +3,13 @@
 import os
 
 from pipeline.api.assets import paths
-from pipeline.utils import units
+from pipeline.utils import executor, files, metrics, tracing, units
 
 PATHS = paths.Paths()
 
+FILES_SCANNED = metrics.counter("files_scanned_total", "The files scanned, by walker.")
+IGNORED = metrics.counter("git_ignored_total", "The paths added to .gitignore.")
+
 
 def _get_gitignore_content():
     """Get the gitignore content.
@@ -51,6 +54,7 @@ def _write_gitignore(content):
         gitignore_file.write(content)
 
 
+@tracing.traced("update gitignore")
 def update_gitignore():
     """Update the gitignore file to ignore the WIPs folders."""
 
@@ -60,13 +64,23 @@ def update_gitignore():
     # get the current gitignore content
     gitignore = _get_gitignore_content()
 
+    # the checksums and partial copies written next to the files stay local
+    for extension in files.SIDECAR_EXTENSIONS:
+        if "*" + extension not in gitignore:
+            gitignore.append("*" + extension)
+            IGNORED.inc(reason="sidecar")
+
     # check every folders and make sure no WIP folder will be pushed
-    for root, dirs, files in os.walk(workspace, topdown=True):
-        # add WIP folders to gitignore
-        if root.endswith("\\WIP"):
+    for count, (root, dirs, _) in enumerate(os.walk(workspace, topdown=True)):
+        executor.check_cancelled()
+        executor.report_progress(count, 0)
+
+        # add WIP folders to gitignore, whatever the separators of the platform
+        if os.path.basename(root) == "WIP":
             root = root.replace(workspace, "").replace("\\", "/") + "/"
             if root not in gitignore:
                 gitignore.append(root)
+                IGNORED.inc(reason="WIP")
 
     # write the new gitignore
     _write_gitignore("\n".join(sorted(gitignore)))
@@ -74,6 +88,7 @@ def update_gitignore():
     print("# Pipeline : .gitignore updated")
 
 
+@tracing.traced("ignore oversized files")
 def ignore_oversized_files():
     """Github only allows files below 100MB.
 
@@ -87,10 +102,14 @@ def ignore_oversized_files():
     gitignore = _get_gitignore_content()
 
     # check every folders and make sure no oversized files will be pushed
-    for root, dirs, files in os.walk(workspace, topdown=True):
+    for count, (root, dirs, walk_files) in enumerate(os.walk(workspace, topdown=True)):
+        executor.check_cancelled()
+        executor.report_progress(count, 0)
+
         # skip files with WIP in their name
-        if "\\WIP\\" not in root.replace(workspace, ""):
-            for file in files:
+        if "/WIP/" not in root.replace(workspace, "").replace("\\", "/"):
+            FILES_SCANNED.inc(len(walk_files), walker="git")
+            for file in walk_files:
                 stats = os.stat(os.path.join(root, file))
                 size, unit = units.convert_byte(stats.st_size)
 
@@ -100,6 +119,7 @@ def ignore_oversized_files():
 
                     if file not in gitignore:
                         gitignore.append(file)
+                        IGNORED.inc(reason="oversized")
 
                         print(
                             "# Pipeline : {} added to .gitignore ".format(file)
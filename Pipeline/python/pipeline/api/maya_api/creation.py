@@ -5,8 +5,7 @@ import sys
 
 from pipeline.api.maya_api import maya_asset
 from pipeline.api.maya_api.tools import rig
-from pipeline.ui.dialogs import popups
-from pipeline.utils import database
+from pipeline.utils import database, interaction, tracing
 
 ASSET = maya_asset.MayaAsset()
 DATABASE = database.Database()
@@ -27,7 +26,7 @@ def create_maya_scenes(name):
     from maya import cmds
 
     # save the current file before
-    popups.save_popup()
+    save_changes()
 
     # get scene infromations and extract useful data
     informations = ASSET.get_informations_from_name(name)
@@ -240,6 +239,34 @@ def cleaning_creation():
 # runtime creations
 
 
+def save_changes():
+    """Ask if we want to save the current file, if it was modified.
+
+    Without any user, the changes are not saved.
+    """
+
+    from maya import cmds
+
+    if not cmds.file(q=True, modified=True):
+        return
+
+    if interaction.confirm(
+        "Save changes to the current scene?",
+        title="Save?",
+        title_msg=os.path.basename(cmds.file(q=True, sceneName=True)),
+    ):
+        file = cmds.file(q=True, sceneName=True).replace("/", "\\")
+        if not file:
+            raise ValueError(
+                "# Pipeline : This file has no name."
+                + " You have to save it at least once before."
+            )
+
+        print("# Pipeline : File saved -> " + file)
+        cmds.file(save=True, type="mayaAscii", force=True)
+
+
+@tracing.traced("increment save")
 def increment_save(comment=None):
     """Save the current file as an increment of the current scene.
 
@@ -249,7 +276,7 @@ def increment_save(comment=None):
     from maya import cmds
 
     # save the file before
-    popups.save_popup()
+    save_changes()
 
     # get the path to the files
     task_path = os.path.dirname(cmds.file(q=True, sceneName=True))
@@ -1,20 +1,34 @@
 """Manage scene exportations."""
 
 import os
-import shutil
 
 from python_core.types import strings
 
 from pipeline.api.maya_api import maya_asset, creation, studient_warning
 from pipeline.api.maya_api.tools import rig, animation
-from pipeline.utils import database
+from pipeline.utils import database, executor, files, metrics, tracing
 
 ASSET = maya_asset.MayaAsset()
 DATABASE = database.Database()
 
+EXPORT_DURATION = metrics.histogram(
+    "export_duration_seconds", "The duration of the exports, by operation."
+)
 
-def save_def():
-    """Save the DEF version of the asset to publish it on git."""
+# the extension of the previous DEF file kept to roll back
+PREVIOUS_EXTENSION = ".previous"
+
+
+def save_def(keep_previous=False):
+    """Save the DEF version of the asset to publish it on git.
+
+    :param keep_previous: Wether or not to keep the previous DEF file
+        as a ".previous" file to be able to roll back.
+    :type keep_previous: bool
+
+    :return: The job copying the file, None if nothing was saved.
+    :rtype: Job, none
+    """
 
     from maya import cmds
 
@@ -38,25 +52,75 @@ def save_def():
     source = cmds.file(q=True, sceneName=True)
     destination = ASSET.get_path_from_name(os.path.basename(source), def_path=True)
 
-    # make sure the DEF directory exists
-    ASSET.create_directories(destination)
+    # copy the file in background, only the scene queries need maya
+    return executor.submit(
+        "Save DEF",
+        _copy_def,
+        source,
+        destination,
+        asset_name,
+        keep_previous,
+        callback=lambda path: print("# Pipeline : DEF saved -> " + path),
+    )
 
-    # remove the previous maya files in the current directory
-    for root, dirs, def_files in os.walk(destination):
-        for file in def_files:
-            if file.startswith(asset_name) and file.endswith(".ma"):
-                os.remove(os.path.join(root, file))
 
-    # set the destination file path
-    destination = os.path.join(destination, os.path.basename(source))
+@tracing.traced("save def")
+@metrics.timed(EXPORT_DURATION, operation="save_def")
+def _copy_def(source, destination, asset_name, keep_previous=False):
+    """Replace the DEF files of the asset by a cleaned copy of the source.
+
+    The new DEF file is staged and moved into place before the previous ones
+    are removed, so the DEF folder is never seen empty.
 
-    # copy the file to the DEF path
-    shutil.copy2(source, destination)
+    :param source: The complete path to the scene to save as DEF.
+    :type source: str
+    :param destination: The complete path to the DEF folder.
+    :type destination: str
+    :param asset_name: The asset name, to find the previous DEF files.
+    :type asset_name: str
+    :param keep_previous: Wether or not to keep the latest previous DEF file
+        as a ".previous" file to be able to roll back.
+    :type keep_previous: bool
+
+    :return: The complete path to the DEF file.
+    :rtype: str
+    """
 
-    # clean studient warning
-    studient_warning.remove_from_file(destination)
+    # make sure the DEF directory exists
+    ASSET.create_directories(destination)
 
-    print("# Pipeline : DEF saved -> " + destination)
+    # copy the file to the DEF path without the studient warning
+    name = os.path.basename(source)
+    def_file = studient_warning.copy_without_warning(
+        source, os.path.join(destination, name)
+    )
+
+    # list the previous DEF files and the previous rollback files
+    previous_files = list()
+    rollback_files = list()
+    with os.scandir(destination) as entries:
+        for entry in entries:
+            if not entry.is_file() or not entry.name.startswith(asset_name):
+                continue
+            if entry.name.endswith(".ma") and entry.name != name:
+                previous_files.append(entry.path)
+            elif entry.name.endswith(".ma" + PREVIOUS_EXTENSION):
+                rollback_files.append(entry.path)
+
+    # keep the latest previous DEF file to roll back, it replaces the older one
+    if keep_previous and previous_files:
+        previous_files.sort()
+        latest = previous_files.pop()
+        files.move_file(latest, latest + PREVIOUS_EXTENSION)
+        for rollback_file in rollback_files:
+            if rollback_file != latest + PREVIOUS_EXTENSION:
+                files.remove_file(rollback_file)
+
+    # remove the previous DEF files now the new one is in place
+    for previous_file in previous_files:
+        files.remove_file(previous_file)
+
+    return def_file
 
 
 # publish form Maya
@@ -87,6 +151,8 @@ def export():
         print("# Pipeline : You don't need to export the animation task from maya")
 
 
+@tracing.traced("export")
+@metrics.timed(EXPORT_DURATION, operation="export")
 def _export_modeling():
     """Export the GEO group as fbx in an export folder."""
 
@@ -118,6 +184,7 @@ def _export_modeling():
         preserveReferences=True,
         exportSelected=True,
     )
+    tracing.add(os.path.getsize(path), 1)
 
     print("# Pipeline : Modeling exported -> " + path)
 
@@ -125,28 +192,31 @@ def _export_modeling():
 def _export_rig():
     """Save the current file in an export folder to be imported as reference."""
 
-    print("# Pipeline : Rig exported -> " + _copy_export_current_scene())
+    _copy_export_current_scene("Rig")
 
 
 def _export_layout():
     """Save the current file in an export folder to be imported as reference."""
 
-    print("# Pipeline : Layout exported -> " + _copy_export_current_scene())
+    _copy_export_current_scene("Layout")
 
 
 def _export_cleaning():
     """Save the current file in an export folder to be imported as reference."""
 
-    print("# Pipeline : Cleaning exported -> " + _copy_export_current_scene())
+    _copy_export_current_scene("Cleaning")
 
 
-def _copy_export_current_scene():
+def _copy_export_current_scene(label):
     """Copy the current scene and name it properly in the export folder.
 
     It will allow to import it as a reference later one in the project.
 
-    :return: The created export file path
-    :rtype: str
+    :param label: The kind of export, to print once exported.
+    :type label: str
+
+    :return: The job copying the file.
+    :rtype: Job
     """
 
     from maya import cmds
@@ -160,24 +230,50 @@ def _copy_export_current_scene():
     source = os.path.join(cmds.file(q=True, sceneName=True))
     destination = os.path.join(ASSET.get_path_from_name(asset_name), task, "export")
 
+    # copy the file in background, only the scene queries need maya
+    return executor.submit(
+        label + " export",
+        _copy_export,
+        source,
+        destination,
+        asset_name,
+        callback=lambda path: print(
+            "# Pipeline : {} exported -> {}".format(label, path)
+        ),
+    )
+
+
+@tracing.traced("export")
+@metrics.timed(EXPORT_DURATION, operation="export")
+def _copy_export(source, destination, asset_name):
+    """Copy a scene to the export folder without the studient warning.
+
+    :param source: The complete path to the scene to export.
+    :type source: str
+    :param destination: The complete path to the export folder.
+    :type destination: str
+    :param asset_name: The asset name to name the export file after.
+    :type asset_name: str
+
+    :return: The created export file path
+    :rtype: str
+    """
+
     # make sure the path exists
     ASSET.create_directories(destination)
 
     # set the destination file path
     destination = os.path.join(destination, asset_name + ".ma")
 
-    # copy the file to the export path
-    shutil.copy2(source, destination)
-
-    # clean studient warning
-    studient_warning.remove_from_file(destination)
-
-    return destination
+    # copy the file to the export path without the studient warning
+    return studient_warning.copy_without_warning(source, destination)
 
 
 # publish for Unreal
 
 
+@tracing.traced("publish")
+@metrics.timed(EXPORT_DURATION, operation="publish")
 def publish():
     """Publish to unreal."""
 
@@ -233,6 +329,7 @@ def _publish_modeling():
         preserveReferences=True,
         exportSelected=True,
     )
+    tracing.add(os.path.getsize(path), 1)
 
     print("# Pipeline : Modeling published -> " + path)
 
@@ -274,6 +371,7 @@ def _publish_atlas():
             preserveReferences=True,
             exportSelected=True,
         )
+        tracing.add(os.path.getsize(export_path), 1)
 
         done.append(mesh)
 
@@ -326,6 +424,7 @@ def _publish_rig():
         preserveReferences=True,
         exportSelected=True,
     )
+    tracing.add(os.path.getsize(path), 1)
 
     print("# Pipeline : Rig published -> " + path)
 
@@ -361,6 +460,7 @@ def _publish_layout():
         preserveReferences=True,
         exportSelected=True,
     )
+    tracing.add(os.path.getsize(path), 1)
 
     print("# Pipeline : Layout published -> " + path)
 
@@ -369,6 +469,8 @@ def _publish_mocap():
     """Do nothing."""
 
 
+@tracing.traced("publish animation")
+@metrics.timed(EXPORT_DURATION, operation="publish_animation")
 def publish_animation(pipe_nodes=None):
     """Export the animations as fbx in the unreal publish folder.
 
@@ -442,5 +544,6 @@ def publish_animation(pipe_nodes=None):
             preserveReferences=True,
             exportSelected=True,
         )
+        tracing.add(os.path.getsize(path), 1)
 
         print("# Pipeline : Animation published -> " + path)
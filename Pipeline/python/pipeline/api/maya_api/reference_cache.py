@@ -0,0 +1,108 @@
+"""Load the referenced exports from the local export cache.
+
+The scenes keep referencing the shared exports: only the file maya resolves
+a reference to is overridden with the local copy, when the reference is loaded.
+The copies referenced by the opened scene are pinned in the cache,
+so they are never evicted while maya uses them. The cache index is saved
+once the scene and its references are loaded.
+"""
+
+from pipeline.api.storage import export_cache
+from pipeline.utils import database
+
+DATABASE = database.Database()
+
+# the ids of the maya callbacks installed
+_CALLBACKS = list()
+
+
+def is_enabled():
+    """Get if the references are loaded from the local cache.
+
+    :return: The "reference_from_cache" pref.
+    :rtype: bool
+    """
+
+    return DATABASE.prefs.get("reference_from_cache", False)
+
+
+def install():
+    """Load the references from the local cache from now on, once."""
+
+    from maya.api import OpenMaya
+
+    if _CALLBACKS:
+        return
+
+    _CALLBACKS.append(
+        OpenMaya.MSceneMessage.addCheckFileCallback(
+            OpenMaya.MSceneMessage.kBeforeLoadReferenceCheck, _before_load_reference
+        )
+    )
+    for message in (
+        OpenMaya.MSceneMessage.kBeforeNew,
+        OpenMaya.MSceneMessage.kBeforeOpen,
+    ):
+        _CALLBACKS.append(OpenMaya.MSceneMessage.addCallback(message, _scene_closed))
+    _CALLBACKS.append(
+        OpenMaya.MSceneMessage.addCallback(
+            OpenMaya.MSceneMessage.kAfterOpen, _scene_loaded
+        )
+    )
+
+
+def uninstall():
+    """Load the references from the shared exports again."""
+
+    from maya.api import OpenMaya
+
+    for callback in _CALLBACKS:
+        OpenMaya.MMessage.removeCallback(callback)
+    del _CALLBACKS[:]
+
+
+def _before_load_reference(file_object, client_data=None):
+    """Resolve a reference being loaded to its local copy.
+
+    :param file_object: The file maya is about to load.
+    :type file_object: MFileObject
+    :param client_data: Unused.
+    :type client_data: object
+
+    :return: True, the reference is always loaded.
+    :rtype: bool
+    """
+
+    path = file_object.resolvedFullName()
+    try:
+        cached = export_cache.CACHE.resolve(path)
+    except OSError as error:
+        print("# Pipeline : Export cache unavailable ({}) -> {}".format(error, path))
+        return True
+
+    if cached is not None:
+        export_cache.CACHE.pin(cached)
+        # the scene still saves the raw path, the shared export
+        file_object.overrideResolvedFullName(cached)
+
+    return True
+
+
+def _scene_loaded(client_data=None):
+    """Save the uses of the copies, once every reference is loaded.
+
+    :param client_data: Unused.
+    :type client_data: object
+    """
+
+    export_cache.CACHE.flush()
+
+
+def _scene_closed(client_data=None):
+    """Let the copies of the closed scene be evicted.
+
+    :param client_data: Unused.
+    :type client_data: object
+    """
+
+    export_cache.CACHE.unpin_all()
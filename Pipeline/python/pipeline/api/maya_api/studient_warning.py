@@ -1,7 +1,44 @@
 """Get rid of the studient warning on maya files."""
 
 import os
+
 from pipeline.api.assets import paths
+from pipeline.utils import executor, files, tracing
+
+# the line maya adds to the files saved with a student license
+WARNING = b'fileInfo "license" "student";'
+
+
+def clean_header(line):
+    """Filter a .ma header line to get rid of the studient warning.
+
+    :param line: The header line to filter.
+    :type line: bytes
+
+    :return: The line to write and wether the header is over.
+    :rtype: tuple
+    """
+
+    # the warning is only written once : once removed nothing more to filter
+    if WARNING in line:
+        return b"", True
+
+    return line, line.startswith(files.MAYA_HEADER_END)
+
+
+def copy_without_warning(source, destination):
+    """Copy a .ma file without its studient warning in a single verified pass.
+
+    :param source: The complete path to the .ma file to copy.
+    :type source: str
+    :param destination: The complete path to the cleaned file to create.
+    :type destination: str
+
+    :return: The complete path to the destination file.
+    :rtype: str
+    """
+
+    return files.copy_verified(source, destination, header_filter=clean_header)
 
 
 def remove_from_file(file):
@@ -12,23 +49,13 @@ def remove_from_file(file):
     :type file: str
     """
 
-    # get the file lines
-    with open(file, "r") as maya_file:
-        lines = maya_file.readlines()
-
-    # look for the studient warning
-    for line in lines:
-        if 'fileInfo "license" "student";' in line:
-            break
-    lines.remove(line)
-
-    # re_write the file
-    with open(file, "w") as maya_file:
-        maya_file.write("".join(lines))
+    # re_write the file without the warning
+    files.copy_file(file, file, header_filter=clean_header)
 
     print("# Pipeline : Studient warning removed from -> " + file)
 
 
+@tracing.traced("remove studient warnings")
 def remove_from_all_files(folders=None):
     """Remove the studient warning from all the .ma files.
 
@@ -40,7 +67,13 @@ def remove_from_all_files(folders=None):
     # manage the paths
     _paths = paths.Paths()
 
-    for root, dirs, project_files in os.walk(_paths.get_workspace(), topdown=True):
+    workspace = _paths.get_workspace()
+    for count, (root, dirs, project_files) in enumerate(
+        os.walk(workspace, topdown=True)
+    ):
+        executor.check_cancelled()
+        executor.report_progress(count, 0)
+
         # remove studient warning from maya files that are in folders
         if folders:
             for maya_file in project_files:
@@ -2,13 +2,17 @@
 
 import os
 
-from pipeline.api.maya_api import maya_asset
+from pipeline.api.maya_api import maya_asset, reference_cache
 from pipeline.api.maya_api.tools import rig
-from pipeline.utils import database
+from pipeline.utils import database, metrics, tracing
 
 ASSET = maya_asset.MayaAsset()
 DATABASE = database.Database()
 
+EXPORT_DURATION = metrics.histogram(
+    "export_duration_seconds", "The duration of the exports, by operation."
+)
+
 # layout methods
 
 
@@ -47,6 +51,10 @@ def import_reference(asset_name, times=1):
                     + "in modeling, cleaning or rig."
                 )
 
+    # load the local copy of the export, the scene still points to the export
+    if reference_cache.is_enabled():
+        reference_cache.install()
+
     # import the asset as reference
     for _ in range(times):
         cmds.file(
@@ -95,6 +103,8 @@ def get_exportable_animateds(pipe_nodes=None):
     return animateds
 
 
+@tracing.traced("bake animations")
+@metrics.timed(EXPORT_DURATION, operation="bake_animations")
 def bake_animations(pipe_nodes=None):
     """Bake the animations of all the specifyied assets.
 
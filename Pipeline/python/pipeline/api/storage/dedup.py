@@ -0,0 +1,411 @@
+"""Find the files having the same content in the workspace and deduplicate them.
+
+The files are first grouped by size, then by a hash of their beginning
+and end, and only the files still in a group get their whole content hashed.
+The hashes are cached by inode and modification time,
+so the files that didn't change are never read again.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from concurrent import futures
+
+from pipeline.api.assets import paths
+from pipeline.api.storage import mirror
+from pipeline.utils import database, executor, files, tracing, units
+
+PATHS = paths.Paths()
+
+# the files smaller than this are not worth deduplicating
+MIN_SIZE = 64 * 1024
+
+# the number of bytes hashed at the beginning and at the end of the files
+PARTIAL_SIZE = 64 * 1024
+
+# the number of files hashed at the same time
+WORKERS = 8
+
+# the name of the hashes cache in the data folder
+CACHE_FILE = "hashCache.json"
+
+# the ways to replace a duplicate by the file it duplicates
+REFLINK = "reflink"
+HARDLINK = "hardlink"
+
+# the linux ioctl cloning a file content, copy on write
+FICLONE = 0x40049409
+
+
+class HashCache(object):
+    """Store the hashes of the files by inode and modification time."""
+
+    def __init__(self, path=None):
+        """Load the cache.
+
+        :param path: The complete path to the cache file.
+            If none, use the one of the data folder.
+        :type path: str, none
+        """
+
+        self.path = path or os.path.join(database.Database().data_path, CACHE_FILE)
+
+        try:
+            with open(self.path, "r") as cache_file:
+                self._old = json.load(cache_file)
+        except (OSError, ValueError):
+            self._old = dict()
+
+        # only the hashes of the files seen are saved back
+        self._new = dict()
+
+    @staticmethod
+    def key(stats):
+        """Get the cache key of a file.
+
+        :param stats: The file stats.
+        :type stats: os.stat_result
+
+        :return: The key, the same for every hardlink of the file.
+        :rtype: str
+        """
+
+        return "{}:{}:{}:{}".format(
+            stats.st_dev, stats.st_ino, stats.st_mtime_ns, stats.st_size
+        )
+
+    def get(self, key):
+        """Get the hashes of a file.
+
+        :param key: The file key.
+        :type key: str
+
+        :return: The partial and full hashes, none if unknown.
+        :rtype: dict
+        """
+
+        hashes = self._new.get(key)
+        if hashes is None:
+            hashes = self._new[key] = self._old.get(key, dict())
+        return hashes
+
+    def save(self):
+        """Save the hashes of the files seen."""
+
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as cache_file:
+            json.dump(self._new, cache_file, separators=(",", ":"))
+        os.replace(temp_path, self.path)
+
+
+def partial_hash(path, size):
+    """Get the hash of the beginning and the end of a file.
+
+    :param path: The complete path to the file.
+    :type path: str
+    :param size: The file size.
+    :type size: int
+
+    :return: The hexadecimal hash.
+    :rtype: str
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        digest.update(file.read(PARTIAL_SIZE))
+        if size > PARTIAL_SIZE * 2:
+            file.seek(-PARTIAL_SIZE, os.SEEK_END)
+        digest.update(file.read(PARTIAL_SIZE))
+
+    return digest.hexdigest()
+
+
+def full_hash(path):
+    """Get the hash of the whole file, using its stored checksum if any.
+
+    :param path: The complete path to the file.
+    :type path: str
+
+    :return: The hexadecimal hash.
+    :rtype: str
+    """
+
+    return files.read_checksum(path) or files.content_checksum(path)
+
+
+def scan(workspace, min_size=MIN_SIZE):
+    """Get the files that could be duplicates.
+
+    :param workspace: The complete path to the workspace.
+    :type workspace: str
+    :param min_size: The minimum size of the files to look at.
+    :type min_size: int
+
+    :return: The stats of the files by complete path.
+    :rtype: dict
+    """
+
+    found = dict()
+    stack = [workspace]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name != ".git":
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False) and not entry.name.endswith(
+                    mirror.SKIPPED_EXTENSIONS
+                ):
+                    stats = entry.stat(follow_symlinks=False)
+                    if stats.st_size >= min_size:
+                        found[entry.path] = stats
+
+    return found
+
+
+def _group(candidates, hash_name, function, cache, workers):
+    """Split groups of files by a hash of their content.
+
+    :param candidates: The groups of cache keys having the same content so far,
+        with the path of one file of each key.
+    :type candidates: list
+    :param hash_name: The name of the hash in the cache.
+    :type hash_name: str
+    :param function: A callable receiving the path and the size of a file,
+        returning its hash.
+    :type function: callable
+    :param cache: The hashes cache.
+    :type cache: HashCache
+    :param workers: The number of files hashed at the same time.
+    :type workers: int
+
+    :return: The groups of keys still having the same content.
+    :rtype: list
+    """
+
+    # only hash the files missing from the cache
+    missing = {
+        key: (path, size)
+        for group in candidates
+        for key, path, size in group
+        if hash_name not in cache.get(key)
+    }
+    with futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        jobs = {
+            pool.submit(function, path, size): key
+            for key, (path, size) in missing.items()
+        }
+        for count, job in enumerate(futures.as_completed(jobs), 1):
+            executor.check_cancelled()
+            cache.get(jobs[job])[hash_name] = job.result()
+            executor.report_progress(count, len(jobs))
+
+    groups = list()
+    for group in candidates:
+        by_hash = dict()
+        for item in group:
+            by_hash.setdefault(cache.get(item[0])[hash_name], list()).append(item)
+        groups.extend(items for items in by_hash.values() if len(items) > 1)
+
+    return groups
+
+
+@tracing.traced("find duplicates")
+def find_duplicates(workspace=None, min_size=MIN_SIZE, workers=WORKERS, cache=None):
+    """Find the files having the same content.
+
+    The hardlinks of a same file are not duplicates, they already share their data.
+
+    :param workspace: The complete path to the directory to look in.
+        If none, use the current workspace.
+    :type workspace: str, none
+    :param min_size: The minimum size of the files to look at.
+    :type min_size: int
+    :param workers: The number of files hashed at the same time.
+    :type workers: int
+    :param cache: The hashes cache. If none, use the one of the data folder.
+    :type cache: HashCache, none
+
+    :return: The size of the files and their sorted complete paths,
+        by duplicate group, the groups reclaiming the most bytes first.
+    :rtype: list
+    """
+
+    workspace = workspace or PATHS.get_workspace()
+    cache = cache or HashCache()
+
+    # group the files by inode, the hardlinks are already deduplicated
+    by_key = dict()
+    for path, stats in scan(workspace, min_size).items():
+        by_key.setdefault(HashCache.key(stats), (stats.st_size, list()))[1].append(
+            path
+        )
+
+    # then by size
+    by_size = dict()
+    for key, (size, key_paths) in by_key.items():
+        by_size.setdefault(size, list()).append((key, key_paths[0], size))
+    candidates = [group for group in by_size.values() if len(group) > 1]
+
+    # then by partial and full hashes
+    candidates = _group(candidates, "partial", partial_hash, cache, workers)
+    candidates = _group(
+        candidates, "full", lambda path, size: full_hash(path), cache, workers
+    )
+    cache.save()
+
+    groups = [
+        (group[0][2], sorted(path for key, _, _ in group for path in by_key[key][1]))
+        for group in candidates
+    ]
+    groups.sort(key=lambda group: group[0] * (len(group[1]) - 1), reverse=True)
+
+    return groups
+
+
+def reclaimable(groups):
+    """Get the number of bytes deduplicating the groups would reclaim.
+
+    :param groups: The duplicate groups, see find_duplicates.
+    :type groups: list
+
+    :return: The number of bytes.
+    :rtype: int
+    """
+
+    total = 0
+    for size, group in groups:
+        inodes = {HashCache.key(os.stat(path)) for path in group}
+        total += size * (len(inodes) - 1)
+    return total
+
+
+def _reflink(source, destination):
+    """Make the destination share the source content, copy on write.
+
+    :param source: The complete path to the file to share.
+    :type source: str
+    :param destination: The complete path to the file to create.
+    :type destination: str
+    """
+
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError("# Pipeline : Reflinks are not supported on this platform")
+
+    with open(source, "rb") as source_file, open(destination, "wb") as dest_file:
+        fcntl.ioctl(dest_file.fileno(), FICLONE, source_file.fileno())
+
+
+def link(source, duplicate, mode=REFLINK):
+    """Replace a duplicate by a link to the file it duplicates, atomically.
+
+    A hardlink shares the file itself, modifying one of them modifies both.
+    A reflink only shares the data until one of them is modified,
+    but needs a file system supporting it (Btrfs, XFS, APFS, ReFS).
+
+    :param source: The complete path to the file to keep.
+    :type source: str
+    :param duplicate: The complete path to the file to replace.
+    :type duplicate: str
+    :param mode: The kind of link, REFLINK or HARDLINK.
+    :type mode: str
+    """
+
+    directory, basename = os.path.split(duplicate)
+    handle, temp_path = tempfile.mkstemp(
+        prefix="." + basename + ".", suffix=".tmp", dir=directory
+    )
+    os.close(handle)
+
+    try:
+        if mode == HARDLINK:
+            os.remove(temp_path)
+            os.link(source, temp_path)
+        else:
+            _reflink(source, temp_path)
+            shutil.copystat(duplicate, temp_path)
+        os.replace(temp_path, duplicate)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def deduplicate(groups, mode=REFLINK):
+    """Replace the duplicates of every group by links to the first file.
+
+    The files are hashed again before being replaced, in case they changed.
+
+    :param groups: The duplicate groups, see find_duplicates.
+    :type groups: list
+    :param mode: The kind of link, REFLINK or HARDLINK.
+    :type mode: str
+
+    :return: The number of bytes reclaimed.
+    :rtype: int
+    """
+
+    reclaimed = 0
+    for count, (size, group) in enumerate(groups):
+        executor.check_cancelled()
+        executor.report_progress(count, len(groups))
+
+        source = group[0]
+        source_stats = os.stat(source)
+        checksum = full_hash(source)
+        for duplicate in group[1:]:
+            stats = os.stat(duplicate)
+            if (stats.st_dev, stats.st_ino) == (
+                source_stats.st_dev,
+                source_stats.st_ino,
+            ) or stats.st_dev != source_stats.st_dev:
+                continue
+            if full_hash(duplicate) != checksum:
+                print("# Pipeline : File changed, not deduplicated -> " + duplicate)
+                continue
+
+            link(source, duplicate, mode)
+            reclaimed += size
+
+    return reclaimed
+
+
+def report(link_mode=None, workspace=None):
+    """Print the duplicate groups of the workspace and optionally deduplicate them.
+
+    :param link_mode: The kind of link to replace the duplicates with,
+        REFLINK or HARDLINK. If none, only report them.
+    :type link_mode: str, none
+    :param workspace: The complete path to the directory to look in.
+        If none, use the current workspace.
+    :type workspace: str, none
+
+    :return: The duplicate groups, see find_duplicates.
+    :rtype: list
+    """
+
+    groups = find_duplicates(workspace)
+    for size, group in groups:
+        print(
+            "# Pipeline : {} duplicates of ~ {} {} :\n    {}".format(
+                len(group), *units.convert_byte(size), "\n    ".join(group)
+            )
+        )
+    print(
+        "# Pipeline : {} duplicate groups, ~ {} {} reclaimable".format(
+            len(groups), *units.convert_byte(reclaimable(groups))
+        )
+    )
+
+    if link_mode is not None:
+        print(
+            "# Pipeline : Deduplicated, ~ {} {} reclaimed".format(
+                *units.convert_byte(deduplicate(groups, link_mode))
+            )
+        )
+
+    return groups
@@ -0,0 +1,391 @@
+"""Keep a local copy of the exports referenced from the shared workspace.
+
+Every export has a single cached copy, at a path only depending on the export
+path, refreshed in place when a new version is exported. So a path handed out
+by the cache stays valid. The scenes keep referencing the shared export,
+the local copy is only swapped in when the reference is loaded.
+
+The least recently used copies are evicted once the cache gets bigger than its
+maximum size, except the ones pinned by the opened scene. An evicted copy
+is remembered, so it can be copied again if a scene still asks for it.
+A cached copy is populated with a verified copy, so it is never seen truncated.
+
+The checksum is the one stored next to the export by the pipeline copies,
+the size and modification time of the export being used without one.
+So checking if a copy is fresh never reads the export itself,
+and a hit only marks the index to save, once the scene is loaded.
+"""
+
+import atexit
+import collections
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from pipeline.utils import files, metrics
+
+# the folder of the cache on the local disk
+DIRECTORY = os.path.join(
+    os.environ.get("LOCALAPPDATA", os.path.join(os.path.expanduser("~"), ".cache")),
+    "pipeline",
+    "exports",
+)
+
+# the maximum number of bytes kept in the cache
+MAX_SIZE = 20 * 1024 * 1024 * 1024
+
+# the name of the cache index in the cache folder
+INDEX_FILE = "index.json"
+
+# the name of the folders the exports are in, the only references cached
+EXPORT_FOLDER = "export"
+
+REQUESTS = metrics.counter(
+    "export_cache_requests_total", "The cached exports requested, by result."
+)
+CACHE_SIZE = metrics.gauge("export_cache_bytes", "The size of the cached exports.")
+
+
+class ExportCache(object):
+    """Read through local cache of the exports with a LRU eviction."""
+
+    def __init__(self, directory=DIRECTORY, max_size=MAX_SIZE):
+        """Initialize the cache.
+
+        :param directory: The complete path to the cache folder.
+        :type directory: str
+        :param max_size: The maximum number of bytes kept in the cache.
+        :type max_size: int
+        """
+
+        self.directory = directory
+        self.max_size = max_size
+
+        # the hits, misses, bytes served from the cache and bytes copied in it
+        self.statistics = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "bytes_served": 0,
+            "bytes_copied": 0,
+        }
+
+        self._lock = threading.Lock()
+        self._index = None
+        # the hits changed the index since it was saved
+        self._dirty = False
+
+        # a copy of an export is only made by one thread at a time
+        self._copy_locks = collections.defaultdict(threading.Lock)
+
+        # the keys of the copies referenced by the opened scene
+        self._pinned = set()
+
+    # manage the index
+
+    @property
+    def index(self):
+        """Get the cached copies, loaded on first use.
+
+        :return: The {"source", "path", "checksum", "size", "used"} entries by key.
+            The checksum of the evicted copies is none.
+        :rtype: dict
+        """
+
+        if self._index is None:
+            try:
+                with open(os.path.join(self.directory, INDEX_FILE), "r") as index:
+                    self._index = json.load(index)
+            except (OSError, ValueError):
+                self._index = dict()
+
+        return self._index
+
+    def _save_index(self):
+        """Save the cached copies, atomically."""
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, INDEX_FILE)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as index:
+            json.dump(self.index, index, separators=(",", ":"))
+        os.replace(temp_path, path)
+        self._dirty = False
+
+    def flush(self):
+        """Save the index if the hits changed it since it was saved."""
+
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    @property
+    def size(self):
+        """Get the number of bytes in the cache.
+
+        :return: The size of the cached copies.
+        :rtype: int
+        """
+
+        return sum(entry["size"] for entry in self.index.values())
+
+    # use the cache
+
+    @staticmethod
+    def get_key(source):
+        """Get the key of an export and the checksum of its current version.
+
+        :param source: The complete path to the export.
+        :type source: str
+
+        :return: The export path hash and the export checksum.
+        :rtype: tuple
+        """
+
+        checksum = files.read_checksum(source)
+        if checksum is None:
+            stats = os.stat(source)
+            checksum = "{}-{}".format(stats.st_size, stats.st_mtime_ns)
+
+        return ExportCache._hash_path(source), checksum[:32]
+
+    def get_path(self, source):
+        """Get the path of the cached copy of an export, whatever its version.
+
+        :param source: The complete path to the export.
+        :type source: str
+
+        :return: The complete path to the cached copy, that may not exist.
+        :rtype: str
+        """
+
+        return os.path.join(
+            self.directory, self._hash_path(source), os.path.basename(source)
+        )
+
+    def get_fresh(self, source):
+        """Get the cached copy of an export if it is up to date, without copying.
+
+        :param source: The complete path to the export.
+        :type source: str
+
+        :return: The complete path to the cached copy, none if there is no fresh copy.
+        :rtype: str, none
+        """
+
+        key, checksum = self.get_key(source)
+        with self._lock:
+            entry = self.index.get(key)
+            if (
+                entry is None
+                or entry["checksum"] != checksum
+                or not os.path.isfile(entry["path"])
+            ):
+                return None
+
+            entry["used"] = time.time()
+            REQUESTS.inc(result="hit")
+            self.statistics["hits"] += 1
+            self.statistics["bytes_served"] += entry["size"]
+            # a scene loads many references, the index is saved once after them
+            self._dirty = True
+
+        return entry["path"]
+
+    def get(self, source):
+        """Get the cached copy of an export, copying it in the cache if needed.
+
+        An outdated copy is refreshed in place.
+
+        :param source: The complete path to the export.
+        :type source: str
+
+        :return: The complete path to the cached copy,
+            the export itself if its outdated copy can't be replaced.
+        :rtype: str
+        """
+
+        key = self._hash_path(source)
+        with self._lock:
+            copy_lock = self._copy_locks[key]
+
+        # an other thread may be copying the same export, wait for it
+        with copy_lock:
+            cached = self.get_fresh(source)
+            if cached is not None:
+                return cached
+
+            _, checksum = self.get_key(source)
+            path = self.get_path(source)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                files.copy_verified(source, path)
+            except OSError:
+                # the outdated copy is still opened on windows, use the export
+                if not os.path.isfile(path):
+                    raise
+                print("# Pipeline : Cached copy in use, using the export -> " + source)
+                return source
+            size = os.path.getsize(path)
+
+            with self._lock:
+                self.index[key] = {
+                    "source": source,
+                    "path": path,
+                    "checksum": checksum,
+                    "size": size,
+                    "used": time.time(),
+                }
+                REQUESTS.inc(result="miss")
+                self.statistics["misses"] += 1
+                self.statistics["bytes_copied"] += size
+
+                self._trim()
+                self._save_index()
+                CACHE_SIZE.set(self.size)
+
+        return path
+
+    def find_source(self, path):
+        """Get the export a path of the cache is the copy of.
+
+        :param path: The complete path to a cached copy, evicted or not.
+        :type path: str
+
+        :return: The complete path to the export, none if the path isn't a copy.
+        :rtype: str, none
+        """
+
+        path = os.path.normcase(os.path.abspath(path))
+        with self._lock:
+            for entry in self.index.values():
+                if os.path.normcase(os.path.abspath(entry["path"])) == path:
+                    return entry["source"]
+
+        return None
+
+    def resolve(self, path):
+        """Get the local copy to load instead of a referenced file.
+
+        :param path: The complete path to the referenced file,
+            an export or a copy saved in a scene.
+        :type path: str
+
+        :return: The complete path to the fresh local copy,
+            none if the file must be loaded as it is.
+        :rtype: str, none
+        """
+
+        source = self.find_source(path) or path
+        if not os.path.isfile(source):
+            return None
+
+        # only the exports are cached, not every file a scene could reference
+        if os.path.basename(os.path.dirname(source)) != EXPORT_FOLDER:
+            return None
+
+        return self.get(source)
+
+    def pin(self, path):
+        """Never evict the copy of an export, until unpinned.
+
+        :param path: The complete path to the export or to its copy.
+        :type path: str
+        """
+
+        source = self.find_source(path) or path
+        with self._lock:
+            self._pinned.add(self._hash_path(source))
+
+    def unpin_all(self):
+        """Let every copy be evicted again, once the scene is closed."""
+
+        with self._lock:
+            self._pinned.clear()
+            if self._dirty:
+                self._save_index()
+
+    def clear(self):
+        """Remove every cached copy that isn't pinned nor in use."""
+
+        with self._lock:
+            for key in list(self.index):
+                if key not in self._pinned:
+                    self._evict(key)
+            self._save_index()
+            CACHE_SIZE.set(self.size)
+
+    # private methods
+
+    @staticmethod
+    def _hash_path(source):
+        """Get the key of an export, from its path only.
+
+        :param source: The complete path to the export.
+        :type source: str
+
+        :return: The hexadecimal hash of the path.
+        :rtype: str
+        """
+
+        return hashlib.blake2b(
+            os.path.normcase(os.path.abspath(source)).encode("utf-8"), digest_size=16
+        ).hexdigest()
+
+    def _trim(self):
+        """Evict the least recently used copies until the cache is small enough."""
+
+        entries = sorted(self.index.items(), key=lambda item: item[1]["used"])
+        size = self.size
+        for key, entry in entries:
+            if size <= self.max_size:
+                break
+            copy_size = entry["size"]
+            if not copy_size or key in self._pinned:
+                continue
+            if self._evict(key):
+                size -= copy_size
+
+    def _evict(self, key):
+        """Remove a cached copy, remembering what it was the copy of.
+
+        :param key: The key of the copy.
+        :type key: str
+
+        :return: True if the copy was removed, False if it is still in use.
+        :rtype: bool
+        """
+
+        entry = self.index[key]
+        if os.path.exists(entry["path"]):
+            # move the copy away first, a reader may still hold it open on windows
+            trash = tempfile.mkdtemp(prefix=".evicted.", dir=self.directory)
+            try:
+                os.replace(entry["path"], os.path.join(trash, "copy"))
+            except OSError:
+                # still opened, keep it in the index to evict it later
+                os.rmdir(trash)
+                return False
+            shutil.rmtree(trash, ignore_errors=True)
+
+        # the checksum is left next to the copy by the verified copies
+        for extension in files.SIDECAR_EXTENSIONS:
+            if os.path.exists(entry["path"] + extension):
+                os.remove(entry["path"] + extension)
+
+        # remember the export, a scene saved with the copy path may ask for it
+        entry.update({"checksum": None, "size": 0})
+        self.statistics["evictions"] += 1
+
+        return True
+
+
+# the cache shared by the whole pipeline
+CACHE = ExportCache()
+
+# keep the last uses of the copies when maya quits with a scene opened
+atexit.register(CACHE.flush)
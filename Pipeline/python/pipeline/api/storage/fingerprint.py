@@ -0,0 +1,310 @@
+"""Fingerprint the workspace to find what changed since last time.
+
+A snapshot is a Merkle tree of the workspace: every directory gets a hash
+of the name, size and modification time of its files and of the hashes
+of its sub folders. Two snapshots are diffed by only going down
+the directories whose hash changed.
+
+A new snapshot can reuse the previous one: a directory whose modification time
+didn't change has the same entries, so only its sub folders are looked at
+and its files are not listed nor stat again. The files rewritten in place,
+without the rename every pipeline write does, don't change their directory:
+take a full snapshot to see them.
+
+A node is a dict with "hash", "mtime_ns", "files" ({name: [size, mtime_ns]})
+and "dirs" ({name: node}) keys. The root node also has a "time_ns" key,
+the time the snapshot was taken.
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent import futures
+
+from pipeline.api.assets import paths
+from pipeline.utils import database, executor, tracing
+
+PATHS = paths.Paths()
+
+# the name of the snapshot of the workspace in the data folder
+SNAPSHOT_FILE = "workspaceSnapshot.json"
+
+# the folders never fingerprinted
+SKIPPED_FOLDERS = (".git",)
+
+# the number of top level folders fingerprinted at the same time
+WORKERS = 8
+
+# the directories modified that close to the previous snapshot are listed again,
+# the file systems with a coarse time may not have seen a later change
+RACY_WINDOW = 2 * 10**9
+
+
+def _hash_node(files, dirs):
+    """Get the hash of a directory from its content.
+
+    :param files: The [size, mtime_ns] by file name.
+    :type files: dict
+    :param dirs: The node by sub folder name.
+    :type dirs: dict
+
+    :return: The hexadecimal hash.
+    :rtype: str
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+    for name in sorted(files):
+        digest.update("f\0{}\0{}\0{}\n".format(name, *files[name]).encode("utf-8"))
+    for name in sorted(dirs):
+        digest.update("d\0{}\0{}\n".format(name, dirs[name]["hash"]).encode("utf-8"))
+
+    return digest.hexdigest()
+
+
+def _scan(directory):
+    """List a directory, with a single stat call per file.
+
+    :param directory: The complete path to the directory.
+    :type directory: str
+
+    :return: The [size, mtime_ns] by file name and the sub folders names.
+    :rtype: tuple
+    """
+
+    files = dict()
+    folders = list()
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in SKIPPED_FOLDERS:
+                    folders.append(entry.name)
+            else:
+                stats = entry.stat(follow_symlinks=False)
+                files[entry.name] = [stats.st_size, stats.st_mtime_ns]
+
+    return files, folders
+
+
+def snapshot_directory(directory, previous=None, trusted=0):
+    """Get the Merkle tree of a directory.
+
+    :param directory: The complete path to the directory.
+    :type directory: str
+    :param previous: The node of the directory in the previous snapshot.
+        If none, every file is listed.
+    :type previous: dict, none
+    :param trusted: The time before which the previous modification times
+        can be trusted, see RACY_WINDOW.
+    :type trusted: int
+
+    :return: The directory node.
+    :rtype: dict
+    """
+
+    executor.check_cancelled()
+
+    # stat before listing, so a change while listing is seen next time
+    mtime_ns = os.stat(directory).st_mtime_ns
+
+    # the same entries as last time, only the sub folders may have changed
+    if (
+        previous is not None
+        and previous.get("mtime_ns") == mtime_ns
+        and mtime_ns < trusted
+    ):
+        files = previous["files"]
+        folders = list(previous["dirs"])
+    else:
+        files, folders = _scan(directory)
+
+    previous_dirs = previous["dirs"] if previous is not None else dict()
+    dirs = {
+        name: snapshot_directory(
+            os.path.join(directory, name), previous_dirs.get(name), trusted
+        )
+        for name in folders
+    }
+
+    # nothing changed below, keep the hash
+    if (
+        previous is not None
+        and files is previous["files"]
+        and all(dirs[name]["hash"] == previous_dirs[name]["hash"] for name in dirs)
+    ):
+        digest = previous["hash"]
+    else:
+        digest = _hash_node(files, dirs)
+
+    return {"hash": digest, "mtime_ns": mtime_ns, "files": files, "dirs": dirs}
+
+
+@tracing.traced("snapshot")
+def snapshot(root=None, workers=WORKERS, previous=None):
+    """Get the Merkle tree of the workspace, its top level folders in parallel.
+
+    :param root: The complete path to the directory to fingerprint.
+        If none, use the current workspace.
+    :type root: str, none
+    :param workers: The number of top level folders fingerprinted at the same time.
+    :type workers: int
+    :param previous: The previous snapshot of the directory, to only list
+        the directories modified since. If none, every file is listed.
+    :type previous: dict, none
+
+    :return: The root node.
+    :rtype: dict
+    """
+
+    root = root or PATHS.get_workspace()
+    time_ns = time.time_ns()
+
+    trusted = 0
+    previous_dirs = dict()
+    if previous is not None and "time_ns" in previous:
+        trusted = previous["time_ns"] - RACY_WINDOW
+        previous_dirs = previous["dirs"]
+
+    mtime_ns = os.stat(root).st_mtime_ns
+    files, folders = _scan(root)
+
+    with futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        jobs = {
+            name: pool.submit(
+                snapshot_directory,
+                os.path.join(root, name),
+                previous_dirs.get(name),
+                trusted,
+            )
+            for name in folders
+        }
+        dirs = {name: job.result() for name, job in jobs.items()}
+
+    return {
+        "hash": _hash_node(files, dirs),
+        "mtime_ns": mtime_ns,
+        "time_ns": time_ns,
+        "files": files,
+        "dirs": dirs,
+    }
+
+
+def iter_files(node, prefix=""):
+    """Get every file of a tree.
+
+    :param node: The tree root node.
+    :type node: dict
+    :param prefix: The relative path of the node, ending with "/" if not empty.
+    :type prefix: str
+
+    :return: The relative paths of the files, with "/" separators.
+    :rtype: generator
+    """
+
+    for name in node["files"]:
+        yield prefix + name
+    for name, child in node["dirs"].items():
+        yield from iter_files(child, prefix + name + "/")
+
+
+def diff(old, new, prefix=""):
+    """Get the files created, deleted or modified between two snapshots.
+
+    Only the directories whose hash changed are looked into.
+
+    :param old: The root node of the previous snapshot. If none, every file changed.
+    :type old: dict, none
+    :param new: The root node of the new snapshot.
+    :type new: dict
+    :param prefix: The relative path of the nodes, ending with "/" if not empty.
+    :type prefix: str
+
+    :return: The relative paths of the changed files, with "/" separators.
+    :rtype: generator
+    """
+
+    if old is None:
+        yield from iter_files(new, prefix)
+        return
+
+    if old["hash"] == new["hash"]:
+        return
+
+    # compare the files
+    old_files, new_files = old["files"], new["files"]
+    for name, stats in new_files.items():
+        if old_files.get(name) != stats:
+            yield prefix + name
+    for name in old_files:
+        if name not in new_files:
+            yield prefix + name
+
+    # only go down the folders that changed
+    old_dirs, new_dirs = old["dirs"], new["dirs"]
+    for name, child in new_dirs.items():
+        yield from diff(old_dirs.get(name), child, prefix + name + "/")
+    for name, child in old_dirs.items():
+        if name not in new_dirs:
+            yield from iter_files(child, prefix + name + "/")
+
+
+def load(path=None):
+    """Get a snapshot saved on disk.
+
+    :param path: The complete path to the snapshot file.
+        If none, use the one of the data folder.
+    :type path: str, none
+
+    :return: The root node. None if there is no snapshot yet.
+    :rtype: dict, none
+    """
+
+    path = path or os.path.join(database.Database().data_path, SNAPSHOT_FILE)
+
+    try:
+        with open(path, "r") as snapshot_file:
+            return json.load(snapshot_file)
+    except (OSError, ValueError):
+        return None
+
+
+def save(tree, path=None):
+    """Save a snapshot on disk, atomically.
+
+    :param tree: The root node.
+    :type tree: dict
+    :param path: The complete path to the snapshot file.
+        If none, use the one of the data folder.
+    :type path: str, none
+    """
+
+    path = path or os.path.join(database.Database().data_path, SNAPSHOT_FILE)
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as snapshot_file:
+        json.dump(tree, snapshot_file, separators=(",", ":"))
+    os.replace(temp_path, path)
+
+
+def changes(root=None, path=None, full=False):
+    """Get the files changed since the last call and save the new snapshot.
+
+    :param root: The complete path to the directory to fingerprint.
+        If none, use the current workspace.
+    :type root: str, none
+    :param path: The complete path to the snapshot file.
+        If none, use the one of the data folder.
+    :type path: str, none
+    :param full: Wether or not to list every file again, to see the files
+        rewritten in place too.
+    :type full: bool
+
+    :return: The relative paths of the changed files, with "/" separators.
+    :rtype: generator
+    """
+
+    old = load(path)
+    new = snapshot(root, previous=None if full else old)
+    save(new, path)
+
+    return diff(old, new)
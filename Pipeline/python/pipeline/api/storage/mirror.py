@@ -0,0 +1,302 @@
+"""Mirror the DEF, export and publish folders of the workspace to an other directory.
+
+A manifest stored in the target remembers the size, modification time
+and checksum of every file mirrored, so only the files that changed
+since the last sync are transferred.
+
+Between two local folders, or towards a network share, the files are copied :
+a delta reads the basis too and writes the whole file anyway. Only when the
+workspace is on a network share and the target is local (eg: an unreal machine
+pulling the publishes) are the large maya and fbx files already in the target
+rebuilt with an rsync delta, from their local blocks and the changes.
+"""
+
+import json
+import os
+import shutil
+from concurrent import futures
+
+from pipeline.api.assets import paths
+from pipeline.api.storage import rsync
+from pipeline.utils import executor, files, metrics, tracing, units
+
+PATHS = paths.Paths()
+
+FILES_SCANNED = metrics.counter("files_scanned_total", "The files scanned, by walker.")
+
+# the folders mirrored with everything they contain
+MIRRORED_FOLDERS = ("DEF", "export", "publish")
+
+# the folders never containing anything to mirror
+SKIPPED_FOLDERS = ("WIP", ".git")
+
+# the files written by the pipeline next to the files, never mirrored as is
+SKIPPED_EXTENSIONS = files.SIDECAR_EXTENSIONS + (".tmp",)
+
+# the files updated with a delta when they already are in the target
+DELTA_EXTENSIONS = (".ma", ".fbx")
+DELTA_THRESHOLD = 16 * 1024 * 1024
+
+# the prefixes of the network share paths, the other paths are local
+REMOTE_PREFIXES = ("\\\\", "//")
+
+# the name of the manifest stored at the root of the target
+MANIFEST = ".pipeline_mirror.json"
+
+# the number of files transferred at the same time
+WORKERS = 8
+
+
+def scan(workspace):
+    """Get the files to mirror, with a single stat call per file.
+
+    :param workspace: The complete path to the workspace.
+    :type workspace: str
+
+    :return: The size and modification time by path relative to the workspace,
+        with "/" separators.
+    :rtype: dict
+    """
+
+    found = dict()
+    stack = [(workspace, "", False)]
+    while stack:
+        directory, relative, mirrored = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = relative + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in SKIPPED_FOLDERS:
+                        continue
+                    stack.append(
+                        (
+                            entry.path,
+                            name + "/",
+                            mirrored or entry.name in MIRRORED_FOLDERS,
+                        )
+                    )
+                elif mirrored and not entry.name.endswith(SKIPPED_EXTENSIONS):
+                    FILES_SCANNED.inc(walker="mirror")
+                    stats = entry.stat()
+                    found[name] = (stats.st_size, stats.st_mtime_ns)
+
+    return found
+
+
+def read_manifest(target):
+    """Get the files mirrored by the last sync.
+
+    :param target: The complete path to the mirror directory.
+    :type target: str
+
+    :return: The [size, modification time, checksum] by relative path.
+    :rtype: dict
+    """
+
+    try:
+        with open(os.path.join(target, MANIFEST), "r") as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return dict()
+
+
+def write_manifest(target, manifest):
+    """Store the files mirrored, atomically.
+
+    :param target: The complete path to the mirror directory.
+    :type target: str
+    :param manifest: The [size, modification time, checksum] by relative path.
+    :type manifest: dict
+    """
+
+    path = os.path.join(target, MANIFEST)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as manifest_file:
+        json.dump(manifest, manifest_file, separators=(",", ":"))
+    os.replace(temp_path, path)
+
+
+def is_synced(destination, stats, record):
+    """Get if a file is already mirrored, without reading it.
+
+    :param destination: The complete path to the file in the target.
+    :type destination: str
+    :param stats: The source size and modification time.
+    :type stats: tuple
+    :param record: The manifest record of the file, none if not mirrored yet.
+    :type record: list, none
+
+    :return: True if the file doesn't need to be transferred.
+    :rtype: bool
+    """
+
+    if record is None or tuple(record[:2]) != stats:
+        return False
+
+    # the mirrored file may have been deleted or modified in the target
+    try:
+        return os.path.getsize(destination) == stats[0]
+    except OSError:
+        return False
+
+
+def is_remote(path):
+    """Get if a path is on a network share. (eg: \\\\server\\share)
+
+    :param path: The complete path.
+    :type path: str
+
+    :return: True if the path is a network share path.
+    :rtype: bool
+    """
+
+    return path.startswith(REMOTE_PREFIXES)
+
+
+def transfer(source, destination, record=None):
+    """Transfer a file to the target, the cheapest way possible.
+
+    :param source: The complete path to the file to mirror.
+    :type source: str
+    :param destination: The complete path to the file in the target.
+    :type destination: str
+    :param record: The manifest record of the file, none if not mirrored yet.
+    :type record: list, none
+
+    :return: The way it was transferred ("touched", "patched" or "copied"),
+        the number of bytes that changed and the file checksum.
+    :rtype: tuple
+    """
+
+    exists = os.path.isfile(destination)
+
+    # the file was only touched, its content is the same
+    # only trust the stored checksums, the transfers below read the file anyway
+    if record is not None and exists:
+        checksum = files.read_checksum(source)
+        if (
+            checksum is not None
+            and checksum == record[2]
+            and os.path.getsize(destination) == os.path.getsize(source)
+        ):
+            shutil.copystat(source, destination)
+            return "touched", 0, checksum
+
+    # only read the changes of the large remote files, the rest is local
+    if (
+        exists
+        and is_remote(source)
+        and not is_remote(destination)
+        and source.lower().endswith(DELTA_EXTENSIONS)
+        and os.path.getsize(source) >= DELTA_THRESHOLD
+    ):
+        try:
+            literal, checksum = rsync.transfer(source, destination)
+        except rsync.DeltaAborted:
+            pass
+        else:
+            # the checksum stored next to the previous file is outdated
+            if os.path.exists(destination + files.CHECKSUM_EXTENSION):
+                os.remove(destination + files.CHECKSUM_EXTENSION)
+            return "patched", literal, checksum
+
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    files.copy_verified(source, destination)
+
+    return "copied", os.path.getsize(destination), files.read_checksum(destination)
+
+
+@tracing.traced("mirror")
+def sync(target, workspace=None, delete=True, workers=WORKERS):
+    """Mirror the DEF, export and publish folders of the workspace to the target.
+
+    Only the files that changed since the last sync are transferred,
+    in parallel. The manifest is saved even if the sync is interrupted,
+    so the next one starts where it stopped.
+
+    :param target: The complete path to the mirror directory.
+    :type target: str
+    :param workspace: The complete path to the workspace to mirror.
+        If none, use the current workspace.
+    :type workspace: str, none
+    :param delete: Wether or not to delete the files mirrored by a previous sync
+        that are not in the workspace anymore.
+    :type delete: bool
+    :param workers: The number of files transferred at the same time.
+    :type workers: int
+
+    :return: The number of files by way they were transferred or deleted.
+    :rtype: dict
+    """
+
+    workspace = workspace or PATHS.get_workspace()
+    os.makedirs(target, exist_ok=True)
+
+    found = scan(workspace)
+    manifest = read_manifest(target)
+
+    counts = {"touched": 0, "patched": 0, "copied": 0, "deleted": 0}
+    changed_bytes = 0
+
+    # remove the files that are not in the workspace anymore
+    for relative in [relative for relative in manifest if relative not in found]:
+        if delete:
+            destination = os.path.join(target, relative)
+            if os.path.exists(destination):
+                files.remove_file(destination)
+            counts["deleted"] += 1
+        del manifest[relative]
+
+    changed = [
+        relative
+        for relative, stats in found.items()
+        if not is_synced(
+            os.path.join(target, relative), stats, manifest.get(relative)
+        )
+    ]
+
+    # count what the transfers write in the mirror span
+    transfer_file = tracing.bind(transfer)
+
+    try:
+        with futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            jobs = {
+                pool.submit(
+                    transfer_file,
+                    os.path.join(workspace, relative),
+                    os.path.join(target, relative),
+                    manifest.get(relative),
+                ): relative
+                for relative in changed
+            }
+            for count, job in enumerate(futures.as_completed(jobs), 1):
+                relative = jobs[job]
+                try:
+                    executor.check_cancelled()
+                except executor.Cancelled:
+                    for pending in jobs:
+                        pending.cancel()
+                    raise
+
+                way, job_bytes, checksum = job.result()
+                counts[way] += 1
+                changed_bytes += job_bytes
+                manifest[relative] = list(found[relative]) + [checksum]
+                executor.report_progress(count, len(changed))
+    finally:
+        write_manifest(target, manifest)
+
+    print(
+        "# Pipeline : Mirrored {} files -> {} ({} copied, {} patched, {} touched, "
+        "{} deleted, ~ {} {} changed)".format(
+            len(found),
+            target,
+            counts["copied"],
+            counts["patched"],
+            counts["touched"],
+            counts["deleted"],
+            *units.convert_byte(changed_bytes)
+        )
+    )
+
+    return counts
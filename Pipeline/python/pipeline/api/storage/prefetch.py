@@ -0,0 +1,182 @@
+"""Read the files of an asset ahead, so they are already local when opened.
+
+When an asset is selected, its latest WIP scene and the exports it references
+are pulled in the system file cache in a background thread.
+Where the system supports it the kernel is only advised to read the file,
+else it is read sequentially. The reading is throttled not to saturate
+the network, and it stops as soon as an other asset is selected.
+"""
+
+import os
+import re
+import threading
+import time
+from concurrent import futures
+
+from pipeline.api.assets import paths
+from pipeline.utils import files
+
+PATHS = paths.Paths()
+
+# the maximum number of bytes read ahead per second
+RATE = 64 * 1024 * 1024
+
+# the maya ascii reference statements, the referenced path being the last string
+REFERENCE = re.compile(rb'^file .*-r.*"([^"]+)";$')
+
+
+def get_references(path):
+    """Get the files referenced by a maya ascii scene, reading its header only.
+
+    :param path: The complete path to the .ma file.
+    :type path: str
+
+    :return: The complete paths to the referenced files that exist.
+    :rtype: list
+    """
+
+    references = list()
+    statement = b""
+    with open(path, "rb") as scene:
+        for line in scene:
+            if not statement:
+                if line.startswith(files.MAYA_HEADER_END):
+                    break
+                if not line.startswith(b"file "):
+                    continue
+
+            # maya wraps the long statements, the path being on the next lines
+            statement = (statement + b" " + line.strip()).lstrip()
+            if not statement.endswith(b";"):
+                continue
+
+            match = REFERENCE.match(statement)
+            statement = b""
+            if match:
+                reference = os.path.normpath(match.group(1).decode("utf-8"))
+                if reference not in references and os.path.isfile(reference):
+                    references.append(reference)
+
+    return references
+
+
+class Prefetcher(object):
+    """Read the files of the selected asset ahead in a background thread."""
+
+    def __init__(self, rate=RATE):
+        """Initialize the prefetcher.
+
+        :param rate: The maximum number of bytes read ahead per second.
+        :type rate: int
+        """
+
+        self.rate = rate
+
+        self._pool = futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="PipelinePrefetch"
+        )
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def prefetch(self, name):
+        """Read the latest scene of an asset task and its references ahead.
+
+        It cancels the previous prefetch.
+
+        :param name: The asset task name. (eg: "ch_character_mod")
+        :type name: str
+
+        :return: The future of the number of bytes read ahead.
+        :rtype: Future
+        """
+
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+
+        return self._pool.submit(self._prefetch, name, generation)
+
+    def cancel(self):
+        """Stop the running prefetch."""
+
+        with self._lock:
+            self._generation += 1
+
+    def read_ahead(self, path, generation=None):
+        """Pull a file in the system file cache, throttled.
+
+        :param path: The complete path to the file.
+        :type path: str
+        :param generation: The prefetch the read belongs to.
+            If none, the read can't be cancelled.
+        :type generation: int, none
+
+        :return: The number of bytes read ahead, the file may be partially read
+            if the prefetch was cancelled.
+        :rtype: int
+        """
+
+        advise = getattr(os, "posix_fadvise", None)
+
+        start = time.monotonic()
+        done = 0
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            while done < size:
+                if generation is not None and generation != self._generation:
+                    break
+
+                # let the kernel read the file asynchronously, else read it
+                if advise is not None:
+                    advise(
+                        file.fileno(), done, files.CHUNK_SIZE, os.POSIX_FADV_WILLNEED
+                    )
+                    done += files.CHUNK_SIZE
+                else:
+                    chunk = file.read(files.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    done += len(chunk)
+
+                # wait not to read faster than the rate
+                delay = done / self.rate - (time.monotonic() - start)
+                if delay > 0:
+                    time.sleep(delay)
+
+        return min(done, size)
+
+    def _prefetch(self, name, generation):
+        """Read the latest scene of an asset task and its references ahead.
+
+        :param name: The asset task name.
+        :type name: str
+        :param generation: The prefetch it is.
+        :type generation: int
+
+        :return: The number of bytes read ahead.
+        :rtype: int
+        """
+
+        # an other asset was selected while it was waiting
+        if generation != self._generation:
+            return 0
+
+        directory = PATHS.get_path_from_name(name)
+        latest = PATHS.get_latest_file(directory, ".ma", restore=False)
+        if latest is None:
+            return 0
+
+        # the latest file may only be compressed, it will be restored when opened
+        path = os.path.join(directory, latest)
+        if not os.path.isfile(path):
+            return 0
+
+        done = 0
+        for file in [path] + get_references(path):
+            done += self.read_ahead(file, generation)
+
+        return done
+
+
+# the prefetcher shared by the whole pipeline
+PREFETCHER = Prefetcher()
@@ -0,0 +1,268 @@
+"""Rebuild a file from its previous version, the rsync way.
+
+The basis file (the previous version of the file, on the destination side)
+is cut into blocks and a weak rolling checksum and a strong checksum
+are computed for each one. The new file is then compared block by block
+with the basis and, where a block doesn't match, scanned byte by byte
+with the rolling checksum to find the next block it has in common with the basis,
+whatever its offset. The new file is rebuilt from the basis blocks
+and the literal data that couldn't be matched.
+
+The whole new file is read and the whole rebuilt file is written, so a delta
+never does less I/O than a copy on a single machine : it is only worth it
+when the basis is local and the new file is remote, the basis blocks being read
+locally and only the new file crossing the network, once. See mirror.transfer.
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import zlib
+
+from pipeline.utils import executor, files, tracing
+
+# the smallest block size, small blocks mean more checksums to compute
+MIN_BLOCK_SIZE = 4096
+
+# the modulo of the adler32 rolling checksum parts
+ADLER_MODULO = 65521
+
+# abort the delta if no block matched for that many bytes, a copy is faster then
+MAX_LITERAL = 8 * 1024 * 1024
+
+
+class DeltaAborted(Exception):
+    """Raised when the files are too different for a delta to be worth it."""
+
+
+def block_size_for(size):
+    """Get the block size to use for a file.
+
+    :param size: The file size in bytes.
+    :type size: int
+
+    :return: The block size in bytes.
+    :rtype: int
+    """
+
+    return max(MIN_BLOCK_SIZE, int(math.sqrt(size)) // 8 * 8)
+
+
+def weak_checksum(block):
+    """Get the rolling checksum of a block, an adler32 computed in C.
+
+    :param block: The block content.
+    :type block: bytes
+
+    :return: The checksum, its two 16 bits parts can be rolled, see roll.
+    :rtype: int
+    """
+
+    return zlib.adler32(block)
+
+
+def roll(checksum, removed, added, block_size):
+    """Move the rolling checksum of a block one byte further.
+
+    :param checksum: The checksum of the block, see weak_checksum.
+    :type checksum: int
+    :param removed: The first byte of the block.
+    :type removed: int
+    :param added: The byte following the block.
+    :type added: int
+    :param block_size: The block size in bytes.
+    :type block_size: int
+
+    :return: The checksum of the next block.
+    :rtype: int
+    """
+
+    # a is 1 + the sum of the bytes, b the sum of the running a
+    a = (checksum & 0xFFFF) - removed + added
+    b = (checksum >> 16) - block_size * removed + a - 1
+    return (a % ADLER_MODULO) | ((b % ADLER_MODULO) << 16)
+
+
+def strong_checksum(block):
+    """Get the strong checksum of a block.
+
+    :param block: The block content.
+    :type block: bytes
+
+    :return: The checksum.
+    :rtype: bytes
+    """
+
+    return hashlib.blake2b(block, digest_size=16).digest()
+
+
+def signature(basis, block_size):
+    """Get the checksums of every complete block of the basis file.
+
+    :param basis: The complete path to the basis file.
+    :type basis: str
+    :param block_size: The block size in bytes.
+    :type block_size: int
+
+    :return: The block indices by strong checksum by weak checksum,
+        and the strong checksum of every block in order.
+    :rtype: tuple
+    """
+
+    signatures = dict()
+    strongs = list()
+    with open(basis, "rb") as basis_file:
+        for index, block in enumerate(iter(lambda: basis_file.read(block_size), b"")):
+            if len(block) < block_size:
+                break
+            strong = strong_checksum(block)
+            strongs_by_weak = signatures.setdefault(weak_checksum(block), dict())
+            strongs_by_weak.setdefault(strong, index)
+            strongs.append(strong)
+
+    return signatures, strongs
+
+
+def delta(source, signatures, strongs, block_size):
+    """Get the operations rebuilding the source file from the basis blocks.
+
+    :param source: The complete path to the new file.
+    :type source: str
+    :param signatures: The basis block indices, see signature.
+    :type signatures: dict
+    :param strongs: The basis strong checksums in order, see signature.
+    :type strongs: list
+    :param block_size: The block size in bytes.
+    :type block_size: int
+
+    :return: ("copy", block index) and ("data", bytes) operations.
+    :rtype: generator
+    """
+
+    with open(source, "rb") as source_file:
+        size = os.fstat(source_file.fileno()).st_size
+        if size < block_size or not strongs:
+            yield "data", source_file.read()
+            return
+
+        with mmap.mmap(source_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            position = 0
+            literal_start = 0
+            # the basis block expected at the position if nothing changed
+            expected = 0
+            # the rolling checksum, none while the blocks are compared in order
+            rolling = None
+
+            while position + block_size <= size:
+                index = None
+                if rolling is None:
+                    executor.check_cancelled()
+                    strong = strong_checksum(data[position : position + block_size])
+
+                    # the content goes on like in the basis, no need to roll
+                    if expected < len(strongs) and strong == strongs[expected]:
+                        index = expected
+                    else:
+                        rolling = weak_checksum(data[position : position + block_size])
+                        candidates = signatures.get(rolling)
+                        if candidates is not None:
+                            index = candidates.get(strong)
+
+                else:
+                    # look for a basis block with the same content at this offset
+                    candidates = signatures.get(rolling)
+                    if candidates is not None:
+                        index = candidates.get(
+                            strong_checksum(data[position : position + block_size])
+                        )
+
+                if index is not None:
+                    yield from _literal(data, literal_start, position)
+                    yield "copy", index
+                    position += block_size
+                    literal_start = position
+                    expected = index + 1
+                    rolling = None
+                    continue
+
+                if position - literal_start >= MAX_LITERAL:
+                    raise DeltaAborted(source)
+                if position + block_size >= size:
+                    break
+
+                # roll the checksum one byte further
+                rolling = roll(
+                    rolling, data[position], data[position + block_size], block_size
+                )
+                position += 1
+
+                if not position % block_size:
+                    executor.check_cancelled()
+
+            yield from _literal(data, literal_start, size)
+
+
+def _literal(data, start, end):
+    """Get the data operations for a range of unmatched bytes.
+
+    :param data: The new file content.
+    :type data: mmap
+    :param start: The first byte of the range.
+    :type start: int
+    :param end: The byte after the range.
+    :type end: int
+
+    :return: ("data", bytes) operations of at most CHUNK_SIZE bytes.
+    :rtype: generator
+    """
+
+    for offset in range(start, end, files.CHUNK_SIZE):
+        yield "data", data[offset : min(offset + files.CHUNK_SIZE, end)]
+
+
+def transfer(source, destination):
+    """Update the destination file to the source content from its previous version.
+
+    The destination is rebuilt in a temporary file and renamed into place,
+    its bytes counted in an "rsync" span with the literal bytes, the changes.
+
+    :param source: The complete path to the new file.
+    :type source: str
+    :param destination: The complete path to the previous version of the file.
+    :type destination: str
+
+    :return: The number of literal bytes, the rest was reused from the basis,
+        and the checksum of the rebuilt file.
+    :rtype: tuple
+    """
+
+    block_size = block_size_for(os.path.getsize(destination))
+    signatures, strongs = signature(destination, block_size)
+
+    literal = 0
+    checksum = None
+
+    def write(temp_path):
+        nonlocal literal, checksum
+        with open(destination, "rb") as basis_file, open(temp_path, "wb") as temp_file:
+
+            def blocks():
+                nonlocal literal
+                for operation, value in delta(source, signatures, strongs, block_size):
+                    if operation == "copy":
+                        basis_file.seek(value * block_size)
+                        yield basis_file.read(block_size)
+                    else:
+                        literal += len(value)
+                        yield value
+
+            # the checksum is computed while writing, not to read the file again
+            checksum = files.write_checksummed(blocks(), temp_file)
+
+    # the rebuilt file is counted once, by write_atomic, in the rsync span
+    with tracing.span("rsync", file=os.path.basename(destination)) as span:
+        files.write_atomic(source, destination, write)
+        span.set(literal=literal, reused=os.path.getsize(destination) - literal)
+
+    return literal, checksum
@@ -0,0 +1,258 @@
+"""Measure the disk usage of the workspace by asset, task and folder kind.
+
+The size of the files directly in every directory is cached with the directory
+modification time. A directory changes it when a file is created, deleted
+or renamed in it, so the directories that didn't change are only stat again.
+A file rewritten in place without being renamed isn't seen, use refresh then.
+"""
+
+import csv
+import json
+import os
+from concurrent import futures
+
+from pipeline.api.assets import catalog, paths
+from pipeline.utils import database, executor, tracing, units
+
+PATHS = paths.Paths()
+
+# the name of the usage cache in the data folder
+CACHE_FILE = "usageCache.json"
+
+# the folder kind of the files directly in a task folder
+LOOSE_FILES = "files"
+
+# the columns of the usage rows
+COLUMNS = ("asset_type", "asset", "task", "folder", "size", "files")
+
+# the number of assets measured at the same time
+WORKERS = 8
+
+
+class UsageCache(object):
+    """Store the size of the files directly in every directory."""
+
+    def __init__(self, path=None):
+        """Load the cache.
+
+        :param path: The complete path to the cache file.
+            If none, use the one of the data folder.
+        :type path: str, none
+        """
+
+        self.path = path or os.path.join(database.Database().data_path, CACHE_FILE)
+
+        try:
+            with open(self.path, "r") as cache_file:
+                self._old = json.load(cache_file)
+        except (OSError, ValueError):
+            self._old = dict()
+
+        # only the directories seen are saved back
+        self._new = dict()
+
+    def measure(self, directory, refresh=False):
+        """Get the size and number of the files in a directory and its sub folders.
+
+        :param directory: The complete path to the directory.
+        :type directory: str
+        :param refresh: Wether or not to ignore the cache.
+        :type refresh: bool
+
+        :return: The number of bytes and of files.
+        :rtype: tuple
+        """
+
+        executor.check_cancelled()
+
+        mtime = os.stat(directory).st_mtime_ns
+        record = self._old.get(directory)
+
+        if refresh or record is None or record["mtime_ns"] != mtime:
+            record = {"mtime_ns": mtime, "size": 0, "files": 0, "dirs": list()}
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        record["dirs"].append(entry.name)
+                    elif entry.is_file(follow_symlinks=False):
+                        record["size"] += entry.stat(follow_symlinks=False).st_size
+                        record["files"] += 1
+
+        self._new[directory] = record
+
+        size, count = record["size"], record["files"]
+        for name in record["dirs"]:
+            dir_size, dir_count = self.measure(os.path.join(directory, name), refresh)
+            size += dir_size
+            count += dir_count
+
+        return size, count
+
+    def save(self):
+        """Save the records of the directories seen."""
+
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as cache_file:
+            json.dump(self._new, cache_file, separators=(",", ":"))
+        os.replace(temp_path, self.path)
+
+
+def measure_asset(directory, cache, refresh=False):
+    """Get the disk usage of an asset by task and folder kind.
+
+    :param directory: The complete path to the asset folder.
+    :type directory: str
+    :param cache: The usage cache.
+    :type cache: UsageCache
+    :param refresh: Wether or not to ignore the cache.
+    :type refresh: bool
+
+    :return: The number of bytes and of files by folder kind by task.
+    :rtype: dict
+    """
+
+    usage = dict()
+    with os.scandir(directory) as tasks:
+        for task in tasks:
+            if not task.is_dir(follow_symlinks=False):
+                continue
+
+            task_usage = usage[task.name] = dict()
+            loose = [0, 0]
+            with os.scandir(task.path) as folders:
+                for folder in folders:
+                    if folder.is_dir(follow_symlinks=False):
+                        task_usage[folder.name] = cache.measure(folder.path, refresh)
+                    elif folder.is_file(follow_symlinks=False):
+                        loose[0] += folder.stat(follow_symlinks=False).st_size
+                        loose[1] += 1
+            if loose[1]:
+                task_usage[LOOSE_FILES] = tuple(loose)
+
+    return usage
+
+
+@tracing.traced("measure workspace")
+def measure_workspace(workspace=None, refresh=False, workers=WORKERS, cache=None):
+    """Get the disk usage of every asset of the workspace, measured in parallel.
+
+    :param workspace: The complete path to the workspace.
+        If none, use the current workspace.
+    :type workspace: str, none
+    :param refresh: Wether or not to ignore the cache.
+    :type refresh: bool
+    :param workers: The number of assets measured at the same time.
+    :type workers: int
+    :param cache: The usage cache. If none, use the one of the data folder.
+    :type cache: UsageCache, none
+
+    :return: The usage rows, see COLUMNS.
+    :rtype: list
+    """
+
+    workspace = workspace or PATHS.get_workspace()
+    cache = cache or UsageCache()
+
+    # list the asset folders of every asset type
+    assets = list()
+    workspace_catalog = catalog.get_catalog(workspace)
+    if workspace_catalog is None:
+        raise ValueError("# Pipeline : Please specify a workspace path first")
+    for asset_type in workspace_catalog.app_data["assets"]:
+        directories = workspace_catalog.get_asset_directories(asset_type)
+        assets.extend(
+            (asset_type, asset, path) for asset, path in directories.items()
+        )
+
+    rows = list()
+    with futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        jobs = {
+            pool.submit(measure_asset, path, cache, refresh): (asset_type, asset)
+            for asset_type, asset, path in assets
+        }
+        for count, job in enumerate(futures.as_completed(jobs), 1):
+            executor.check_cancelled()
+            asset_type, asset = jobs[job]
+            for task, folders in job.result().items():
+                for folder, (size, files) in folders.items():
+                    rows.append((asset_type, asset, task, folder, size, files))
+            executor.report_progress(count, len(jobs))
+    cache.save()
+
+    rows.sort()
+    return rows
+
+
+def aggregate(rows, depth):
+    """Sum the usage rows up to a level of the hierarchy.
+
+    :param rows: The usage rows, see COLUMNS.
+    :type rows: list
+    :param depth: The number of naming columns to keep,
+        1 for the asset types, 2 for the assets, 3 for the tasks.
+    :type depth: int
+
+    :return: The usage rows summed, the names past the depth left empty.
+    :rtype: list
+    """
+
+    totals = dict()
+    for row in rows:
+        total = totals.setdefault(row[:depth], [0, 0])
+        total[0] += row[4]
+        total[1] += row[5]
+
+    return sorted(
+        key + ("",) * (4 - depth) + tuple(total) for key, total in totals.items()
+    )
+
+
+def to_json(rows, path):
+    """Write the usage rows as a nested json file.
+
+    :param rows: The usage rows, see COLUMNS.
+    :type rows: list
+    :param path: The complete path to the json file.
+    :type path: str
+    """
+
+    data = dict()
+    for asset_type, asset, task, folder, size, files in rows:
+        tasks = data.setdefault(asset_type, dict()).setdefault(asset, dict())
+        tasks.setdefault(task, dict())[folder] = {"size": size, "files": files}
+
+    with open(path, "w") as json_file:
+        json_file.write(json.dumps(data, indent=4))
+
+
+def to_csv(rows, path):
+    """Write the usage rows as a csv file.
+
+    :param rows: The usage rows, see COLUMNS.
+    :type rows: list
+    :param path: The complete path to the csv file.
+    :type path: str
+    """
+
+    with open(path, "w", newline="") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+
+
+def report(rows, count=10):
+    """Print the assets using the most disk space.
+
+    :param rows: The usage rows, see COLUMNS.
+    :type rows: list
+    :param count: The number of assets to print.
+    :type count: int
+    """
+
+    assets = sorted(aggregate(rows, 2), key=lambda row: row[4], reverse=True)
+    for asset_type, asset, _, _, size, files in assets[:count]:
+        print(
+            "# Pipeline : {} {} -> ~ {} {} in {} files".format(
+                asset_type, asset, *units.convert_byte(size), files
+            )
+        )
@@ -0,0 +1,252 @@
+"""Query the assets of the workspace from the command line, without any UI.
+
+    python -m pipeline ls characters --task rig
+    python -m pipeline path ch_character_rig --folder DEF
+    python -m pipeline latest characters rig --folder export
+    python -m pipeline latest ch_character rig
+    python -m pipeline versions ch_character_rig
+
+Add --json before the command to get the result as json :
+    python -m pipeline --json latest characters rig --folder export
+
+Nothing here imports Qt, a query is expected to answer
+in less than COLD_START_TARGET seconds.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from pipeline.api.assets import catalog, paths
+
+# the time a query should take, from the interpreter start to the answer
+COLD_START_TARGET = 0.2
+
+PATHS = paths.Paths()
+
+
+def get_asset_type(workspace_catalog, name):
+    """Get the asset type of an asset, task or scene name.
+
+    :param workspace_catalog: The workspace catalog.
+    :type workspace_catalog: Catalog
+    :param name: The name starting with an asset type prefix.
+    :type name: str
+
+    :return: The asset type.
+    :rtype: str
+    """
+
+    prefix = name.split("_")[0]
+    for asset_type, data in workspace_catalog.app_data["assets"].items():
+        if data["prefix"] == prefix:
+            return asset_type
+
+    raise ValueError("# Pipeline : No asset type has the prefix " + prefix)
+
+
+def get_task_directory(workspace_catalog, asset_name, task, folder="WIP"):
+    """Get a folder of an asset task.
+
+    :param workspace_catalog: The workspace catalog.
+    :type workspace_catalog: Catalog
+    :param asset_name: The asset name with prefix. (eg: "ch_character")
+    :type asset_name: str
+    :param task: The task. (eg: "rig")
+    :type task: str
+    :param folder: The task folder. (eg: "WIP", "DEF", "export")
+    :type folder: str
+
+    :return: The complete path to the folder, it may not exist.
+    :rtype: str
+    """
+
+    asset_type = get_asset_type(workspace_catalog, asset_name)
+    return os.path.join(
+        workspace_catalog.get_asset_directory(asset_type, asset_name), task, folder
+    )
+
+
+def split_task_name(workspace_catalog, name):
+    """Get the asset name and the task of an asset task name.
+
+    :param workspace_catalog: The workspace catalog.
+    :type workspace_catalog: Catalog
+    :param name: The asset task name. (eg: "ch_character_rig")
+    :type name: str
+
+    :return: The asset name and the task.
+    :rtype: tuple
+    """
+
+    splitted_name = name.split("_")
+    if len(splitted_name) < 3:
+        raise ValueError("# Pipeline : Not an asset task name -> " + name)
+
+    for task, data in workspace_catalog.app_data["tasks"].items():
+        if data["suffix"] == splitted_name[2]:
+            return "_".join(splitted_name[:2]), task
+
+    raise ValueError("# Pipeline : No task has the suffix " + splitted_name[2])
+
+
+# commands
+
+
+def list_assets(workspace_catalog, arguments):
+    """Get the assets of a type.
+
+    :return: The asset names.
+    :rtype: list
+    """
+
+    return workspace_catalog.list_assets(arguments.asset_type, arguments.task)
+
+
+def get_path(workspace_catalog, arguments):
+    """Get the path to an asset or a folder of an asset task.
+
+    :return: The complete path.
+    :rtype: str
+    """
+
+    if len(arguments.name.split("_")) == 2:
+        asset_type = get_asset_type(workspace_catalog, arguments.name)
+        return workspace_catalog.get_asset_directory(asset_type, arguments.name)
+
+    asset_name, task = split_task_name(workspace_catalog, arguments.name)
+    return get_task_directory(workspace_catalog, asset_name, task, arguments.folder)
+
+
+def get_latest(workspace_catalog, arguments):
+    """Get the latest file of an asset task, or of every asset of a type.
+
+    :return: The complete path to the latest file by asset name, none if no file.
+    :rtype: dict
+    """
+
+    if arguments.asset in workspace_catalog.app_data["assets"]:
+        asset_names = workspace_catalog.list_assets(arguments.asset, arguments.task)
+    else:
+        asset_names = [arguments.asset]
+
+    # the scenes are .ma files, the exports and publishes may be anything
+    extension = arguments.extension
+    if extension is None and arguments.folder in ("WIP", "DEF"):
+        extension = ".ma"
+
+    latest = dict()
+    for asset_name in asset_names:
+        directory = get_task_directory(
+            workspace_catalog, asset_name, arguments.task, arguments.folder
+        )
+        file = PATHS.get_latest_file(directory, extension, restore=False)
+        latest[asset_name] = None if file is None else os.path.join(directory, file)
+
+    return latest
+
+
+def list_versions(workspace_catalog, arguments):
+    """Get every version of an asset task, compressed ones included.
+
+    :return: The file names, sorted.
+    :rtype: list
+    """
+
+    asset_name, task = split_task_name(workspace_catalog, arguments.name)
+    directory = get_task_directory(
+        workspace_catalog, asset_name, task, arguments.folder
+    )
+
+    versions = set()
+    for file, is_dir in workspace_catalog.list_directory(directory):
+        for stored_extension in paths.STORED_EXTENSIONS:
+            if file.endswith(stored_extension):
+                file = file[: -len(stored_extension)]
+                break
+        if not is_dir and file.endswith(".ma"):
+            versions.add(file)
+
+    return sorted(versions)
+
+
+def get_parser():
+    """Get the command line parser.
+
+    :return: The parser.
+    :rtype: ArgumentParser
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="python -m pipeline", description="Query the assets of the workspace."
+    )
+    parser.add_argument(
+        "--workspace", help="The workspace path. If not set, use the prefs one."
+    )
+    parser.add_argument("--json", action="store_true", help="Print the result as json.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("ls", help="List the assets of a type.")
+    command.add_argument("asset_type", help="The asset type. (eg: characters)")
+    command.add_argument(
+        "--task", default="all", help="Only list the assets having this task."
+    )
+    command.set_defaults(function=list_assets)
+
+    command = commands.add_parser("path", help="Get the path to an asset or task.")
+    command.add_argument("name", help="The asset or asset task name.")
+    command.add_argument("--folder", default="WIP", help="The task folder.")
+    command.set_defaults(function=get_path)
+
+    command = commands.add_parser("latest", help="Get the latest file of a task.")
+    command.add_argument("asset", help="The asset name, or an asset type for all.")
+    command.add_argument("task", help="The task. (eg: rig)")
+    command.add_argument("--folder", default="WIP", help="The task folder.")
+    command.add_argument(
+        "--extension", help="The file extension. Default to .ma in WIP and DEF."
+    )
+    command.set_defaults(function=get_latest)
+
+    command = commands.add_parser("versions", help="List the versions of a task.")
+    command.add_argument("name", help="The asset task name.")
+    command.add_argument("--folder", default="WIP", help="The task folder.")
+    command.set_defaults(function=list_versions)
+
+    return parser
+
+
+def main(argv=None):
+    """Run a query from the command line.
+
+    :param argv: The command line arguments. If none, use the process ones.
+    :type argv: list, none
+
+    :return: The exit code.
+    :rtype: int
+    """
+
+    arguments = get_parser().parse_args(argv)
+
+    workspace_catalog = catalog.get_catalog(arguments.workspace)
+    if workspace_catalog is None:
+        print("# Pipeline : Please specify a workspace path first", file=sys.stderr)
+        return 1
+
+    try:
+        result = arguments.function(workspace_catalog, arguments)
+    except (KeyError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    if arguments.json:
+        print(json.dumps(result, indent=4))
+    elif isinstance(result, dict):
+        for key, value in result.items():
+            print("{} {}".format(key, value or ""))
+    elif isinstance(result, list):
+        print("\n".join(result))
+    else:
+        print(result)
+
+    return 0
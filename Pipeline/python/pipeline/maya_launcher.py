@@ -1,12 +1,14 @@
 """Execute the script from maya."""
 
 from maya import OpenMayaUI as oMui
+from PySide2.QtCore import QTimer
 from PySide2.QtWidgets import QMainWindow
 from shiboken2 import wrapInstance
 from python_core.pyside2.config import config
 
+from pipeline.api.maya_api import reference_cache
 from pipeline.ui import main, theme
-from pipeline.utils import database, maya_config
+from pipeline.utils import database, maya_config, startup
 
 
 def maya_main_window():
@@ -23,20 +25,33 @@ def exec_():
     """Execute the application."""
 
     # Make sure the application runs on safe basis
-    db = database.Database()
-    db.start_checks()
+    with startup.phase("start checks"):
+        db = database.Database()
+        db.start_checks()
 
     # get the project path
-    maya_config.get_project_path()
+    with startup.phase("project path"):
+        maya_config.get_project_path()
+
+    # load the referenced exports from the local cache, opened scenes included
+    if reference_cache.is_enabled():
+        reference_cache.install()
 
     # display tooltips to have informations on items
     config.set("debug.show_tooltip", False)
 
     # create the window
-    window = main.Main(maya_main_window())
-    window.window_size = (300, 600)
-    window.populate()
-    theme.theme(window)
+    with startup.phase("main window"):
+        window = main.Main(maya_main_window())
+        window.window_size = (300, 600)
+        window.populate()
+
+    with startup.phase("theme"):
+        theme.theme(window)
+
     window.show()
 
+    # stop profiling once the window is painted
+    QTimer.singleShot(0, startup.stop)
+
     return window
@@ -1,18 +1,40 @@
-"""Manage a menu bar to add menus to the app."""
+"""Manage a menu bar to add menus to the app.
 
+The api modules and the tools are only imported when their action is triggered,
+so the main window is displayed before any maya api module is loaded.
+"""
+
+import importlib
 import os
 
 from PySide2.QtWidgets import QComboBox, QListWidget, QStyleFactory
 from PySide2.QtGui import QIcon
+from python_core.pyside2 import base_ui
 from python_core.pyside2.widgets import menu_bar
 
-from pipeline.api.checks import git
-from pipeline.api.maya_api import maya_asset, exports, creation, studient_warning
-from pipeline.api.maya_api.tools import rig
+from pipeline.api.assets import assets
 from pipeline.ui.dialogs import dialogs, popups
-from pipeline.ui.tools import references_manager, export_animations
 from pipeline.ui.images import images
-from pipeline.utils import database
+from pipeline.utils import database, executor, memory, profiling
+
+
+def lazy(module, function):
+    """Get a callable importing the module of a function only when called.
+
+    :param module: The module name. (eg: "pipeline.api.maya_api.tools.rig")
+    :type module: str
+    :param function: The function name in the module.
+    :type function: str
+
+    :return: The callable, ignoring the arguments of the signals.
+    :rtype: callable
+    """
+
+    def call(*args):
+        return getattr(importlib.import_module(module), function)()
+
+    call.__name__ = function
+    return profiling.profiled(call)
 
 
 class AppMenuBar(menu_bar.MenuBar):
@@ -27,7 +49,7 @@ class AppMenuBar(menu_bar.MenuBar):
 
         # initialize usefull classes
         self.db = database.Database()
-        self.asset = maya_asset.MayaAsset()
+        self.asset = assets.Assets()
 
     # edit UI
 
@@ -65,9 +87,9 @@ class AppMenuBar(menu_bar.MenuBar):
             icon=self.maya_icon,
             shortcut="CTRL+I",
         )
-        # add a recent menu to open recent files
+        # add a recent menu to open recent files, filled when it is shown
         self.recent_menu = files_menu.add_menu("Recent")
-        self.populate_recents()
+        self.recent_menu.aboutToShow.connect(self.populate_recents)
 
         # add actions on the selected item
         files_menu.add_separator()
@@ -125,6 +147,21 @@ class AppMenuBar(menu_bar.MenuBar):
             triggered=self.studient_warnings,
             tooltip=self.studient_warnings.__doc__,
         )
+        files_menu.add_action(
+            "Compact WIPs",
+            triggered=self.compact_wips,
+            tooltip=self.compact_wips.__doc__,
+        )
+        files_menu.add_action(
+            "Mirror DEF / Publish...",
+            triggered=self.mirror_workspace,
+            tooltip=self.mirror_workspace.__doc__,
+        )
+        files_menu.add_action(
+            "Find duplicates",
+            triggered=self.find_duplicates,
+            tooltip=self.find_duplicates.__doc__,
+        )
 
         files_menu.add_separator()
         files_menu.add_action(
@@ -168,13 +205,16 @@ class AppMenuBar(menu_bar.MenuBar):
         rig_menu.add_separator()
         rig_menu.add_action(
             "Set joints to export",
-            triggered=rig.set_joints_to_export,
-            tooltip="(MAYA) " + rig.set_joints_to_export.__doc__,
+            triggered=lazy("pipeline.api.maya_api.tools.rig", "set_joints_to_export"),
+            tooltip="(MAYA) Save the selected joints in the pipe node"
+            + " to know wich ones to export to unreal.",
             icon=self.maya_icon,
         )
         rig_menu.add_action(
             "Select joints to export",
-            triggered=rig.select_joints_to_export,
+            triggered=lazy(
+                "pipeline.api.maya_api.tools.rig", "select_joints_to_export"
+            ),
             tooltip="(MAYA) Select the selected joints saved in the pipe node.",
             icon=self.maya_icon,
         )
@@ -194,6 +234,23 @@ class AppMenuBar(menu_bar.MenuBar):
             icon=self.maya_icon,
         )
 
+        tools_menu.add_separator()
+        tools_menu.add_action(
+            "Disk usage",
+            triggered=self.disk_usage,
+            tooltip=self.disk_usage.__doc__,
+        )
+        tools_menu.add_action(
+            "Profile next action",
+            triggered=self.profile_next_action,
+            tooltip=self.profile_next_action.__doc__,
+        )
+        tools_menu.add_action(
+            "Memory snapshot",
+            triggered=self.memory_snapshot,
+            tooltip=self.memory_snapshot.__doc__,
+        )
+
         # set the styje for every menus
         for menu in [tools_menu, texturing_menu, rig_menu, layout_menu]:
             menu.setStyle(QStyleFactory.create("Fusion"))
@@ -225,6 +282,24 @@ class AppMenuBar(menu_bar.MenuBar):
             prefs.update({"recents": recents})
             self.db.prefs = prefs
 
+    def profile_next_action(self):
+        """Profile the next action of the menus, click again to cancel."""
+
+        armed = not profiling.PROFILER.armed
+        profiling.arm(armed)
+        if armed:
+            print(
+                "# Pipeline : The next action will be profiled in "
+                + profiling.get_directory()
+            )
+        else:
+            print("# Pipeline : Action profiling cancelled")
+
+    def memory_snapshot(self):
+        """Report the memory growth, the first snapshot starts the audit."""
+
+        memory.snapshot()
+
     def get_assets_informations_from_ui(self):
         """Get the asset naming informations from the ui.
 
@@ -252,12 +327,14 @@ class AppMenuBar(menu_bar.MenuBar):
 
     # create assets
 
+    @profiling.profiled
     def create_new(self):
         """Create a new asset."""
 
         dialog = dialogs.CreateNewDialog(parent=self.topLevelWidget())
         dialog.exec_()
 
+    @profiling.profiled
     def create_task(self, task=None):
         """Create a task at the right location for the current selected item.
 
@@ -290,6 +367,7 @@ class AppMenuBar(menu_bar.MenuBar):
         if self.asset.create(asset_task_name) is None:
             print("# Pipeline : " + asset_task_name + " already exists")
 
+    @profiling.profiled
     def import_model(self):
         """Import a model."""
 
@@ -299,6 +377,7 @@ class AppMenuBar(menu_bar.MenuBar):
 
     # interact with assets
 
+    @profiling.profiled
     def deduce_wip_from_def(self):
         """Copy the DEF version of the asset to the WIP folder"""
 
@@ -309,18 +388,19 @@ class AppMenuBar(menu_bar.MenuBar):
             self.asset.get_asset_task_name(assets_name, task)
         )
 
+    @profiling.profiled
     def increment_save(self):
         """Save the current scene as an increment."""
 
+        from pipeline.api.maya_api import creation
+
         dialog = dialogs.IncrementSaveDialog(parent=self.topLevelWidget())
         comment = dialog.exec_()
 
         if comment is not False:
             creation.increment_save(comment)
 
-        # update the ui with the recently opened files
-        self.populate_recents()
-
+    @profiling.profiled
     def open_recent(self, name):
         """Open the recent file we clicked on in maya.
 
@@ -332,11 +412,8 @@ class AppMenuBar(menu_bar.MenuBar):
 
         path = os.path.join(self.asset.get_path_from_name(name), name)
 
-        # if can't find the file : remove it from prefs and raise an error
+        # if can't find the file raise an error, the recents are updated when shown
         if not os.path.exists(path):
-            # update the ui
-            self.populate()
-
             raise ValueError(
                 "# Pipeline : Can't find {}. The file may not exist anymore.".format(
                     path
@@ -347,8 +424,8 @@ class AppMenuBar(menu_bar.MenuBar):
 
         # save the opend file as a recently opend file
         self.asset.update_recents(os.path.basename(path))
-        self.populate_recents()
 
+    @profiling.profiled
     def open_path(self, open_task=True):
         """Open the path to the selected item.
 
@@ -365,6 +442,7 @@ class AppMenuBar(menu_bar.MenuBar):
         else:
             self.asset.open_path(assets_name)
 
+    @profiling.profiled
     def open_texture_path(self):
         """Open the texture path to the selected item."""
 
@@ -376,6 +454,7 @@ class AppMenuBar(menu_bar.MenuBar):
 
     # tools
 
+    @profiling.profiled
     def update_model(self):
         """Update the model in the rig scene."""
 
@@ -395,12 +474,17 @@ class AppMenuBar(menu_bar.MenuBar):
             print("# Pipeline : Update model aborted")
             return
 
+        from pipeline.api.maya_api.tools import rig
+
         # update the model
         rig.update_model()
 
+    @profiling.profiled
     def references_manager(self):
         """Open the references manager in the current scene."""
 
+        from pipeline.ui.tools import references_manager
+
         # get ui elements
         main_window = self.topLevelWidget()
 
@@ -408,11 +492,28 @@ class AppMenuBar(menu_bar.MenuBar):
         manager.populate()
         manager.show()
 
+    @profiling.profiled
+    def disk_usage(self):
+        """Display the disk usage of every asset, task and folder."""
+
+        from pipeline.ui.tools import disk_usage
+
+        # get ui elements
+        main_window = self.topLevelWidget()
+
+        window = disk_usage.DiskUsage(parent=main_window)
+        window.populate()
+        window.show()
+
+    @profiling.profiled
     def export_animations(self):
         """Export the animations for unreal."""
 
+        from pipeline.api.maya_api import maya_asset
+        from pipeline.ui.tools import export_animations
+
         # get informations on the current file
-        informations = self.asset.get_informations_from_current_file()
+        informations = maya_asset.MayaAsset().get_informations_from_current_file()
         asset_type, basename, task, version, comment, path = informations
 
         if task != "animation":
@@ -429,9 +530,12 @@ class AppMenuBar(menu_bar.MenuBar):
 
     # exports / publish
 
+    @profiling.profiled
     def save_def(self):
         """Save the current asset in the DEF folder to publish it on git."""
 
+        from pipeline.api.maya_api import exports
+
         if popups.confirm("Save def?"):
             # ask if we want to save the file before
             popups.save_popup()
@@ -439,9 +543,12 @@ class AppMenuBar(menu_bar.MenuBar):
             # export the asset
             exports.save_def()
 
+    @profiling.profiled
     def export(self):
         """Export the current asset to import it in an other soft or an other way."""  # noqa E501
 
+        from pipeline.api.maya_api import exports
+
         if popups.confirm("Export current scene?"):
             # ask if we want to save the file before
             popups.save_popup()
@@ -449,9 +556,12 @@ class AppMenuBar(menu_bar.MenuBar):
             # export the asset
             exports.export()
 
+    @profiling.profiled
     def publish(self):
         """Publish the current asset to import it in unreal."""
 
+        from pipeline.api.maya_api import exports
+
         if popups.confirm("Publish current scene?"):
             # ask if we want to save the file before
             popups.save_popup()
@@ -459,15 +569,21 @@ class AppMenuBar(menu_bar.MenuBar):
             # export the asset
             exports.publish()
 
+    @profiling.profiled
     def git_sanity_checks(self):
         """Make sure now WIP folder will be gited nor oversized files."""
 
-        git.update_gitignore()
-        git.ignore_oversized_files()
+        from pipeline.api.checks import git
 
+        executor.submit("Update .gitignore", git.update_gitignore)
+        executor.submit("Ignore oversized files", git.ignore_oversized_files)
+
+    @profiling.profiled
     def studient_warnings(self):
         """Remove the studient warning from the files in 'export' or 'DEF'"""
 
+        from pipeline.api.maya_api import studient_warning
+
         # build a dialog to ask if we want to create a new task
         dialog = dialogs.YesNoDialog()
         # set the elements to display in the dialog
@@ -484,8 +600,56 @@ class AppMenuBar(menu_bar.MenuBar):
             print("# Pipeline : Studient warning aborted")
             return
 
-        studient_warning.remove_from_all_files(["DEF", "export"])
+        executor.submit(
+            "Studient warnings",
+            studient_warning.remove_from_all_files,
+            ["DEF", "export"],
+        )
 
+    @profiling.profiled
+    def compact_wips(self):
+        """Compress the old WIP increments and delete the old bake files."""
+
+        from pipeline.api.assets import compaction
+
+        if not popups.confirm(
+            "Compress every WIP increment but the {} latest".format(
+                compaction.KEEP_INCREMENTS
+            )
+            + "\nand delete every bake file but the {} latest?".format(
+                compaction.KEEP_BAKES
+            )
+        ):
+            print("# Pipeline : Compact WIPs aborted")
+            return
+
+        executor.submit("Compact WIPs", compaction.compact_workspace)
+
+    @profiling.profiled
+    def mirror_workspace(self):
+        """Mirror the DEF, export and publish folders to an other directory."""
+
+        from pipeline.api.storage import mirror
+
+        dialog = base_ui.BrowseDialog()
+        dialog.title = "Browse to the mirror directory"
+
+        result = dialog.browse(file=False)
+        if result is None:
+            print("# Pipeline : Mirror aborted")
+            return
+
+        executor.submit("Mirror DEF / Publish", mirror.sync, result[0])
+
+    @profiling.profiled
+    def find_duplicates(self):
+        """Report the files having the same content in the workspace."""
+
+        from pipeline.api.storage import dedup
+
+        executor.submit("Find duplicates", dedup.report)
+
+    @profiling.profiled
     def finish_asset(self):
         """Finish the asset to publish it in the pipe and save it on git.
 
@@ -494,6 +658,8 @@ class AppMenuBar(menu_bar.MenuBar):
         - launch the git sanity checks.
         """
 
+        from pipeline.api.maya_api import exports
+
         if popups.confirm("Save DEF and publish this asset?"):
             # ask if we want to save the file before
             popups.save_popup()
@@ -0,0 +1,94 @@
+"""Display the progress of the background file operations."""
+
+from PySide2.QtCore import QObject, Signal
+from PySide2.QtWidgets import QProgressBar
+
+from python_core.pyside2 import base_ui
+
+from pipeline.utils import executor
+
+# the resolution of the progress bar
+RESOLUTION = 1000
+
+
+class Dispatcher(QObject):
+    """Call functions in the main thread from any thread."""
+
+    call = Signal(object)
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the dispatcher."""
+
+        super(Dispatcher, self).__init__(*args, **kwargs)
+
+        # the signal is queued when emitted from an other thread
+        self.call.connect(self.run)
+
+    def run(self, function):
+        """Call the function.
+
+        :param function: The function to call.
+        :type function: callable
+        """
+
+        function()
+
+
+class JobsProgress(base_ui.Widget):
+    """Display the progress of the running job and allow to cancel it."""
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the widget."""
+
+        super(JobsProgress, self).__init__(*args, **kwargs)
+
+        self.dispatcher = Dispatcher(self)
+
+    def populate(self):
+        """Populate the widget and start running the file operations in background."""
+
+        self.layout.setContentsMargins(0, 0, 0, 0)
+
+        lay = self.layout.add_layout("horizontal")
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, RESOLUTION)
+        lay.addWidget(self.progress_bar)
+
+        lay.add_button(
+            "Cancel",
+            clicked=executor.EXECUTOR.cancel_all,
+            tooltip="Cancel the running file operations.",
+        )
+
+        # only display the widget while jobs are running
+        self.setVisible(False)
+
+        executor.EXECUTOR.start(self.dispatcher.call.emit, self.update_progress)
+        # the queries are quick, their progress isn't displayed
+        executor.QUERIES.start(self.dispatcher.call.emit)
+
+    def update_progress(self, job):
+        """Display the progress of the oldest running job.
+
+        :param job: The job whose state changed.
+        :type job: Job
+        """
+
+        running = [job for job in executor.EXECUTOR.jobs if not job.done]
+        if not running:
+            self.setVisible(False)
+            return
+
+        job = running[0]
+        self.setVisible(True)
+
+        # an unknown maximum displays a busy progress bar
+        if job.maximum:
+            self.progress_bar.setRange(0, RESOLUTION)
+            self.progress_bar.setValue(int(RESOLUTION * job.value / job.maximum))
+        else:
+            self.progress_bar.setRange(0, 0)
+
+        self.progress_bar.setFormat(
+            "{} ({} pending) %p%".format(job.name, len(running) - 1)
+        )
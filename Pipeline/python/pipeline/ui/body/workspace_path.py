@@ -1,11 +1,15 @@
 """Create the ui to define the workspace body."""
 
-from PySide2.QtWidgets import QComboBox, QListWidget
+from PySide2.QtGui import QCursor
+from PySide2.QtWidgets import QComboBox, QListWidget, QMenu
 
 from python_core.pyside2 import base_ui
 
 from pipeline.utils import database
 
+# the number of recent workspaces to switch to
+RECENT_WORKSPACES = 5
+
 
 class WorkspacePath(base_ui.Widget):
     """Create a layout to manage the workspace path."""
@@ -31,6 +35,11 @@ class WorkspacePath(base_ui.Widget):
         self.path.editingFinished.connect(self.save_prefs)
 
         lay.add_button("Browse...", clicked=self.browse)
+        lay.add_button(
+            "Recent",
+            clicked=self.show_recents,
+            tooltip="Switch to a recently used workspace.",
+        )
 
         self.set_prefs()
 
@@ -53,14 +62,52 @@ class WorkspacePath(base_ui.Widget):
         # update the asset list widget on the current project
         self.__update_asset_list()
 
+    def show_recents(self):
+        """Display the recent workspaces to switch to one of them."""
+
+        menu = QMenu(self)
+        for workspace in self.db.prefs.get("recent_workspaces", list()):
+            menu.addAction(
+                workspace,
+                lambda _workspace=workspace: self.switch_workspace(_workspace),
+            )
+        menu.exec_(QCursor.pos())
+
+    def switch_workspace(self, workspace):
+        """Switch to an other workspace.
+
+        The assets of the recent workspaces are displayed from memory
+        and checked in background.
+
+        :param workspace: The complete path to the workspace.
+        :type workspace: str
+        """
+
+        self.path.setText(workspace)
+        self.save_prefs()
+
+        # update the asset list widget on the new project
+        self.__update_asset_list()
+
     def save_prefs(self):
         """Save current ui prefs."""
 
         prefs = self.db.prefs
 
+        # keep the latest workspaces first
+        workspace = self.path.text()
+        recents = [
+            recent
+            for recent in prefs.get("recent_workspaces", list())
+            if recent != workspace
+        ]
+        if workspace:
+            recents.insert(0, workspace)
+
         prefs.update(
             {
-                "workspace": self.path.text(),
+                "workspace": workspace,
+                "recent_workspaces": recents[:RECENT_WORKSPACES],
             }
         )
 
@@ -1,10 +1,68 @@
 """Create popups dialogs."""
 
-import os
+from python_core.pyside2 import base_ui
 
 from pipeline.ui.dialogs import dialogs
 
 
+class Interaction(object):
+    """Ask the questions of the api with dialogs."""
+
+    def confirm(
+        self, message="Confirm?", title="Confirm?", title_msg=None, default=False
+    ):
+        """Build a dialog popup to ask a yes / no question.
+
+        :param message: The question to ask.
+        :type message: str
+        :param title: The title of the dialog.
+        :type title: str
+        :param title_msg: A short message to highlight above the question.
+        :type title_msg: str, none
+        :param default: Unused, the user answers.
+        :type default: bool
+
+        :return: True if the answer is yes.
+        :rtype: bool
+        """
+
+        dialog = dialogs.YesNoDialog()
+
+        # set the elements to display in the dialog
+        dialog.title = title
+        dialog.title_msg = title_msg
+        dialog.msg = message
+
+        return dialog.exec_()
+
+    def browse(self, title="Browse", directory=None, extensions=None, file=True):
+        """Build a dialog to browse to files or a folder.
+
+        :param title: The title of the dialog.
+        :type title: str
+        :param directory: The complete path to the directory to start from.
+        :type directory: str, none
+        :param extensions: The file extensions to browse to. (eg: [".ma"])
+        :type extensions: list, none
+        :param file: True to browse to files, False to browse to a folder.
+        :type file: bool
+
+        :return: The complete paths to the selected files, none if aborted.
+        :rtype: list, none
+        """
+
+        dialog = base_ui.BrowseDialog()
+        dialog.title = title
+
+        kwargs = {"file": file}
+        if directory is not None:
+            kwargs["directory"] = directory
+        if extensions is not None:
+            kwargs["extensions"] = extensions
+
+        return dialog.browse(**kwargs)
+
+
 def confirm(message="Confirm?"):
     """Build a dialog popup to ask confirmation or not.
 
@@ -12,36 +70,12 @@ def confirm(message="Confirm?"):
     :type message: str
     """
 
-    dialog = dialogs.YesNoDialog()
-
-    # set the elements to display in the dialog
-    dialog.title = "Confirm?"
-    dialog.msg = message
-
-    return dialog.exec_()
+    return Interaction().confirm(message)
 
 
 def save_popup():
     """Build a dialog popup to ask if we want to save the current file."""
 
-    from maya import cmds
+    from pipeline.api.maya_api import creation
 
-    # save before opening the new scene
-    if cmds.file(q=True, modified=True):
-        dialog = dialogs.YesNoDialog()
-
-        # set the elements to display in the dialog
-        dialog.title = "Save?"
-        dialog.title_msg = os.path.basename(cmds.file(q=True, sceneName=True))
-        dialog.msg = "Save changes to the current scene?"
-
-        if dialog.exec_():
-            file = cmds.file(q=True, sceneName=True).replace("/", "\\")
-            if not file:
-                raise ValueError(
-                    "# Pipeline : This file has no name."
-                    + " You have to save it at least once before."
-                )
-
-            print("# Pipeline : File saved -> " + file)
-            cmds.file(save=True, type="mayaAscii", force=True)
+    creation.save_changes()
@@ -1,10 +1,13 @@
 """Manage the pipeline main window."""
 
+from PySide2.QtCore import QTimer
+
 from python_core.pyside2 import base_ui
 
-from pipeline.ui.body import app_menu_bar, open_create, workspace_path
+from pipeline.ui.body import app_menu_bar, jobs_progress, open_create, workspace_path
+from pipeline.ui.dialogs import popups
 from pipeline.ui.images import images
-from pipeline.utils import database
+from pipeline.utils import interaction, memory, startup, watchdog
 
 
 class Main(base_ui.MainWindow):
@@ -19,9 +22,43 @@ class Main(base_ui.MainWindow):
 
         super(Main, self).__init__(*args, **kwargs)
 
-        # make sure the app runs on safe basis
-        db = database.Database()
-        db.start_checks()
+        # ask the questions of the api with dialogs
+        interaction.set_interaction(popups.Interaction())
+
+        # log the stalls of the UI if asked to
+        self.watchdog = watchdog.from_environment()
+        if self.watchdog is not None:
+            self.watchdog.start()
+            self.heartbeat = QTimer(self)
+            self.heartbeat.timeout.connect(self.watchdog.tick)
+            self.heartbeat.start(int(watchdog.HEARTBEAT * 1000))
+
+        # audit the memory if asked to, taking snapshots at interval
+        interval = memory.get_interval()
+        if interval is not None:
+            memory.AUDIT.start()
+            if interval:
+                self.memory_timer = QTimer(self)
+                self.memory_timer.timeout.connect(memory.snapshot)
+                self.memory_timer.start(int(interval * 1000))
+
+    def closeEvent(self, event):
+        """Stop the watchdog and the memory audit before closing the window.
+
+        :param event: The close event.
+        :type event: QCloseEvent
+        """
+
+        if self.watchdog is not None:
+            self.heartbeat.stop()
+            self.watchdog.stop()
+
+        if memory.AUDIT.started:
+            if hasattr(self, "memory_timer"):
+                self.memory_timer.stop()
+            memory.AUDIT.stop()
+
+        super(Main, self).closeEvent(event)
 
     def populate(self):
         """Populate themain window UI."""
@@ -30,20 +67,30 @@ class Main(base_ui.MainWindow):
         main_layout.set_alignment("top")
 
         # create a menu bar
-        menu = app_menu_bar.AppMenuBar()
-        menu.populate()
-        main_layout.addWidget(menu)
+        with startup.phase("menu bar"):
+            menu = app_menu_bar.AppMenuBar()
+            menu.populate()
+            main_layout.addWidget(menu)
 
         # populate the app ui in an other layout that has padding
         layout = main_layout.add_layout("vertical")
 
         # add the workspace path
-        path = workspace_path.WorkspacePath()
-        path.populate()
-        layout.addWidget(path)
+        with startup.phase("workspace path"):
+            path = workspace_path.WorkspacePath()
+            path.populate()
+            layout.addWidget(path)
 
         # add the open create
-        self.open_create_lay = open_create.OpenCreate()
-        self.open_create_lay.populate()
-        layout.addLayout(self.open_create_lay)
-        self.open_create_lay.populate_asset_list()
+        with startup.phase("open create"):
+            self.open_create_lay = open_create.OpenCreate()
+            self.open_create_lay.populate()
+            layout.addLayout(self.open_create_lay)
+        with startup.phase("assets list"):
+            self.open_create_lay.populate_asset_list()
+
+        # display the progress of the background file operations
+        with startup.phase("jobs progress"):
+            progress = jobs_progress.JobsProgress()
+            progress.populate()
+            layout.addWidget(progress)
@@ -0,0 +1,163 @@
+"""Build a UI to see which assets and tasks use the most disk space."""
+
+import os
+
+from PySide2.QtCore import Qt
+from PySide2.QtWidgets import QTableWidget, QTableWidgetItem
+
+from python_core.pyside2 import base_ui
+
+from pipeline.api.storage import usage
+from pipeline.ui import theme
+from pipeline.utils import executor, units
+
+# the hierarchy levels the usage can be summed up to, with their depth
+LEVELS = {"Asset types": 1, "Assets": 2, "Tasks": 3, "Folders": 4}
+
+
+class SortableItem(QTableWidgetItem):
+    """A table item sorted by a value instead of its text."""
+
+    def __init__(self, text, value):
+        """Initialize the item.
+
+        :param text: The text to display.
+        :type text: str
+        :param value: The value to sort the item by.
+        :type value: object
+        """
+
+        super(SortableItem, self).__init__(text)
+
+        self.value = value
+        self.setFlags(self.flags() & ~Qt.ItemIsEditable)
+
+    def __lt__(self, other):
+        """Compare the items by value."""
+
+        return self.value < other.value
+
+
+class DiskUsage(base_ui.MainWindow):
+    """Build a disk usage UI."""
+
+    _title = "Disk usage"
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the disk usage UI."""
+
+        super(DiskUsage, self).__init__(*args, **kwargs)
+
+        self.resize(600, 450)
+
+        self.rows = list()
+
+    def populate(self):
+        """Populate the UI and measure the workspace."""
+
+        layout = self.main_widget.layout
+
+        # add a combo box to choose the level of details
+        lay = layout.add_layout("horizontal")
+        self.level = lay.add_combo_box(
+            LEVELS.keys(), tooltip="Sum up the disk usage to this level."
+        )
+        self.level.setCurrentText("Assets")
+        self.level.currentTextChanged.connect(self.populate_table)
+        lay.add_button(
+            "Refresh",
+            clicked=lambda: self.refresh(True),
+            tooltip="Measure the workspace again.",
+        )
+
+        # add a sortable table to display the disk usage
+        self.table = QTableWidget()
+        self.table.setColumnCount(len(usage.COLUMNS))
+        self.table.setHorizontalHeaderLabels(
+            [column.replace("_", " ").capitalize() for column in usage.COLUMNS]
+        )
+        self.table.verticalHeader().setVisible(False)
+        self.table.setSortingEnabled(True)
+        layout.addWidget(self.table)
+
+        # add buttons to export the disk usage
+        lay = layout.add_layout("horizontal")
+        lay.add_button(
+            "Export JSON",
+            clicked=lambda: self.export(usage.to_json, "json"),
+            tooltip="Write the disk usage of every folder in a json file.",
+        )
+        lay.add_button(
+            "Export CSV",
+            clicked=lambda: self.export(usage.to_csv, "csv"),
+            tooltip="Write the disk usage of every folder in a csv file.",
+        )
+
+        # set the main window theme
+        theme.theme(self)
+
+        self.refresh(force=False)
+
+    def refresh(self, force=True):
+        """Measure the workspace in background and display the result.
+
+        :param force: Wether or not to measure every folder again, ignoring the cache.
+        :type force: bool
+        """
+
+        executor.submit(
+            "Disk usage",
+            usage.measure_workspace,
+            refresh=force,
+            callback=self.set_rows,
+        )
+
+    def set_rows(self, rows):
+        """Display new usage rows.
+
+        :param rows: The usage rows, see usage.COLUMNS.
+        :type rows: list
+        """
+
+        self.rows = rows
+        self.populate_table()
+
+    def populate_table(self):
+        """Populate the table with the usage summed up to the current level."""
+
+        rows = usage.aggregate(self.rows, LEVELS[self.level.currentText()])
+
+        # don't sort while filling the table, the rows would move under our feet
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values[:4]):
+                self.table.setItem(row, column, SortableItem(value, value))
+            size, files = values[4:]
+            self.table.setItem(
+                row, 4, SortableItem("{} {}".format(*units.convert_byte(size)), size)
+            )
+            self.table.setItem(row, 5, SortableItem(str(files), files))
+        self.table.setSortingEnabled(True)
+        self.table.sortItems(4, Qt.DescendingOrder)
+        self.table.resizeColumnsToContents()
+
+    def export(self, write, extension):
+        """Export the disk usage of every folder in a directory.
+
+        :param write: The function writing the rows in a file.
+        :type write: callable
+        :param extension: The file extension.
+        :type extension: str
+        """
+
+        dialog = base_ui.BrowseDialog()
+        dialog.title = "Browse to the export directory"
+
+        result = dialog.browse(file=False)
+        if result is None:
+            return
+
+        path = os.path.join(result[0], "diskUsage." + extension)
+        write(self.rows, path)
+        print("# Pipeline : Disk usage exported -> " + path)
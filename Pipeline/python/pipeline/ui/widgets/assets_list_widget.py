@@ -1,11 +1,10 @@
 """Manage the created assets widgets."""
 
-import os
-
 from PySide2.QtCore import Qt
 from python_core.pyside2.widgets import list_widget
 
-from pipeline.utils import database
+from pipeline.api.assets import catalog
+from pipeline.utils import database, executor
 
 
 class AssetsListWidget(list_widget.ListWidget):
@@ -23,6 +22,9 @@ class AssetsListWidget(list_widget.ListWidget):
         # use the database to get data
         self.db = database.Database()
 
+        # the latest populate call, to ignore the outdated background refreshes
+        self._request = None
+
     def populate(self, asset_type, task_type):
         """Populate the list widget with tasks to do.
 
@@ -34,27 +36,48 @@ class AssetsListWidget(list_widget.ListWidget):
 
         self.clear()
 
-        # get app_data
-        app_data = self.db.app_data
-        prefs = self.db.prefs
+        workspace_catalog = catalog.get_catalog()
+        if workspace_catalog is None:
+            return
 
-        # get the workspace we're working in
-        workspace = prefs.get("workspace", None)
-        if workspace is None:
+        # display the cached assets right away, then check them in background
+        # a workspace never listed is only listed once, in background
+        request = (workspace_catalog, asset_type, task_type)
+        self._request = request
+        if workspace_catalog.is_cached(asset_type):
+            self.set_assets(
+                workspace_catalog.list_assets(asset_type, task_type, validate=False)
+            )
+
+        # not to wait behind the file operations running
+        executor.submit_query(
+            "Refresh assets",
+            workspace_catalog.list_assets,
+            asset_type,
+            task_type,
+            callback=lambda assets: self.set_assets(assets, request),
+        )
+
+    def set_assets(self, assets, request=None):
+        """Display the assets, keeping the selection.
+
+        :param assets: The asset names to display.
+        :type assets: list
+        :param request: The populate call the assets come from.
+            If it isn't the latest one, the assets are outdated and not displayed.
+        :type request: tuple, none
+        """
+
+        if request is not None and request != self._request:
             return
 
-        # list all the assets in the asset type directory
-        assets_path = os.path.join(workspace, app_data["assets"][asset_type]["path"])
-        if not os.path.exists(assets_path):
+        if [item.text() for item in self.all_items()] == assets:
             return
 
-        # display all the files corresponding to the asset type and the current task
-        prefix = app_data["assets"][asset_type]["prefix"]
-        for asset in os.listdir(assets_path):
-            if asset.startswith(prefix):
-                if task_type == "all":
-                    self.add_item(asset)
-                else:
-                    task_path = os.path.join(assets_path, asset, task_type)
-                    if os.path.exists(task_path) and os.listdir(task_path):
-                        self.add_item(asset)
+        selected = [item.text() for item in self.selectedItems()]
+
+        self.clear()
+        for asset in assets:
+            self.add_item(asset)
+            if asset in selected:
+                self.item(self.count() - 1).setSelected(True)
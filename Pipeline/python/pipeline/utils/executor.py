@@ -0,0 +1,378 @@
+"""Run the pipeline file operations in background threads.
+
+The executor runs synchronously until it is started by the UI,
+so headless scripts and maya batch keep a sequential behavior.
+Once started, the jobs run in a worker thread and their callbacks
+are dispatched to the main thread in the order the jobs were submitted.
+
+The quick queries refreshing the UI run in their own executor, so they
+never wait behind the long file operations. (eg: a mirror or a compaction)
+
+The functions running in a job can report their progress
+and check if they have been cancelled with the module functions,
+which do nothing when called outside of a job.
+"""
+
+import collections
+import threading
+import time
+from concurrent import futures
+
+from pipeline.utils import profiling, tracing
+
+# the minimum delay in seconds between two progress reports of a job
+PROGRESS_INTERVAL = 0.1
+
+
+class Cancelled(Exception):
+    """Raised inside a job when it has been cancelled."""
+
+
+class Job(object):
+    """Keep track of a function running in the executor."""
+
+    def __init__(self, name, function, args, kwargs, callback=None):
+        """Initialize the job.
+
+        :param name: The name of the job, displayed in the UI.
+        :type name: str
+        :param function: The function to run.
+        :type function: callable
+        :param args: The function arguments.
+        :type args: tuple
+        :param kwargs: The function keyword arguments.
+        :type kwargs: dict
+        :param callback: A callable receiving the function result once done.
+        :type callback: callable, none
+        """
+
+        self.name = name
+        # profile the job too if it is submitted by a profiled action
+        self.function = profiling.bind(name, function)
+        self.args = args
+        self.kwargs = kwargs
+        self.callback = callback
+
+        self.value = 0
+        self.maximum = 0
+        self.future = futures.Future()
+
+        # the operation the job is part of, the job may run in an other thread
+        self.trace_parent = tracing.current()
+
+        self._cancel = threading.Event()
+        self._last_report = 0
+
+    @property
+    def cancelled(self):
+        """Get if the job has been asked to stop.
+
+        :return: True if the job was cancelled.
+        :rtype: bool
+        """
+
+        return self._cancel.is_set()
+
+    @property
+    def done(self):
+        """Get if the job function is over.
+
+        :return: True if the function returned or raised.
+        :rtype: bool
+        """
+
+        return self.future.done()
+
+    def cancel(self):
+        """Ask the job to stop as soon as it checks for it."""
+
+        self._cancel.set()
+
+    def result(self, timeout=None):
+        """Wait for the job function to be over and get its result.
+
+        :param timeout: The maximum time to wait in seconds. If none, wait forever.
+        :type timeout: float, none
+
+        :return: The function result. Raise its error if it failed.
+        :rtype: object
+        """
+
+        return self.future.result(timeout)
+
+
+class Executor(object):
+    """Run jobs in a worker thread and dispatch their callbacks in order."""
+
+    def __init__(self, workers=1):
+        """Initialize the executor.
+
+        :param workers: The number of jobs running at the same time.
+            A single worker keeps the jobs in the submission order.
+        :type workers: int
+        """
+
+        self.workers = workers
+
+        self._pool = None
+        self._dispatch = None
+        self._listener = None
+        self._pending = collections.deque()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    # manage the executor
+
+    @property
+    def running(self):
+        """Get if the jobs run in background.
+
+        :return: True if the executor has been started.
+        :rtype: bool
+        """
+
+        return self._pool is not None
+
+    @property
+    def jobs(self):
+        """Get the jobs whose callbacks have not been dispatched yet.
+
+        :return: The pending jobs in submission order.
+        :rtype: list
+        """
+
+        with self._lock:
+            return list(self._pending)
+
+    def start(self, dispatch, listener=None):
+        """Start running the jobs in background.
+
+        :param dispatch: A callable receiving a function to call in the main thread.
+        :type dispatch: callable
+        :param listener: A callable receiving a job every time its progress
+            changes or it is over, called in the main thread.
+            It replaces the listener of a previous start.
+        :type listener: callable, none
+        """
+
+        self._dispatch = dispatch
+        self._listener = listener
+
+        if self._pool is None:
+            self._pool = futures.ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="PipelineIO"
+            )
+
+    def stop(self, cancel=True):
+        """Stop running the jobs in background and wait for the running ones.
+
+        :param cancel: Wether or not to cancel the pending jobs.
+        :type cancel: bool
+        """
+
+        if self._pool is None:
+            return
+
+        if cancel:
+            self.cancel_all()
+
+        self._pool.shutdown(wait=True)
+        self._pool = None
+        self._dispatch = None
+        self._listener = None
+
+    def cancel_all(self):
+        """Cancel every pending job."""
+
+        for job in self.jobs:
+            job.cancel()
+
+    # run jobs
+
+    def submit(self, name, function, *args, callback=None, **kwargs):
+        """Run a function as a job.
+
+        :param name: The name of the job, displayed in the UI.
+        :type name: str
+        :param function: The function to run.
+        :type function: callable
+        :param callback: A callable receiving the function result once done.
+            It is called in the main thread, after the callbacks of the jobs
+            submitted before.
+        :type callback: callable, none
+
+        :return: The created job.
+        :rtype: Job
+        """
+
+        job = Job(name, function, args, kwargs, callback)
+
+        # run the job right now if the executor isn't started
+        # or if it is submitted by a running job, not to wait for itself
+        if self._pool is None or getattr(self._local, "job", None) is not None:
+            self._run(job)
+            result = job.result()
+            if job.callback is not None:
+                job.callback(result)
+            return job
+
+        with self._lock:
+            self._pending.append(job)
+
+        self._pool.submit(self._run, job)
+        return job
+
+    def report_progress(self, value, maximum):
+        """Report the progress of the job running in the current thread.
+
+        :param value: The current progress.
+        :type value: int
+        :param maximum: The progress to reach, 0 if unknown.
+        :type maximum: int
+        """
+
+        job = getattr(self._local, "job", None)
+        if job is None:
+            return
+
+        job.value = value
+        job.maximum = maximum
+
+        # don't flood the main thread with progress reports
+        now = time.monotonic()
+        over = maximum and value >= maximum
+        if not over and now - job._last_report < PROGRESS_INTERVAL:
+            return
+        job._last_report = now
+
+        self._notify(job)
+
+    def check_cancelled(self):
+        """Raise Cancelled if the job running in the current thread was cancelled."""
+
+        job = getattr(self._local, "job", None)
+        if job is not None and job.cancelled:
+            raise Cancelled("# Pipeline : {} cancelled".format(job.name))
+
+    # private methods
+
+    def _run(self, job):
+        """Run the job function and store its result.
+
+        :param job: The job to run.
+        :type job: Job
+        """
+
+        # keep track of the job running in this thread, jobs may be nested
+        previous = getattr(self._local, "job", None)
+        self._local.job = job
+        try:
+            self.check_cancelled()
+            with tracing.span(job.name, parent=job.trace_parent):
+                job.future.set_result(job.function(*job.args, **job.kwargs))
+        except BaseException as error:
+            job.future.set_exception(error)
+        finally:
+            self._local.job = previous
+
+        if self._pool is not None:
+            self._notify(job)
+            self._call(self._flush)
+
+    def _flush(self):
+        """Call the callbacks of the jobs that are over, in submission order."""
+
+        while True:
+            with self._lock:
+                if not self._pending or not self._pending[0].done:
+                    return
+                job = self._pending.popleft()
+
+            error = job.future.exception()
+            if isinstance(error, Cancelled):
+                print(str(error))
+            elif error is not None:
+                print("# Pipeline : {} failed -> {!r}".format(job.name, error))
+            elif job.callback is not None:
+                job.callback(job.future.result())
+
+    def _notify(self, job):
+        """Send the job state to the listener in the main thread.
+
+        :param job: The job whose state changed.
+        :type job: Job
+        """
+
+        if self._listener is not None:
+            self._call(self._listener, job)
+
+    def _call(self, function, *args):
+        """Call a function in the main thread.
+
+        :param function: The function to call.
+        :type function: callable
+        """
+
+        if self._dispatch is None:
+            function(*args)
+        else:
+            self._dispatch(lambda: function(*args))
+
+
+# the executor shared by the whole pipeline
+EXECUTOR = Executor()
+
+# the executor of the quick queries displayed by the UI, next to the file operations
+QUERIES = Executor(workers=2)
+
+
+def submit(name, function, *args, callback=None, **kwargs):
+    """Run a function as a job of the shared executor.
+
+    :param name: The name of the job, displayed in the UI.
+    :type name: str
+    :param function: The function to run.
+    :type function: callable
+    :param callback: A callable receiving the function result once done.
+    :type callback: callable, none
+
+    :return: The created job.
+    :rtype: Job
+    """
+
+    return EXECUTOR.submit(name, function, *args, callback=callback, **kwargs)
+
+
+def submit_query(name, function, *args, callback=None, **kwargs):
+    """Run a quick query as a job, never waiting behind the file operations.
+
+    :param name: The name of the job.
+    :type name: str
+    :param function: The function to run.
+    :type function: callable
+    :param callback: A callable receiving the function result once done.
+    :type callback: callable, none
+
+    :return: The created job.
+    :rtype: Job
+    """
+
+    return QUERIES.submit(name, function, *args, callback=callback, **kwargs)
+
+
+def report_progress(value, maximum):
+    """Report the progress of the current job. Do nothing outside of a job.
+
+    :param value: The current progress.
+    :type value: int
+    :param maximum: The progress to reach, 0 if unknown.
+    :type maximum: int
+    """
+
+    EXECUTOR.report_progress(value, maximum)
+
+
+def check_cancelled():
+    """Raise Cancelled if the current job was cancelled. Do nothing outside of a job."""
+
+    EXECUTOR.check_cancelled()
@@ -0,0 +1,602 @@
+"""Manage low level file operations."""
+
+import hashlib
+import json
+import lzma
+import os
+import shutil
+import tempfile
+import time
+
+from pipeline.utils import executor, metrics, tracing
+
+# the size of the blocks read and written at once when copying files
+CHUNK_SIZE = 1024 * 1024
+
+# the size of the blocks checksummed and journaled by the verified copies
+CHECKSUM_CHUNK_SIZE = 8 * 1024 * 1024
+
+# the extension added to the compressed files
+ARCHIVE_EXTENSION = ".xz"
+
+# the first node creation marks the end of the maya ascii header
+MAYA_HEADER_END = b"createNode "
+
+# the extension of the files being copied and of their copy journal
+PART_EXTENSION = ".part"
+JOURNAL_EXTENSION = ".journal"
+
+# the extension of the files storing the checksum of the file they are next to
+CHECKSUM_EXTENSION = ".blake2b"
+
+# the extensions of the files written next to the files by the copies
+SIDECAR_EXTENSIONS = (CHECKSUM_EXTENSION, PART_EXTENSION, JOURNAL_EXTENSION)
+
+# the age in seconds after which a partial copy is considered abandoned
+PARTIAL_MAX_AGE = 24 * 60 * 60
+
+FILES_WRITTEN = metrics.counter("files_written_total", "The files written.")
+BYTES_WRITTEN = metrics.counter("files_bytes_written_total", "The bytes written.")
+COPIES_SKIPPED = metrics.counter(
+    "files_copies_skipped_total", "The copies skipped, the content being the same."
+)
+
+
+def copy_chunks(source_file, destination_file, total=0):
+    """Copy an opened file to an other by blocks, reporting the progress.
+
+    The copy stops between two blocks if the running job was cancelled.
+
+    :param source_file: The opened file to read.
+    :type source_file: file
+    :param destination_file: The opened file to write in.
+    :type destination_file: file
+    :param total: The number of bytes expected, to report the progress.
+    :type total: int
+
+    :return: The number of bytes copied.
+    :rtype: int
+    """
+
+    copied = 0
+    for chunk in iter(lambda: source_file.read(CHUNK_SIZE), b""):
+        executor.check_cancelled()
+        destination_file.write(chunk)
+        copied += len(chunk)
+        executor.report_progress(copied, max(total, copied))
+
+    return copied
+
+
+def write_atomic(source, destination, write):
+    """Write a file in a temporary file and rename it to the destination.
+
+    The temporary file is created next to the destination,
+    the source metadata is copied on it and it is then renamed to the destination.
+    So the destination is never seen half written.
+
+    :param source: The complete path to the file to get the metadata from.
+    :type source: str
+    :param destination: The complete path to the file to create.
+        It can be the source itself to rewrite the file in place.
+    :type destination: str
+    :param write: A callable receiving the temporary file path to write in.
+    :type write: callable
+
+    :return: The complete path to the destination file.
+    :rtype: str
+    """
+
+    directory, basename = os.path.split(destination)
+
+    # create a temporary file in the destination directory to be able to rename it
+    handle, temp_path = tempfile.mkstemp(
+        prefix="." + basename + ".",
+        suffix=".tmp",
+        dir=directory or None,
+    )
+    os.close(handle)
+
+    try:
+        write(temp_path)
+
+        # keep the source metadata and move the file into place
+        shutil.copystat(source, temp_path)
+        os.replace(temp_path, destination)
+        size = os.path.getsize(destination)
+        tracing.add(size, 1)
+        FILES_WRITTEN.inc()
+        BYTES_WRITTEN.inc(size)
+
+    except BaseException:
+        # never leave temporary files behind
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return destination
+
+
+def copy_file(source, destination, header_filter=None):
+    """Copy a file in a single streaming pass and replace the destination atomically.
+
+    :param source: The complete path to the file to copy.
+    :type source: str
+    :param destination: The complete path to the file to create.
+        It can be the source itself to rewrite the file in place.
+    :type destination: str
+    :param header_filter: A callable receiving each line of the file header (bytes)
+        and returning a tuple of the line to write and wether the header is over.
+        Once the header is over, the rest of the file is copied by blocks.
+        If none, the whole file is copied by blocks.
+    :type header_filter: callable, none
+
+    :return: The complete path to the destination file.
+    :rtype: str
+    """
+
+    def write(temp_path):
+        with open(source, "rb") as source_file, open(temp_path, "wb") as temp_file:
+            # filter the header lines until the filter says it is over
+            if header_filter is not None:
+                for line in iter(source_file.readline, b""):
+                    line, done = header_filter(line)
+                    temp_file.write(line)
+                    if done:
+                        break
+
+            # copy the rest of the file without looking at it
+            copy_chunks(source_file, temp_file, os.path.getsize(source))
+
+    return write_atomic(source, destination, write)
+
+
+def compress_file(path):
+    """Compress a file next to itself with lzma and remove the original.
+
+    :param path: The complete path to the file to compress.
+    :type path: str
+
+    :return: The number of bytes reclaimed by the compression.
+    :rtype: int
+    """
+
+    archive = path + ARCHIVE_EXTENSION
+
+    def write(temp_path):
+        with open(path, "rb") as source_file, lzma.open(temp_path, "wb") as temp_file:
+            copy_chunks(source_file, temp_file, os.path.getsize(path))
+
+    write_atomic(path, archive, write)
+
+    reclaimed = os.path.getsize(path) - os.path.getsize(archive)
+    os.remove(path)
+
+    return reclaimed
+
+
+def decompress_file(archive):
+    """Restore a file compressed with compress_file and remove the archive.
+
+    :param archive: The complete path to the compressed file.
+    :type archive: str
+
+    :return: The complete path to the restored file.
+    :rtype: str
+    """
+
+    if not archive.endswith(ARCHIVE_EXTENSION):
+        raise ValueError("# Pipeline : Not a compressed file -> " + archive)
+
+    path = archive[: -len(ARCHIVE_EXTENSION)]
+
+    def write(temp_path):
+        with lzma.open(archive, "rb") as archive_file:
+            with open(temp_path, "wb") as temp_file:
+                copy_chunks(archive_file, temp_file)
+
+    write_atomic(archive, path, write)
+    os.remove(archive)
+
+    return path
+
+
+# verified copies
+
+
+def _iter_content(source_file, header_filter=None, skip=0):
+    """Stream the content to write when copying a file, skipping its beginning.
+
+    :param source_file: The opened file to copy.
+    :type source_file: file
+    :param header_filter: The header filter, see copy_file.
+    :type header_filter: callable, none
+    :param skip: The number of bytes of content to skip.
+    :type skip: int
+
+    :return: The blocks of content as bytes.
+    :rtype: generator
+    """
+
+    position = 0
+
+    # the filtered header may not have the size of the source header
+    if header_filter is not None:
+        for line in iter(source_file.readline, b""):
+            line, done = header_filter(line)
+            if position + len(line) > skip:
+                yield line[max(skip - position, 0) :]
+            position += len(line)
+            if done:
+                break
+
+    # after the header the content is the source itself, so seek instead of reading
+    if skip > position:
+        source_file.seek(skip - position, os.SEEK_CUR)
+
+    yield from iter(lambda: source_file.read(CHECKSUM_CHUNK_SIZE), b"")
+
+
+def _iter_chunks(blocks):
+    """Group blocks of content in chunks aligned on CHECKSUM_CHUNK_SIZE.
+
+    :param blocks: The blocks of content.
+    :type blocks: iterable
+
+    :return: The chunks as bytes, only the last one may be smaller.
+    :rtype: generator
+    """
+
+    buffer = bytearray()
+    for block in blocks:
+        buffer += block
+        while len(buffer) >= CHECKSUM_CHUNK_SIZE:
+            yield bytes(buffer[:CHECKSUM_CHUNK_SIZE])
+            del buffer[:CHECKSUM_CHUNK_SIZE]
+
+    if buffer:
+        yield bytes(buffer)
+
+
+def _chunk_digest(chunk):
+    """Get the checksum of a chunk.
+
+    :param chunk: The chunk content.
+    :type chunk: bytes
+
+    :return: The hexadecimal checksum.
+    :rtype: str
+    """
+
+    return hashlib.blake2b(chunk, digest_size=32).hexdigest()
+
+
+def _checksum_from_digests(digests):
+    """Get the checksum of a file from the checksums of its chunks.
+
+    :param digests: The hexadecimal checksums of the chunks.
+    :type digests: list
+
+    :return: The hexadecimal checksum.
+    :rtype: str
+    """
+
+    checksum = hashlib.blake2b()
+    for digest in digests:
+        checksum.update(bytes.fromhex(digest))
+
+    return checksum.hexdigest()
+
+
+def write_checksummed(blocks, destination_file):
+    """Write blocks of content in a file and get the checksum of what was written.
+
+    :param blocks: The blocks of content.
+    :type blocks: iterable
+    :param destination_file: The opened file to write in.
+    :type destination_file: file
+
+    :return: The hexadecimal checksum, the same as content_checksum.
+    :rtype: str
+    """
+
+    digests = list()
+    for chunk in _iter_chunks(blocks):
+        executor.check_cancelled()
+        destination_file.write(chunk)
+        digests.append(_chunk_digest(chunk))
+
+    return _checksum_from_digests(digests)
+
+
+def content_checksum(source, header_filter=None):
+    """Get the checksum of the file a copy would write, without writing it.
+
+    :param source: The complete path to the file.
+    :type source: str
+    :param header_filter: The header filter, see copy_file.
+    :type header_filter: callable, none
+
+    :return: The hexadecimal checksum, the same as the copy one.
+    :rtype: str
+    """
+
+    with open(source, "rb") as source_file:
+        digests = [
+            _chunk_digest(chunk)
+            for chunk in _iter_chunks(_iter_content(source_file, header_filter))
+        ]
+
+    return _checksum_from_digests(digests)
+
+
+def _read_checksum_data(path):
+    """Get the data stored next to a file, if the file didn't change since.
+
+    :param path: The complete path to the file.
+    :type path: str
+
+    :return: The checksum data. None if there is no checksum
+        or if the file changed since it was computed.
+    :rtype: dict, none
+    """
+
+    try:
+        with open(path + CHECKSUM_EXTENSION, "r") as checksum_file:
+            data = json.load(checksum_file)
+        stats = os.stat(path)
+    except (OSError, ValueError):
+        return None
+
+    if data.get("size") != stats.st_size or data.get("mtime_ns") != stats.st_mtime_ns:
+        return None
+
+    return data
+
+
+def read_checksum(path):
+    """Get the checksum stored next to a file, without reading the file.
+
+    :param path: The complete path to the file.
+    :type path: str
+
+    :return: The hexadecimal checksum. None if there is no checksum
+        or if the file changed since it was computed.
+    :rtype: str, none
+    """
+
+    data = _read_checksum_data(path)
+    return data.get("checksum") if data is not None else None
+
+
+def check_integrity(path):
+    """Check a file content still matches its stored checksum.
+
+    :param path: The complete path to the file.
+    :type path: str
+
+    :return: True if it matches, False if it doesn't, None if there is no checksum.
+    :rtype: bool, none
+    """
+
+    checksum = read_checksum(path)
+    if checksum is None:
+        return None
+
+    return content_checksum(path) == checksum
+
+
+def _write_checksum(path, checksum, source=None):
+    """Store the checksum of a file next to it.
+
+    :param path: The complete path to the file, it must not change afterwards.
+    :type path: str
+    :param checksum: The hexadecimal checksum of the file.
+    :type checksum: str
+    :param source: The size and modification time of the file it was copied from.
+    :type source: str, none
+    """
+
+    stats = os.stat(path)
+    data = {
+        "checksum": checksum,
+        "size": stats.st_size,
+        "mtime_ns": stats.st_mtime_ns,
+        "chunk_size": CHECKSUM_CHUNK_SIZE,
+        "source": source,
+    }
+
+    with open(path + CHECKSUM_EXTENSION, "w") as checksum_file:
+        checksum_file.write(json.dumps(data, indent=4))
+
+
+def remove_file(path):
+    """Remove a file and the checksum stored next to it.
+
+    :param path: The complete path to the file.
+    :type path: str
+    """
+
+    os.remove(path)
+    if os.path.exists(path + CHECKSUM_EXTENSION):
+        os.remove(path + CHECKSUM_EXTENSION)
+
+
+def move_file(source, destination):
+    """Move a file and the checksum stored next to it.
+
+    :param source: The complete path to the file to move.
+    :type source: str
+    :param destination: The complete path to move the file to.
+    :type destination: str
+    """
+
+    os.replace(source, destination)
+    if os.path.exists(source + CHECKSUM_EXTENSION):
+        os.replace(source + CHECKSUM_EXTENSION, destination + CHECKSUM_EXTENSION)
+
+
+def _resume_digests(part, journal, identity):
+    """Get the checksums of the chunks an interrupted copy already wrote.
+
+    :param part: The complete path to the partial file.
+    :type part: str
+    :param journal: The complete path to the copy journal.
+    :type journal: str
+    :param identity: The source size and modification time, as written in the journal.
+    :type identity: str
+
+    :return: The checksums of the chunks still valid in the partial file.
+    :rtype: list
+    """
+
+    if not os.path.exists(part) or not os.path.exists(journal):
+        return list()
+
+    with open(journal, "r") as journal_file:
+        lines = journal_file.read().splitlines()
+
+    # the source changed since the interrupted copy, start over
+    if not lines or lines[0] != identity:
+        return list()
+
+    # only keep complete chunks, up to the last one that is really on disk
+    digests = [line for line in lines[1:] if len(line) == 64]
+    with open(part, "rb") as part_file:
+        while digests:
+            part_file.seek((len(digests) - 1) * CHECKSUM_CHUNK_SIZE)
+            if _chunk_digest(part_file.read(CHECKSUM_CHUNK_SIZE)) == digests[-1]:
+                break
+            digests.pop()
+
+    return digests
+
+
+def copy_verified(source, destination, header_filter=None, verify=True):
+    """Copy a file through a checksummed, resumable partial file.
+
+    The content is written by chunks in a ".part" file next to the destination.
+    Each chunk is synced to disk and its checksum written in a journal,
+    so an interrupted copy resumes from the last chunk really written.
+    Once complete the partial file is verified, its checksum is stored
+    next to the destination and it is renamed to the destination.
+    So the destination is never seen truncated.
+
+    If the destination was copied from the source as it is now,
+    nothing is read nor written.
+
+    :param source: The complete path to the file to copy.
+    :type source: str
+    :param destination: The complete path to the file to create.
+    :type destination: str
+    :param header_filter: The header filter, see copy_file.
+    :type header_filter: callable, none
+    :param verify: Wether or not to read the partial file back to check its chunks
+        before renaming it.
+    :type verify: bool
+
+    :return: The complete path to the destination file.
+    :rtype: str
+    """
+
+    stats = os.stat(source)
+    identity = "{} {}".format(stats.st_size, stats.st_mtime_ns)
+
+    # skip the copy if the destination was copied from this very source
+    data = _read_checksum_data(destination)
+    if data is not None and data.get("source") == identity:
+        COPIES_SKIPPED.inc()
+        return destination
+
+    # the checksums written before the source was stored need a read once
+    if data is not None and data.get("source") is None:
+        if data.get("checksum") == content_checksum(source, header_filter):
+            _write_checksum(destination, data["checksum"], identity)
+            COPIES_SKIPPED.inc()
+            return destination
+
+    part = destination + PART_EXTENSION
+    journal = part + JOURNAL_EXTENSION
+
+    digests = _resume_digests(part, journal, identity)
+    skip = len(digests) * CHECKSUM_CHUNK_SIZE
+
+    with open(source, "rb") as source_file, open(
+        part, "r+b" if digests else "wb"
+    ) as part_file, open(journal, "a" if digests else "w") as journal_file:
+        if digests:
+            part_file.truncate(skip)
+            part_file.seek(skip)
+        else:
+            journal_file.write(identity + "\n")
+
+        blocks = _iter_content(source_file, header_filter, skip)
+        for chunk in _iter_chunks(blocks):
+            executor.check_cancelled()
+
+            # the chunk must be on disk before the journal says so
+            part_file.write(chunk)
+            part_file.flush()
+            os.fsync(part_file.fileno())
+
+            digest = _chunk_digest(chunk)
+            journal_file.write(digest + "\n")
+            journal_file.flush()
+            digests.append(digest)
+
+            executor.report_progress(part_file.tell(), stats.st_size)
+
+    # read the partial file back to make sure every chunk was written correctly
+    if verify:
+        with open(part, "rb") as part_file:
+            written = [
+                _chunk_digest(chunk)
+                for chunk in iter(lambda: part_file.read(CHECKSUM_CHUNK_SIZE), b"")
+            ]
+        if written != digests:
+            os.remove(part)
+            os.remove(journal)
+            raise IOError("# Pipeline : Copy corrupted, try again -> " + destination)
+
+    # store the checksum and move the file into place
+    shutil.copystat(source, part)
+    _write_checksum(part, _checksum_from_digests(digests), identity)
+    os.replace(part + CHECKSUM_EXTENSION, destination + CHECKSUM_EXTENSION)
+    os.replace(part, destination)
+    os.remove(journal)
+    tracing.add(stats.st_size - skip, 1)
+    FILES_WRITTEN.inc()
+    BYTES_WRITTEN.inc(stats.st_size - skip)
+
+    remove_abandoned_copies(os.path.dirname(destination))
+
+    return destination
+
+
+def remove_abandoned_copies(directory, max_age=PARTIAL_MAX_AGE):
+    """Remove the partial files and journals of the copies never resumed.
+
+    :param directory: The complete path to the folder to clean.
+    :type directory: str
+    :param max_age: The age in seconds after which a partial copy is abandoned.
+    :type max_age: float
+
+    :return: The number of files removed.
+    :rtype: int
+    """
+
+    removed = 0
+    limit = time.time() - max_age
+    for entry in os.scandir(directory or "."):
+        if not entry.name.endswith((PART_EXTENSION, JOURNAL_EXTENSION)):
+            continue
+
+        try:
+            if entry.stat().st_mtime < limit:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            # an other copy may have just resumed or finished it
+            continue
+
+    return removed
@@ -0,0 +1,147 @@
+"""Ask the user a question, with or without a UI.
+
+The api never imports Qt, it asks its questions through the current interaction.
+It is headless until the UI sets its own interaction, so scripts and maya batch
+never load the dialogs : every question gets its default answer, or raises
+if the PIPELINE_HEADLESS environment variable is set to "strict".
+"""
+
+import os
+
+
+class Unanswered(Exception):
+    """Raised when a question is asked to a strict headless interaction."""
+
+
+class Headless(object):
+    """Answer the questions without any user."""
+
+    def __init__(self, strict=False):
+        """Initialize the interaction.
+
+        :param strict: Wether or not to raise instead of answering the default.
+        :type strict: bool
+        """
+
+        self.strict = strict
+
+    def confirm(
+        self, message="Confirm?", title="Confirm?", title_msg=None, default=False
+    ):
+        """Ask a yes / no question.
+
+        :param message: The question to ask.
+        :type message: str
+        :param title: The title of the question.
+        :type title: str
+        :param title_msg: A short message to highlight above the question.
+        :type title_msg: str, none
+        :param default: The answer when there is no user to answer.
+        :type default: bool
+
+        :return: True if the answer is yes.
+        :rtype: bool
+        """
+
+        texts = [title] + [text for text in (title_msg, message) if text != title]
+        question = " : ".join(text for text in texts if text)
+        return self._answer(question, default, "yes" if default else "no")
+
+    def browse(self, title="Browse", directory=None, extensions=None, file=True):
+        """Ask to browse to files or a folder.
+
+        :param title: The title of the question.
+        :type title: str
+        :param directory: The complete path to the directory to start from.
+        :type directory: str, none
+        :param extensions: The file extensions to browse to. (eg: [".ma"])
+        :type extensions: list, none
+        :param file: True to browse to files, False to browse to a folder.
+        :type file: bool
+
+        :return: The complete paths to the selected files, none if aborted.
+        :rtype: list, none
+        """
+
+        return self._answer(title, None, "cancelled")
+
+    def _answer(self, question, default, label):
+        """Answer a question with its default answer, printing both.
+
+        :param question: The question asked.
+        :type question: str
+        :param default: The default answer.
+        :type default: any
+        :param label: The default answer as printed. (eg: "no")
+        :type label: str
+
+        :return: The default answer.
+        :rtype: any
+        """
+
+        if self.strict:
+            raise Unanswered("# Pipeline : No user to answer -> " + question)
+
+        print(
+            "# Pipeline : {} -> auto-answered {}, no user to answer".format(
+                question.replace("\n", " "), label
+            )
+        )
+        return default
+
+
+# the interaction the questions are asked through, the UI sets its own
+INTERACTION = Headless(strict=os.environ.get("PIPELINE_HEADLESS") == "strict")
+
+
+def set_interaction(interaction):
+    """Set the interaction the questions are asked through.
+
+    :param interaction: The interaction, implementing confirm and browse.
+    :type interaction: Headless
+    """
+
+    global INTERACTION
+    INTERACTION = interaction
+
+
+def confirm(message="Confirm?", title="Confirm?", title_msg=None, default=False):
+    """Ask a yes / no question through the current interaction.
+
+    :param message: The question to ask.
+    :type message: str
+    :param title: The title of the question.
+    :type title: str
+    :param title_msg: A short message to highlight above the question.
+    :type title_msg: str, none
+    :param default: The answer when there is no user to answer.
+    :type default: bool
+
+    :return: True if the answer is yes.
+    :rtype: bool
+    """
+
+    return INTERACTION.confirm(
+        message, title=title, title_msg=title_msg, default=default
+    )
+
+
+def browse(title="Browse", directory=None, extensions=None, file=True):
+    """Ask to browse to files or a folder through the current interaction.
+
+    :param title: The title of the question.
+    :type title: str
+    :param directory: The complete path to the directory to start from.
+    :type directory: str, none
+    :param extensions: The file extensions to browse to. (eg: [".ma"])
+    :type extensions: list, none
+    :param file: True to browse to files, False to browse to a folder.
+    :type file: bool
+
+    :return: The complete paths to the selected files, none if aborted.
+    :rtype: list, none
+    """
+
+    return INTERACTION.browse(
+        title=title, directory=directory, extensions=extensions, file=file
+    )
@@ -0,0 +1,272 @@
+"""Audit the memory of a long pipeline session with tracemalloc.
+
+Every snapshot is compared to the first one and to the previous one by allocation
+site, and counts the live Qt wrappers by class. (eg: the dialogs and list items
+never deleted) The snapshots are appended to memory.jsonl in the data folder.
+
+Set the PIPELINE_MEMORY_AUDIT environment variable to the time in seconds
+between two snapshots to audit the UI, "0" to only take them on demand
+with Tools > Memory snapshot. The audit starts with the first snapshot otherwise.
+"""
+
+import gc
+import json
+import os
+import time
+
+ENVIRONMENT_VARIABLE = "PIPELINE_MEMORY_AUDIT"
+LOG_FILE = "memory.jsonl"
+
+# the number of frames stored by allocation and the number of sites reported
+FRAMES = 1
+TOP = 30
+
+# the modules of the Qt wrappers
+QT_MODULES = ("PySide2", "shiboken2")
+
+# if the classes wrap a Qt object, by class
+_QT_CLASSES = dict()
+
+
+def is_qt(cls):
+    """Get if a class wraps a Qt object.
+
+    :param cls: The class to check.
+    :type cls: type
+
+    :return: True if the class or one of its bases is a Qt class.
+    :rtype: bool
+    """
+
+    result = _QT_CLASSES.get(cls)
+    if result is None:
+        result = _QT_CLASSES[cls] = any(
+            getattr(base, "__module__", "").startswith(QT_MODULES)
+            for base in getattr(cls, "__mro__", ())
+        )
+    return result
+
+
+def count_qt_wrappers():
+    """Count the live Qt wrappers by class.
+
+    :return: The number of instances by class path.
+    :rtype: dict
+    """
+
+    counts = dict()
+    for instance in gc.get_objects():
+        cls = type(instance)
+        if is_qt(cls):
+            name = "{}.{}".format(cls.__module__, cls.__name__)
+            counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+class MemoryAudit(object):
+    """Take tracemalloc snapshots and report the memory growth."""
+
+    def __init__(self, path=None, frames=FRAMES, top=TOP):
+        """Initialize the audit.
+
+        :param path: The complete path to the report. If none, the data folder.
+        :type path: str, none
+        :param frames: The number of frames stored by allocation.
+        :type frames: int
+        :param top: The number of allocation sites reported.
+        :type top: int
+        """
+
+        self.path = path
+        self.frames = frames
+        self.top = top
+
+        self.started = False
+        self.count = 0
+
+        self._first = None
+        self._previous = None
+        self._first_wrappers = dict()
+        self._first_traced = 0
+
+    def start(self):
+        """Start tracing the allocations and take the first snapshot."""
+
+        if self.started:
+            return
+
+        import tracemalloc
+
+        if self.path is None:
+            from pipeline.utils import database
+
+            self.path = os.path.join(database.Database().data_path, LOG_FILE)
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self.started = True
+
+        self._first = self._previous = self._take()
+        self._first_wrappers = count_qt_wrappers()
+        self._first_traced = tracemalloc.get_traced_memory()[0]
+        print("# Pipeline : Memory audit started -> {}".format(self.path))
+
+    def stop(self):
+        """Stop tracing the allocations."""
+
+        if not self.started:
+            return
+
+        import tracemalloc
+
+        tracemalloc.stop()
+        self.started = False
+        self._first = self._previous = None
+
+    def snapshot(self):
+        """Take a snapshot, compare it to the first and previous ones and log it.
+
+        :return: The report of the snapshot.
+        :rtype: dict
+        """
+
+        import tracemalloc
+
+        if not self.started:
+            self.start()
+
+        snapshot = self._take()
+        wrappers = count_qt_wrappers()
+        current, peak = tracemalloc.get_traced_memory()
+        self.count += 1
+
+        report = {
+            "snapshot": self.count,
+            "time": time.time(),
+            "traced": current,
+            "peak": peak,
+            "growth": current - self._first_traced,
+            "since_start": self._diff(snapshot, self._first),
+            "since_previous": self._diff(snapshot, self._previous),
+            "qt_wrappers": {
+                name: {
+                    "count": count,
+                    "since_start": count - self._first_wrappers.get(name, 0),
+                }
+                for name, count in sorted(
+                    wrappers.items(), key=lambda item: item[1], reverse=True
+                )
+            },
+        }
+        self._previous = snapshot
+
+        self._log(report)
+
+        from pipeline.utils import units
+
+        growth = report["growth"]
+        print(
+            "# Pipeline : Memory snapshot {} : {:.1f} {} traced, {}{:.1f} {}"
+            " since start, {} Qt wrappers".format(
+                self.count,
+                *units.convert_byte(current),
+                "-" if growth < 0 else "+",
+                *units.convert_byte(abs(growth)),
+                sum(wrappers.values())
+            )
+        )
+
+        return report
+
+    # private methods
+
+    def _take(self):
+        """Take a snapshot of the allocations, without the ones of the audit.
+
+        :return: The snapshot.
+        :rtype: tracemalloc.Snapshot
+        """
+
+        import tracemalloc
+
+        return tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+                tracemalloc.Filter(False, "<unknown>"),
+            )
+        )
+
+    def _diff(self, snapshot, other):
+        """Compare two snapshots by allocation site.
+
+        :param snapshot: The new snapshot.
+        :type snapshot: tracemalloc.Snapshot
+        :param other: The old snapshot.
+        :type other: tracemalloc.Snapshot
+
+        :return: The sites that grew the most, with their size and allocations.
+        :rtype: list
+        """
+
+        key = "traceback" if self.frames > 1 else "lineno"
+        statistics = snapshot.compare_to(other, key)
+        return [
+            {
+                "site": [
+                    "{}:{}".format(frame.filename, frame.lineno)
+                    for frame in statistic.traceback
+                ],
+                "size": statistic.size,
+                "size_diff": statistic.size_diff,
+                "count": statistic.count,
+                "count_diff": statistic.count_diff,
+            }
+            for statistic in statistics[: self.top]
+        ]
+
+    def _log(self, report):
+        """Append a report to the log.
+
+        :param report: The report of a snapshot.
+        :type report: dict
+        """
+
+        try:
+            with open(self.path, "a") as log:
+                log.write(json.dumps(report, separators=(",", ":")) + "\n")
+        except OSError as error:
+            print("# Pipeline : Memory report not written -> {!r}".format(error))
+
+
+# the audit shared by the whole pipeline
+AUDIT = MemoryAudit()
+
+
+def snapshot():
+    """Take a snapshot of the memory, starting the audit if needed.
+
+    :return: The report of the snapshot.
+    :rtype: dict
+    """
+
+    return AUDIT.snapshot()
+
+
+def get_interval():
+    """Get the time between two snapshots set by the PIPELINE_MEMORY_AUDIT variable.
+
+    :return: The time in seconds, 0 for on demand snapshots only.
+        None if the memory isn't audited.
+    :rtype: float, none
+    """
+
+    value = os.environ.get(ENVIRONMENT_VARIABLE)
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        return 0
@@ -0,0 +1,432 @@
+"""Count what the pipeline does during a session.
+
+The registry holds counters, gauges and latency histograms with fixed buckets,
+each optionally split by labels :
+
+    metrics.counter("files_copied_total", "The files copied.").inc()
+    metrics.counter("catalog_listings_total", "...").inc(result="hit")
+    metrics.histogram("export_duration_seconds", "...").observe(12.3, task="rig")
+
+Set the PIPELINE_METRICS environment variable to dump the metrics on exit,
+in the prometheus text format and in json : "1" dumps them in the data folder,
+else it is the folder to dump them in. The files are named after the machine,
+so the dumps of every machine can be gathered in a shared folder to compare them.
+"""
+
+import atexit
+import bisect
+import functools
+import json
+import os
+import platform
+import threading
+import time
+
+ENVIRONMENT_VARIABLE = "PIPELINE_METRICS"
+
+# the upper bounds in seconds of the latency histograms buckets
+BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300)
+
+
+class Metric(object):
+    """A value by labels."""
+
+    type = None
+
+    def __init__(self, name, help=""):
+        """Initialize the metric.
+
+        :param name: The metric name, prometheus style. (eg: "files_copied_total")
+        :type name: str
+        :param help: What the metric counts.
+        :type help: str
+        """
+
+        self.name = name
+        self.help = help
+
+        # the value by sorted (label, value) tuples
+        self.values = dict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted(labels.items()))
+
+    def get(self, **labels):
+        """Get the value for labels.
+
+        :return: The value, none if it was never set.
+        :rtype: float, none
+        """
+
+        return self.values.get(self._key(labels))
+
+    def samples(self):
+        """Get the prometheus samples of the metric.
+
+        :return: The (name, labels, value) samples.
+        :rtype: list
+        """
+
+        with self._lock:
+            return [
+                (self.name, dict(key), value) for key, value in self.values.items()
+            ]
+
+
+class Counter(Metric):
+    """A value that only goes up."""
+
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        """Increase the counter.
+
+        :param amount: The amount to add.
+        :type amount: float
+        """
+
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """A value that goes up and down."""
+
+    type = "gauge"
+
+    def set(self, value, **labels):
+        """Set the gauge value.
+
+        :param value: The value.
+        :type value: float
+        """
+
+        with self._lock:
+            self.values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        """Increase the gauge, decrease it with a negative amount.
+
+        :param amount: The amount to add.
+        :type amount: float
+        """
+
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Histogram(Metric):
+    """Count the observed values in fixed buckets."""
+
+    type = "histogram"
+
+    def __init__(self, name, help="", buckets=BUCKETS):
+        """Initialize the histogram.
+
+        :param name: The metric name, prometheus style. (eg: "export_seconds")
+        :type name: str
+        :param help: What the metric measures.
+        :type help: str
+        :param buckets: The sorted upper bounds of the buckets.
+        :type buckets: tuple
+        """
+
+        super(Histogram, self).__init__(name, help)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        """Count a value in its bucket.
+
+        :param value: The observed value. (eg: a duration in seconds)
+        :type value: float
+        """
+
+        key = self._key(labels)
+        with self._lock:
+            counts = self.values.get(key)
+            if counts is None:
+                # the count of every bucket, the count above them and the sum
+                counts = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            counts[-1] += value
+
+    def time(self, **labels):
+        """Get a context manager observing the time spent in it.
+
+        :return: The timer.
+        :rtype: _Timer
+        """
+
+        return _Timer(self, labels)
+
+    def samples(self):
+        """Get the prometheus samples of the histogram, with cumulative buckets.
+
+        :return: The (name, labels, value) samples.
+        :rtype: list
+        """
+
+        samples = list()
+        with self._lock:
+            for key, counts in self.values.items():
+                labels = dict(key)
+                total = 0
+                for bound, count in zip(self.buckets + ("+Inf",), counts):
+                    total += count
+                    bucket_labels = dict(labels, le=str(bound))
+                    samples.append((self.name + "_bucket", bucket_labels, total))
+                samples.append((self.name + "_count", labels, total))
+                samples.append((self.name + "_sum", labels, counts[-1]))
+
+        return samples
+
+
+class _Timer(object):
+    """Observe the time spent in a with statement."""
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.histogram.observe(time.perf_counter() - self._start, **self.labels)
+
+
+class Registry(object):
+    """Hold the metrics of the session."""
+
+    def __init__(self):
+        """Initialize the registry."""
+
+        self.metrics = dict()
+        self.start = time.time()
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, **kwargs):
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, help, **kwargs)
+            elif not isinstance(metric, cls):
+                raise TypeError(
+                    "# Pipeline : The metric {} is a {}".format(name, metric.type)
+                )
+        return metric
+
+    def counter(self, name, help=""):
+        """Get a counter, created on first use.
+
+        :return: The counter.
+        :rtype: Counter
+        """
+
+        return self._get(Counter, name, help)
+
+    def gauge(self, name, help=""):
+        """Get a gauge, created on first use.
+
+        :return: The gauge.
+        :rtype: Gauge
+        """
+
+        return self._get(Gauge, name, help)
+
+    def histogram(self, name, help="", buckets=BUCKETS):
+        """Get a histogram, created on first use.
+
+        :return: The histogram.
+        :rtype: Histogram
+        """
+
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    # dump the metrics
+
+    def get_labels(self):
+        """Get the labels of every sample, to compare the machines and versions.
+
+        :return: The machine, pipeline version and session start.
+        :rtype: dict
+        """
+
+        import pipeline
+
+        return {
+            "machine": platform.node(),
+            "version": pipeline.__version__,
+            "session": str(int(self.start)),
+        }
+
+    def to_prometheus(self):
+        """Get the metrics in the prometheus text format.
+
+        :return: The metrics.
+        :rtype: str
+        """
+
+        common = self.get_labels()
+
+        lines = list()
+        for name, metric in sorted(self.metrics.items()):
+            lines.append("# HELP {} {}".format(name, metric.help))
+            lines.append("# TYPE {} {}".format(name, metric.type))
+            for sample, labels, value in metric.samples():
+                labels = ",".join(
+                    '{}="{}"'.format(key, str(label).replace('"', '\\"'))
+                    for key, label in sorted(dict(common, **labels).items())
+                )
+                lines.append("{}{{{}}} {}".format(sample, labels, value))
+
+        return "\n".join(lines) + "\n"
+
+    def to_json(self):
+        """Get the metrics as a json serializable dict.
+
+        :return: The labels of the session and the samples by metric name.
+        :rtype: dict
+        """
+
+        return {
+            "labels": self.get_labels(),
+            "duration": time.time() - self.start,
+            "metrics": {
+                name: {
+                    "type": metric.type,
+                    "help": metric.help,
+                    "samples": [
+                        {"name": sample, "labels": labels, "value": value}
+                        for sample, labels, value in metric.samples()
+                    ],
+                }
+                for name, metric in sorted(self.metrics.items())
+            },
+        }
+
+    def dump(self, directory=None):
+        """Write the metrics in the prometheus and json formats.
+
+        :param directory: The folder to write in. If none, the data folder.
+        :type directory: str, none
+
+        :return: The complete paths to the .prom and .json files.
+        :rtype: tuple
+        """
+
+        if directory is None:
+            from pipeline.utils import database
+
+            directory = database.Database().data_path
+        os.makedirs(directory, exist_ok=True)
+
+        basename = os.path.join(directory, "metrics_" + platform.node())
+        paths = list()
+        for extension, content in (
+            (".prom", self.to_prometheus()),
+            (".json", json.dumps(self.to_json(), indent=4)),
+        ):
+            path = basename + extension
+            with open(path + ".tmp", "w") as metrics_file:
+                metrics_file.write(content)
+            os.replace(path + ".tmp", path)
+            paths.append(path)
+
+        return tuple(paths)
+
+
+# the registry shared by the whole pipeline
+REGISTRY = Registry()
+
+
+def counter(name, help=""):
+    """Get a counter of the shared registry, created on first use.
+
+    :param name: The metric name, prometheus style. (eg: "files_copied_total")
+    :type name: str
+    :param help: What the metric counts.
+    :type help: str
+
+    :return: The counter.
+    :rtype: Counter
+    """
+
+    return REGISTRY.counter(name, help)
+
+
+def gauge(name, help=""):
+    """Get a gauge of the shared registry, created on first use.
+
+    :param name: The metric name, prometheus style.
+    :type name: str
+    :param help: What the metric measures.
+    :type help: str
+
+    :return: The gauge.
+    :rtype: Gauge
+    """
+
+    return REGISTRY.gauge(name, help)
+
+
+def histogram(name, help="", buckets=BUCKETS):
+    """Get a histogram of the shared registry, created on first use.
+
+    :param name: The metric name, prometheus style. (eg: "export_duration_seconds")
+    :type name: str
+    :param help: What the metric measures.
+    :type help: str
+    :param buckets: The sorted upper bounds of the buckets.
+    :type buckets: tuple
+
+    :return: The histogram.
+    :rtype: Histogram
+    """
+
+    return REGISTRY.histogram(name, help, buckets)
+
+
+def timed(metric, **labels):
+    """Decorate a function to observe the duration of its calls in a histogram.
+
+    :param metric: The histogram observing the durations.
+    :type metric: Histogram
+
+    :return: The decorator.
+    :rtype: callable
+    """
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with metric.time(**labels):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _dump_on_exit(directory):
+    """Dump the metrics, the process is exiting.
+
+    :param directory: The folder to write in. If none, the data folder.
+    :type directory: str, none
+    """
+
+    try:
+        REGISTRY.dump(directory)
+    except OSError as error:
+        print("# Pipeline : Metrics not dumped -> {!r}".format(error))
+
+
+_value = os.environ.get(ENVIRONMENT_VARIABLE)
+if _value:
+    atexit.register(_dump_on_exit, None if _value == "1" else _value)
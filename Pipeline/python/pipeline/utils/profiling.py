@@ -0,0 +1,207 @@
+"""Profile the next action triggered in the UI with cProfile.
+
+Once armed, the next decorated callback runs under cProfile, as the jobs it submits.
+Every profile is saved next to the trace logs as a .prof file, to open with
+pstats or snakeviz, and a text summary of the functions taking the most time.
+
+    @profiling.profiled
+    def finish_asset(self):
+        ...
+
+The profiles measure the wall time, the dialogs opened by the action included.
+"""
+
+import functools
+import os
+import threading
+import time
+
+# the number of functions in the text summaries
+TOP = 40
+
+# the prefix of the profile files
+PREFIX = "profile_"
+
+
+class ActionProfiler(object):
+    """Profile the next action, once armed."""
+
+    def __init__(self, top=TOP):
+        """Initialize the profiler.
+
+        :param top: The number of functions in the text summaries.
+        :type top: int
+        """
+
+        self.top = top
+        self.armed = False
+
+        # the action profiled by the current thread
+        self._local = threading.local()
+
+    def arm(self, armed=True):
+        """Profile the next action or stop waiting for it.
+
+        :param armed: True to profile the next action.
+        :type armed: bool
+        """
+
+        self.armed = armed
+
+    @property
+    def action(self):
+        """Get the action profiled in the current thread.
+
+        :return: The action name, none if not profiling.
+        :rtype: str, none
+        """
+
+        return getattr(self._local, "action", None)
+
+    def run(self, name, function, *args, **kwargs):
+        """Run a function under cProfile and save the profile.
+
+        :param name: The name of the profile. (eg: "finish_asset")
+        :type name: str
+        :param function: The function to profile.
+        :type function: callable
+
+        :return: The function result.
+        :rtype: any
+        """
+
+        import cProfile
+
+        profile = cProfile.Profile()
+
+        previous = self.action
+        self._local.action = name
+        try:
+            return profile.runcall(function, *args, **kwargs)
+        finally:
+            self._local.action = previous
+            try:
+                self.save(profile, name)
+            except OSError as error:
+                print("# Pipeline : Profile not saved -> {!r}".format(error))
+
+    def save(self, profile, name):
+        """Save a profile and its text summary next to the trace logs.
+
+        :param profile: The profile to save.
+        :type profile: cProfile.Profile
+        :param name: The name of the profile.
+        :type name: str
+
+        :return: The complete paths to the .prof and .txt files.
+        :rtype: tuple
+        """
+
+        import io
+        import pstats
+
+        basename = os.path.join(
+            get_directory(),
+            "{}{}_{}".format(
+                PREFIX,
+                "".join(c if c.isalnum() else "_" for c in name),
+                time.strftime("%Y%m%d-%H%M%S"),
+            ),
+        )
+
+        profile.dump_stats(basename + ".prof")
+
+        summary = io.StringIO()
+        stats = pstats.Stats(profile, stream=summary)
+        stats.sort_stats("cumulative").print_stats(self.top)
+        with open(basename + ".txt", "w") as summary_file:
+            summary_file.write("{}\n{}".format(name, summary.getvalue()))
+
+        print(
+            "# Pipeline : {} profiled in {:.3f} s -> {}.prof".format(
+                name, stats.total_tt, basename
+            )
+        )
+
+        return basename + ".prof", basename + ".txt"
+
+
+# the profiler shared by the whole pipeline
+PROFILER = ActionProfiler()
+
+
+def get_directory():
+    """Get the folder of the trace logs, the data folder if not tracing.
+
+    :return: The folder path.
+    :rtype: str
+    """
+
+    from pipeline.utils import tracing
+
+    for sink in tracing.TRACER.sinks:
+        if isinstance(sink, tracing.JsonLinesSink):
+            return os.path.dirname(os.path.abspath(sink.path))
+
+    from pipeline.utils import database
+
+    return database.Database().data_path
+
+
+def arm(armed=True):
+    """Profile the next action or stop waiting for it.
+
+    :param armed: True to profile the next action.
+    :type armed: bool
+    """
+
+    PROFILER.arm(armed)
+
+
+def profiled(function):
+    """Decorate a callback of the UI to profile it when the profiler is armed.
+
+    :param function: The callback.
+    :type function: callable
+
+    :return: The decorated callback.
+    :rtype: callable
+    """
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        # the nested actions are part of the profiled one
+        if not PROFILER.armed:
+            return function(*args, **kwargs)
+        PROFILER.armed = False
+        return PROFILER.run(function.__name__, function, *args, **kwargs)
+
+    return wrapper
+
+
+def bind(name, function):
+    """Get a function profiled if the current thread is profiling an action.
+
+    :param name: The name of the job running the function.
+    :type name: str
+    :param function: The function to run in an other thread. (eg: a job)
+    :type function: callable
+
+    :return: The function, wrapped if profiling.
+    :rtype: callable
+    """
+
+    action = PROFILER.action
+    if action is None:
+        return function
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        # the job runs right away, already profiled with the action
+        if PROFILER.action is not None:
+            return function(*args, **kwargs)
+        return PROFILER.run(
+            "{} - {}".format(action, name), function, *args, **kwargs
+        )
+
+    return wrapper
@@ -3,6 +3,15 @@
 import json
 import os
 
+from pipeline.utils import metrics
+
+# the environment variable overriding the data folder
+DATA_PATH_VARIABLE = "PIPELINE_DATA_PATH"
+
+# the json files read and written by the database, by file
+JSON_READS = metrics.counter("database_json_reads_total", "The json files read.")
+JSON_WRITES = metrics.counter("database_json_writes_total", "The json files written.")
+
 
 class DatabaseProperties(object):
     """Manage the data base properties."""
@@ -14,7 +23,10 @@ class DatabaseProperties(object):
         # get the current working directories.
         # The number multiplying "../" being the amount of parent directory to ascend
         self.cwd = os.path.abspath(os.path.join(__file__, "../" * 4))
-        self.data_path = os.path.join(self.cwd, "data")
+        # the data folder may be moved, to work on other datas (eg: benchmarks)
+        self.data_path = os.environ.get(DATA_PATH_VARIABLE) or os.path.join(
+            self.cwd, "data"
+        )
         self.app_data_file = os.path.join(self.data_path, "appData.json")
         self.prefs_file = os.path.join(self.data_path, "prefs.json")
 
@@ -27,6 +39,7 @@ class DatabaseProperties(object):
         :rtype: dict
         """
 
+        JSON_READS.inc(file="appData")
         with open(self.app_data_file, "r") as app_data_file:
             return json.load(app_data_file)
 
@@ -38,6 +51,7 @@ class DatabaseProperties(object):
         :type app_data: dict
         """
 
+        JSON_WRITES.inc(file="appData")
         with open(self.app_data_file, "w") as app_data_file:
             app_data_file.write(json.dumps(app_data, indent=4))
 
@@ -50,6 +64,7 @@ class DatabaseProperties(object):
         :rtype: dict
         """
 
+        JSON_READS.inc(file="prefs")
         with open(self.prefs_file, "r") as prefs_file:
             return json.load(prefs_file)
 
@@ -61,5 +76,6 @@ class DatabaseProperties(object):
         :type prefs: dict
         """
 
+        JSON_WRITES.inc(file="prefs")
         with open(self.prefs_file, "w") as prefs_file:
             prefs_file.write(json.dumps(prefs, indent=4))
@@ -0,0 +1,308 @@
+"""Profile the startup of the pipeline.
+
+Set the PIPELINE_PROFILE_STARTUP environment variable to profile the launch :
+"1" writes the report in the data folder, a path ending with .json writes it there.
+The profiling starts with the first import of the pipeline package and stops
+once the main window is displayed. The report holds the wall time of every phase,
+the time spent importing every module and the number of files read.
+
+    {
+        "total": 1.2,
+        "phases": [{"name": "start checks", "start": 0.4, "duration": 0.01, ...}],
+        "imports": [{"module": "pipeline.ui.main", "cumulative": 0.3, "self": 0.01}],
+        "reads": {"count": 12, "files": {"path/to/appData.json": 4, ...}},
+    }
+"""
+
+import builtins
+import io
+import os
+import sys
+import time
+
+ENVIRONMENT_VARIABLE = "PIPELINE_PROFILE_STARTUP"
+REPORT_FILE = "startupProfile.json"
+
+
+class _TimedLoader(object):
+    """Time the execution of a module, delegating everything else to its loader."""
+
+    def __init__(self, loader, profiler):
+        """Initialize the loader.
+
+        :param loader: The loader of the module.
+        :type loader: Loader
+        :param profiler: The profiler to report to.
+        :type profiler: StartupProfiler
+        """
+
+        self.loader = loader
+        self.profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        # the module keeps its real loader
+        module.__loader__ = self.loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self.loader
+
+        self.profiler._start_import()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.profiler._stop_import(module.__name__)
+
+
+class _ImportFinder(object):
+    """Find the modules with the other finders and time their loading."""
+
+    def __init__(self, profiler):
+        """Initialize the finder.
+
+        :param profiler: The profiler to report to.
+        :type profiler: StartupProfiler
+        """
+
+        import importlib.util
+
+        self.profiler = profiler
+        self._find_spec = importlib.util.find_spec
+        self._finding = set()
+
+    def find_spec(self, name, path=None, target=None):
+        if name in self._finding:
+            return None
+
+        self._finding.add(name)
+        try:
+            spec = self._find_spec(name)
+        except (ImportError, ValueError):
+            return None
+        finally:
+            self._finding.discard(name)
+
+        if spec is None or not hasattr(spec.loader, "exec_module"):
+            return None
+        spec.loader = _TimedLoader(spec.loader, self.profiler)
+        return spec
+
+
+class _Phase(object):
+    """Record the wall time of a phase, doing nothing if not profiling."""
+
+    def __init__(self, profiler, name):
+        """Initialize the phase.
+
+        :param profiler: The profiler to report to.
+        :type profiler: StartupProfiler
+        :param name: The name of the phase.
+        :type name: str
+        """
+
+        self.profiler = profiler
+        self.name = name
+        self.entry = None
+
+    def __enter__(self):
+        profiler = self.profiler
+        if not profiler.enabled:
+            return self
+
+        self.entry = {
+            "name": self.name,
+            "depth": profiler._depth,
+            "start": time.perf_counter() - profiler._start,
+            "duration": None,
+        }
+        profiler._phases.append(self.entry)
+        profiler._depth += 1
+        return self
+
+    def __exit__(self, *args):
+        if self.entry is None:
+            return
+
+        profiler = self.profiler
+        profiler._depth -= 1
+        self.entry["duration"] = (
+            time.perf_counter() - profiler._start - self.entry["start"]
+        )
+
+
+class StartupProfiler(object):
+    """Record the phases, imports and file reads of the startup."""
+
+    def __init__(self):
+        """Initialize the profiler."""
+
+        self.enabled = False
+        self.path = None
+
+        self._start = None
+        self._phases = list()
+        self._depth = 0
+        self._imports = dict()
+        self._import_stack = list()
+        self._reads = dict()
+        self._finder = None
+        self._open = None
+
+    def start(self, path=None):
+        """Start profiling.
+
+        :param path: The complete path to the json report.
+            If none, write it in the data folder.
+        :type path: str, none
+        """
+
+        if self.enabled:
+            return
+
+        self.enabled = True
+        self.path = path
+        self._start = time.perf_counter()
+
+        # time the imports
+        self._finder = _ImportFinder(self)
+        sys.meta_path.insert(0, self._finder)
+
+        # count the files read
+        self._open = builtins.open
+        builtins.open = self._counted_open
+        io.open = self._counted_open
+
+    def stop(self):
+        """Stop profiling and write the report.
+
+        :return: The report, none if it wasn't profiling.
+        :rtype: dict, none
+        """
+
+        if not self.enabled:
+            return None
+
+        self.enabled = False
+        sys.meta_path.remove(self._finder)
+        builtins.open = self._open
+        io.open = self._open
+
+        import json
+
+        report = self.report()
+
+        path = self.path
+        if path is None:
+            from pipeline.utils import database
+
+            path = os.path.join(database.Database().data_path, REPORT_FILE)
+        with open(path, "w") as report_file:
+            json.dump(report, report_file, indent=4)
+        print(
+            "# Pipeline : Startup profiled in {:.3f} s -> {}".format(
+                report["total"], path
+            )
+        )
+
+        return report
+
+    def report(self):
+        """Get what was recorded so far.
+
+        :return: The total time, the phases, the imports and the file reads.
+        :rtype: dict
+        """
+
+        imports = [
+            {"module": module, "cumulative": times[0], "self": times[1]}
+            for module, times in self._imports.items()
+        ]
+        imports.sort(key=lambda entry: entry["cumulative"], reverse=True)
+
+        return {
+            "total": time.perf_counter() - self._start,
+            "phases": list(self._phases),
+            "imports": imports,
+            "reads": {"count": sum(self._reads.values()), "files": dict(self._reads)},
+        }
+
+    def phase(self, name):
+        """Record the wall time of a phase of the startup.
+
+        :param name: The name of the phase.
+        :type name: str
+
+        :return: The context recording the phase.
+        :rtype: _Phase
+        """
+
+        return _Phase(self, name)
+
+    # private methods
+
+    def _start_import(self):
+        """Start timing a module execution."""
+
+        # the start time and the time spent importing the nested modules
+        self._import_stack.append([time.perf_counter(), 0.0])
+
+    def _stop_import(self, module):
+        """Stop timing a module execution.
+
+        :param module: The module name.
+        :type module: str
+        """
+
+        start, nested = self._import_stack.pop()
+        cumulative = time.perf_counter() - start
+        self._imports[module] = (cumulative, cumulative - nested)
+        if self._import_stack:
+            self._import_stack[-1][1] += cumulative
+
+    def _counted_open(self, file, mode="r", *args, **kwargs):
+        """Open a file, counting it if it is read."""
+
+        if "r" in mode and "+" not in mode and not isinstance(file, int):
+            path = os.fsdecode(file)
+            self._reads[path] = self._reads.get(path, 0) + 1
+
+        return self._open(file, mode, *args, **kwargs)
+
+
+# the profiler shared by the whole pipeline
+PROFILER = StartupProfiler()
+
+
+def start():
+    """Start profiling if the PIPELINE_PROFILE_STARTUP environment variable is set."""
+
+    value = os.environ.get(ENVIRONMENT_VARIABLE)
+    if value:
+        PROFILER.start(value if value.lower().endswith(".json") else None)
+
+
+def phase(name):
+    """Record the wall time of a phase of the startup, if profiling.
+
+    :param name: The name of the phase.
+    :type name: str
+
+    :return: The context recording the phase.
+    :rtype: _Phase
+    """
+
+    return PROFILER.phase(name)
+
+
+def stop():
+    """Stop profiling and write the report, if profiling.
+
+    :return: The report, none if it wasn't profiling.
+    :rtype: dict, none
+    """
+
+    return PROFILER.stop()
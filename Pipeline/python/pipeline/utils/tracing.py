@@ -0,0 +1,399 @@
+"""Trace the pipeline operations with timed spans.
+
+A span times an operation and counts the bytes it wrote and the files it touched,
+its nested spans adding to it. Once over, it is sent to the sinks :
+a rotating json lines log and the console, printing the "# Pipeline : " lines.
+
+    with tracing.span("publish", task="rig") as span:
+        ...
+        span.set(asset="ch_character")
+
+    @tracing.traced("save def")
+    def save_def():
+        ...
+
+Set the PIPELINE_TRACE environment variable to enable the tracing :
+"1" logs in the data folder, a path ending with .jsonl logs there.
+When disabled, a span is a shared object doing nothing.
+"""
+
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+
+ENVIRONMENT_VARIABLE = "PIPELINE_TRACE"
+LOG_FILE = "trace.jsonl"
+
+# the size of the log before it is rotated and the number of old logs kept
+MAX_BYTES = 10 * 1024 * 1024
+BACKUPS = 3
+
+
+class Span(object):
+    """Time an operation and count what it did."""
+
+    _ids = itertools.count(1)
+    _lock = threading.Lock()
+
+    def __init__(self, tracer, name, parent=None, attributes=None):
+        """Initialize the span.
+
+        :param tracer: The tracer sending the span to the sinks.
+        :type tracer: Tracer
+        :param name: The name of the operation.
+        :type name: str
+        :param parent: The span the operation is part of.
+            If none, the span running in the current thread.
+        :type parent: Span, none
+        :param attributes: The informations on the operation.
+        :type attributes: dict, none
+        """
+
+        self.tracer = tracer
+        self.name = name
+        self.parent = parent
+        self.attributes = attributes or dict()
+
+        self.id = next(self._ids)
+        self.start = None
+        self.duration = None
+        self.bytes = 0
+        self.files = 0
+        self.error = None
+
+        self._started = None
+
+    def __enter__(self):
+        if self.parent is None:
+            self.parent = self.tracer.current()
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.tracer._push(self)
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        self.duration = time.perf_counter() - self._started
+        self.tracer._pop(self)
+        if error_type is not None:
+            self.error = "{}: {}".format(error_type.__name__, error)
+
+        # the nested operations are part of their parent
+        if self.parent is not None:
+            self.parent.add(self.bytes, self.files)
+
+        self.tracer.emit(self)
+
+    def add(self, bytes=0, files=0):
+        """Count the bytes written and the files touched by the operation.
+
+        :param bytes: The number of bytes written.
+        :type bytes: int
+        :param files: The number of files touched.
+        :type files: int
+        """
+
+        # the nested operations may run in other threads
+        with self._lock:
+            self.bytes += bytes
+            self.files += files
+
+    def set(self, **attributes):
+        """Add informations on the operation."""
+
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        """Get the span as a json serializable record.
+
+        :return: The span record.
+        :rtype: dict
+        """
+
+        return {
+            "id": self.id,
+            "parent": None if self.parent is None else self.parent.id,
+            "name": self.name,
+            "start": self.start,
+            "duration": self.duration,
+            "bytes": self.bytes,
+            "files": self.files,
+            "error": self.error,
+            "thread": threading.current_thread().name,
+            "attributes": self.attributes,
+        }
+
+
+class _NullSpan(object):
+    """A span doing nothing, used when the tracing is disabled."""
+
+    id = None
+    parent = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def add(self, bytes=0, files=0):
+        pass
+
+    def set(self, **attributes):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class JsonLinesSink(object):
+    """Write the spans in a json lines log, rotated once too big."""
+
+    def __init__(self, path, max_bytes=MAX_BYTES, backups=BACKUPS):
+        """Initialize the sink.
+
+        :param path: The complete path to the log.
+        :type path: str
+        :param max_bytes: The size of the log before it is rotated.
+        :type max_bytes: int
+        :param backups: The number of rotated logs kept. (log.1, log.2...)
+        :type backups: int
+        """
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+        self._lock = threading.Lock()
+
+    def __call__(self, span):
+        line = json.dumps(span.to_dict(), default=str, separators=(",", ":")) + "\n"
+        with self._lock:
+            try:
+                if os.path.getsize(self.path) + len(line) > self.max_bytes:
+                    self._rotate()
+            except OSError:
+                pass
+            with open(self.path, "a") as log:
+                log.write(line)
+
+    def _rotate(self):
+        """Rename the log to log.1, the previous log.1 to log.2 and so on."""
+
+        for index in range(self.backups, 0, -1):
+            source = self.path if index == 1 else "{}.{}".format(self.path, index - 1)
+            if os.path.exists(source):
+                os.replace(source, "{}.{}".format(self.path, index))
+
+
+class ConsoleSink(object):
+    """Print the operations that are not part of an other one."""
+
+    def __call__(self, span):
+        if span.parent is not None:
+            return
+
+        from pipeline.utils import units
+
+        print(
+            "# Pipeline : {} {} in {:.3f} s ({} files, {} {})".format(
+                span.name,
+                "failed" if span.error else "done",
+                span.duration,
+                span.files,
+                *units.convert_byte(span.bytes)
+            )
+        )
+
+
+class Tracer(object):
+    """Create the spans and send them to the sinks once over."""
+
+    def __init__(self):
+        """Initialize the tracer."""
+
+        self.enabled = False
+        self.sinks = list()
+
+        # the running spans by thread identifier, the innermost last
+        self._stacks = dict()
+
+    def enable(self, path=None):
+        """Log the spans in a json lines log and print them in the console.
+
+        :param path: The complete path to the log. If none, log in the data folder.
+        :type path: str, none
+        """
+
+        if path is None:
+            from pipeline.utils import database
+
+            path = os.path.join(database.Database().data_path, LOG_FILE)
+
+        self.sinks = [JsonLinesSink(path), ConsoleSink()]
+        self.enabled = True
+
+    def disable(self):
+        """Stop tracing."""
+
+        self.enabled = False
+        self.sinks = list()
+
+    def span(self, name, parent=None, **attributes):
+        """Get a span timing an operation.
+
+        :param name: The name of the operation.
+        :type name: str
+        :param parent: The span the operation is part of.
+            If none, the span running in the current thread.
+        :type parent: Span, none
+
+        :return: The span to use as a context manager.
+        :rtype: Span
+        """
+
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, parent, attributes)
+
+    def current(self, thread=None):
+        """Get the span running in a thread.
+
+        :param thread: The thread identifier. If none, the current thread.
+        :type thread: int, none
+
+        :return: The innermost span, none if there is none.
+        :rtype: Span, none
+        """
+
+        stack = self._stacks.get(threading.get_ident() if thread is None else thread)
+        return stack[-1] if stack else None
+
+    def emit(self, span):
+        """Send a span over to the sinks.
+
+        :param span: The span over.
+        :type span: Span
+        """
+
+        for sink in self.sinks:
+            try:
+                sink(span)
+            except Exception as error:
+                print("# Pipeline : Tracing sink failed -> {!r}".format(error))
+
+    # private methods
+
+    def _push(self, span):
+        self._stacks.setdefault(threading.get_ident(), list()).append(span)
+
+    def _pop(self, span):
+        thread = threading.get_ident()
+        stack = self._stacks.get(thread, list())
+        if span in stack:
+            stack.remove(span)
+        if not stack:
+            self._stacks.pop(thread, None)
+
+
+# the tracer shared by the whole pipeline
+TRACER = Tracer()
+
+_value = os.environ.get(ENVIRONMENT_VARIABLE)
+if _value:
+    TRACER.enable(_value if _value.lower().endswith(".jsonl") else None)
+
+
+def span(name, parent=None, **attributes):
+    """Get a span timing an operation.
+
+    :param name: The name of the operation.
+    :type name: str
+    :param parent: The span the operation is part of.
+        If none, the span running in the current thread.
+    :type parent: Span, none
+
+    :return: The span to use as a context manager.
+    :rtype: Span
+    """
+
+    return TRACER.span(name, parent, **attributes)
+
+
+def traced(name=None):
+    """Decorate a function to time each of its calls in a span.
+
+    :param name: The name of the operation. If none, use the function name.
+    :type name: str, none
+
+    :return: The decorator.
+    :rtype: callable
+    """
+
+    def decorator(function):
+        label = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return function(*args, **kwargs)
+            with Span(TRACER, label):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def bind(function):
+    """Get a function counting in the current span, whatever the thread calling it.
+
+    :param function: The function to run in an other thread. (eg: in a pool)
+    :type function: callable
+
+    :return: The function, wrapped if there is a current span.
+    :rtype: callable
+    """
+
+    parent = current()
+    if parent is None:
+        return function
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        TRACER._push(parent)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            TRACER._pop(parent)
+
+    return wrapper
+
+
+def current():
+    """Get the span running in the current thread.
+
+    :return: The innermost span, none if there is none or the tracing is disabled.
+    :rtype: Span, none
+    """
+
+    return TRACER.current() if TRACER.enabled else None
+
+
+def add(bytes=0, files=0):
+    """Count bytes written and files touched in the span of the current thread.
+
+    :param bytes: The number of bytes written.
+    :type bytes: int
+    :param files: The number of files touched.
+    :type files: int
+    """
+
+    if not TRACER.enabled:
+        return
+
+    span = TRACER.current()
+    if span is not None:
+        span.add(bytes, files)
@@ -0,0 +1,204 @@
+"""Notice when the main thread is blocked and log what it was doing.
+
+The main thread ticks the watchdog from its event loop. When it didn't tick
+for longer than the threshold, the watchdog thread captures the main thread stack
+and logs it with the pipeline operation running right away, once per stall,
+so a freeze that never ends is logged too. Once the main thread ticks again,
+a recovery record with the stall duration is appended.
+
+Set the PIPELINE_WATCHDOG environment variable to the threshold in seconds
+to watch the UI. (eg: "0.5")
+"""
+
+import collections
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+
+from pipeline.utils import metrics, tracing
+
+ENVIRONMENT_VARIABLE = "PIPELINE_WATCHDOG"
+LOG_FILE = "stalls.jsonl"
+
+# the time in seconds the main thread can be blocked before it is logged
+THRESHOLD = 0.5
+
+# the time in seconds between two ticks of the main thread
+HEARTBEAT = 0.1
+
+# the number of stalls kept in memory, the log keeps them all
+MAX_STALLS = 100
+
+# the root of the modules of the pipeline, to find the pipeline code in a stack
+PACKAGE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STALLS = metrics.histogram(
+    "ui_stall_seconds", "The time the main thread was blocked, over the threshold."
+)
+
+
+class Watchdog(object):
+    """Watch the main thread from a background thread."""
+
+    def __init__(self, threshold=THRESHOLD, path=None):
+        """Initialize the watchdog.
+
+        :param threshold: The time in seconds the main thread can be blocked.
+        :type threshold: float
+        :param path: The complete path to the stalls log.
+            If none, log in the data folder.
+        :type path: str, none
+        """
+
+        self.threshold = threshold
+        self.path = path
+
+        self.stalls = collections.deque(maxlen=MAX_STALLS)
+
+        self._main = threading.main_thread().ident
+        self._last_tick = time.monotonic()
+        self._stall = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """Start watching the main thread."""
+
+        if self._thread is not None:
+            return
+
+        if self.path is None:
+            from pipeline.utils import database
+
+            self.path = os.path.join(database.Database().data_path, LOG_FILE)
+
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="PipelineWatchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching the main thread."""
+
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def tick(self):
+        """Tell the watchdog the main thread isn't blocked, from the main thread."""
+
+        self._last_tick = time.monotonic()
+
+        # the main thread is back, log how long the stall lasted
+        stall = self._stall
+        if stall is not None:
+            self._stall = None
+            stall["duration"] = self._last_tick - stall.pop("since")
+            STALLS.observe(stall["duration"])
+            print(
+                "# Pipeline : UI blocked for {:.2f} s in {}".format(
+                    stall["duration"], stall["operation"]
+                )
+            )
+            self._log(
+                {
+                    "event": "recovered",
+                    "time": time.time(),
+                    "stall": stall["time"],
+                    "operation": stall["operation"],
+                    "duration": stall["duration"],
+                }
+            )
+
+    def capture(self):
+        """Capture what the main thread is doing.
+
+        :return: The pipeline operation running and the main thread stack.
+        :rtype: tuple
+        """
+
+        frame = sys._current_frames().get(self._main)
+        if frame is None:
+            return None, list()
+        stack = traceback.extract_stack(frame)
+
+        # the operation traced, else the innermost function of the pipeline
+        span = tracing.TRACER.current(self._main)
+        if span is not None:
+            operation = span.name
+        else:
+            operation = None
+            for entry in reversed(stack):
+                if os.path.abspath(entry.filename).startswith(PACKAGE):
+                    module = os.path.relpath(entry.filename, PACKAGE)
+                    operation = "{} ({}:{})".format(entry.name, module, entry.lineno)
+                    break
+
+        return operation, traceback.format_list(stack)
+
+    # private methods
+
+    def _watch(self):
+        """Check the main thread ticks, in the watchdog thread."""
+
+        while not self._stop.wait(HEARTBEAT):
+            since = self._last_tick
+            if self._stall is not None or time.monotonic() - since < self.threshold:
+                continue
+
+            # log it now, the main thread may never come back
+            operation, stack = self.capture()
+            stall = {
+                "time": time.time(),
+                "operation": operation or "unknown",
+                "stack": stack,
+            }
+            print(
+                "# Pipeline : UI blocked for more than {} s in {}".format(
+                    self.threshold, stall["operation"]
+                )
+            )
+            self._log(dict(stall, event="stall", threshold=self.threshold))
+
+            stall["since"] = since
+            self.stalls.append(stall)
+            self._stall = stall
+
+    def _log(self, record):
+        """Append a stall or recovery record to the log, from any thread.
+
+        :param record: The stall or recovery informations.
+        :type record: dict
+        """
+
+        try:
+            with self._lock, open(self.path, "a") as log:
+                log.write(json.dumps(record, separators=(",", ":")) + "\n")
+        except OSError as error:
+            print("# Pipeline : Stall not logged -> {!r}".format(error))
+
+
+def from_environment():
+    """Get a watchdog if the PIPELINE_WATCHDOG environment variable is set.
+
+    :return: The watchdog, not started. None if the UI isn't watched.
+    :rtype: Watchdog, none
+    """
+
+    value = os.environ.get(ENVIRONMENT_VARIABLE)
+    if not value:
+        return None
+
+    try:
+        return Watchdog(float(value))
+    except ValueError:
+        return Watchdog()
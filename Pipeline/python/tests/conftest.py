@@ -0,0 +1,14 @@
+"""Let the tests import the api where the studio library is not installed."""
+
+import sys
+import types
+
+# the paths only need the studio strings when naming assets, not in the tests
+try:
+    import python_core.types.strings
+except ImportError:
+    for name in ("python_core", "python_core.types", "python_core.types.strings"):
+        module = sys.modules[name] = types.ModuleType(name)
+        parent, _, child = name.rpartition(".")
+        if parent:
+            setattr(sys.modules[parent], child, module)
@@ -0,0 +1,66 @@
+"""Check the duplicate files are grouped by content, once per inode."""
+
+import os
+
+from pipeline.api.storage import dedup
+
+# bigger than a partial hash, so the full hash splits the groups
+SIZE = dedup.PARTIAL_SIZE * 3
+
+
+def write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return str(path)
+
+
+def find_duplicates(workspace):
+    cache = dedup.HashCache(str(workspace.parent / dedup.CACHE_FILE))
+    return dedup.find_duplicates(str(workspace), min_size=1, workers=2, cache=cache)
+
+
+def test_groups(tmp_path):
+    workspace = tmp_path / "workspace"
+    content = os.urandom(SIZE)
+    # the same beginning and end, only the middle differs
+    middle = content[: SIZE // 2] + b"middle" + content[SIZE // 2 + 6 :]
+    small = b"small"
+
+    same = sorted(
+        write(workspace / folder / "ch_bob_rig.ma", content)
+        for folder in ("DEF", "WIP", "export")
+    )
+    write(workspace / "other" / "ch_bob_rig.ma", middle)
+    small_files = sorted(
+        write(workspace / folder / "small.ma", small) for folder in ("DEF", "WIP")
+    )
+    write(workspace / "unique.ma", os.urandom(SIZE))
+    write(workspace / ".git" / "objects" / "ch_bob_rig.ma", content)
+
+    # a hardlink shares the data already, it is listed but not counted
+    hardlink = str(workspace / "hardlink.ma")
+    os.link(same[0], hardlink)
+
+    groups = find_duplicates(workspace)
+
+    assert groups == [
+        (SIZE, sorted(same + [hardlink])),
+        (len(small), small_files),
+    ]
+    assert dedup.reclaimable(groups) == SIZE * 2 + len(small)
+
+
+def test_cache_reused(tmp_path, monkeypatch):
+    workspace = tmp_path / "workspace"
+    content = os.urandom(SIZE)
+    for folder in ("DEF", "WIP"):
+        write(workspace / folder / "ch_bob_rig.ma", content)
+    groups = find_duplicates(workspace)
+
+    # the unchanged files are not read again
+    def fail(*args):
+        raise AssertionError("hashed again")
+
+    monkeypatch.setattr(dedup, "partial_hash", fail)
+    monkeypatch.setattr(dedup, "full_hash", fail)
+    assert find_duplicates(workspace) == groups
@@ -0,0 +1,86 @@
+"""Check the executor callbacks order and the jobs cancellation."""
+
+import queue
+import threading
+
+import pytest
+
+from pipeline.utils import executor
+
+# the maximum time to wait for a job, not to hang the tests
+TIMEOUT = 10
+
+
+def dispatch_until_done(dispatched, jobs):
+    """Call the dispatched functions, as the main thread does, until the jobs end."""
+
+    while not all(job.done for job in jobs) or not dispatched.empty():
+        dispatched.get(timeout=TIMEOUT)()
+
+
+def test_synchronous_until_started():
+    results = list()
+    job = executor.Executor().submit("job", lambda: 1, callback=results.append)
+
+    assert job.done
+    assert results == [1]
+
+
+def test_callbacks_in_submission_order():
+    dispatched = queue.Queue()
+    pool = executor.Executor(workers=2)
+    pool.start(dispatched.put)
+
+    # the first job ends last
+    release = threading.Event()
+    results = list()
+    jobs = [
+        pool.submit(
+            "slow", lambda: release.wait(TIMEOUT) and 0, callback=results.append
+        ),
+        pool.submit("quick", lambda: 1, callback=results.append),
+    ]
+    jobs[1].result(TIMEOUT)
+    release.set()
+
+    dispatch_until_done(dispatched, jobs)
+    pool.stop()
+
+    assert results == [0, 1]
+    assert pool.jobs == []
+
+
+def test_cancel():
+    dispatched = queue.Queue()
+    pool = executor.Executor()
+    pool.start(dispatched.put)
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def wait():
+        started.set()
+        while not release.wait(0.01):
+            pool.check_cancelled()
+
+    calls = list()
+    results = list()
+    jobs = [
+        pool.submit("running", pool.check_cancelled, callback=results.append),
+        pool.submit("cancelled", wait, callback=results.append),
+        pool.submit("pending", calls.append, 1, callback=results.append),
+    ]
+
+    # cancel a running job and a job still waiting for the worker
+    started.wait(TIMEOUT)
+    jobs[1].cancel()
+    jobs[2].cancel()
+
+    dispatch_until_done(dispatched, jobs)
+    pool.stop()
+
+    assert results == [None]
+    assert calls == []
+    for job in jobs[1:]:
+        with pytest.raises(executor.Cancelled):
+            job.result()
@@ -0,0 +1,102 @@
+"""Check the verified copies resume where they stopped and skip identical files."""
+
+import os
+
+import pytest
+
+from pipeline.utils import files
+
+# a small chunk size, so a small file has many chunks
+CHUNK_SIZE = 1024
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.setattr(files, "CHECKSUM_CHUNK_SIZE", CHUNK_SIZE)
+
+    path = tmp_path / "source.ma"
+    path.write_bytes(os.urandom(CHUNK_SIZE * 10 + 100))
+    return str(path)
+
+
+def written(function, *args):
+    """Get the number of bytes written by the copies of a function."""
+
+    before = files.BYTES_WRITTEN.get() or 0
+    function(*args)
+    return (files.BYTES_WRITTEN.get() or 0) - before
+
+
+def test_resume_from_part(source, tmp_path, monkeypatch):
+    destination = str(tmp_path / "destination.ma")
+    part = destination + files.PART_EXTENSION
+    journal = part + files.JOURNAL_EXTENSION
+
+    # interrupt the copy before its fourth chunk, the next one goes through
+    calls = list()
+
+    def check_cancelled():
+        calls.append(None)
+        if len(calls) == 4:
+            raise Interrupted()
+
+    monkeypatch.setattr(files.executor, "check_cancelled", check_cancelled)
+    with pytest.raises(Interrupted):
+        files.copy_verified(source, destination)
+
+    assert not os.path.exists(destination)
+    assert os.path.getsize(part) == CHUNK_SIZE * 3
+
+    # only the missing chunks are copied
+    size = os.path.getsize(source)
+    assert written(files.copy_verified, source, destination) == size - CHUNK_SIZE * 3
+
+    with open(source, "rb") as source_file, open(destination, "rb") as copy_file:
+        assert copy_file.read() == source_file.read()
+    assert files.check_integrity(destination)
+    assert not os.path.exists(part)
+    assert not os.path.exists(journal)
+
+
+def test_resume_drops_chunks_not_on_disk(source, tmp_path):
+    destination = str(tmp_path / "destination.ma")
+    part = destination + files.PART_EXTENSION
+
+    # the journal lists a chunk that never reached the disk
+    files.copy_verified(source, destination)
+    with open(source, "rb") as source_file:
+        content = source_file.read()
+    os.remove(destination)
+    with open(part, "wb") as part_file:
+        part_file.write(content[: CHUNK_SIZE * 2] + b"\0" * CHUNK_SIZE)
+    stats = os.stat(source)
+    with open(part + files.JOURNAL_EXTENSION, "w") as journal_file:
+        journal_file.write("{} {}\n".format(stats.st_size, stats.st_mtime_ns))
+        for start in range(0, CHUNK_SIZE * 3, CHUNK_SIZE):
+            chunk = content[start : start + CHUNK_SIZE]
+            journal_file.write(files._chunk_digest(chunk) + "\n")
+
+    size = len(content)
+    assert written(files.copy_verified, source, destination) == size - CHUNK_SIZE * 2
+    with open(destination, "rb") as copy_file:
+        assert copy_file.read() == content
+
+
+def test_skip_identical(source, tmp_path):
+    destination = str(tmp_path / "destination.ma")
+    files.copy_verified(source, destination)
+    mtime_ns = os.stat(destination).st_mtime_ns
+
+    skipped = files.COPIES_SKIPPED.get() or 0
+    assert written(files.copy_verified, source, destination) == 0
+    assert files.COPIES_SKIPPED.get() == skipped + 1
+    assert os.stat(destination).st_mtime_ns == mtime_ns
+
+    # a changed source is copied again
+    with open(source, "ab") as source_file:
+        source_file.write(b"changed")
+    assert written(files.copy_verified, source, destination) > 0
@@ -0,0 +1,78 @@
+"""Check the workspace snapshots find the added, removed and modified files."""
+
+import os
+
+from pipeline.api.storage import fingerprint
+
+
+def write(path, content, mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def make_workspace(workspace):
+    write(workspace / "assets" / "ch_bob" / "rig" / "WIP" / "ch_bob_rig_000.ma", b"0")
+    write(workspace / "assets" / "ch_bob" / "rig" / "DEF" / "ch_bob_rig.ma", b"def")
+    write(workspace / "assets" / "pr_cup" / "modeling" / "pr_cup.ma", b"cup")
+    write(workspace / "sets" / "ch_bob_set.ma", b"set")
+    write(workspace / "project.json", b"{}", mtime=1000000)
+
+
+def edit_workspace(workspace):
+    # added
+    write(workspace / "assets" / "ch_bob" / "rig" / "WIP" / "ch_bob_rig_001.ma", b"1")
+    write(workspace / "assets" / "ch_bob" / "anim" / "ch_bob_anim_000.ma", b"a")
+    # removed
+    os.remove(workspace / "assets" / "pr_cup" / "modeling" / "pr_cup.ma")
+    os.remove(workspace / "sets" / "ch_bob_set.ma")
+    os.rmdir(workspace / "sets")
+    # modified, the same size
+    write(workspace / "project.json", b"[]", mtime=2000000)
+
+
+EXPECTED = [
+    "assets/ch_bob/anim/ch_bob_anim_000.ma",
+    "assets/ch_bob/rig/WIP/ch_bob_rig_001.ma",
+    "assets/pr_cup/modeling/pr_cup.ma",
+    "project.json",
+    "sets/ch_bob_set.ma",
+]
+
+
+def test_diff(tmp_path):
+    make_workspace(tmp_path)
+    old = fingerprint.snapshot(str(tmp_path), workers=2)
+
+    assert list(fingerprint.diff(old, fingerprint.snapshot(str(tmp_path)))) == []
+
+    edit_workspace(tmp_path)
+    new = fingerprint.snapshot(str(tmp_path), workers=2)
+
+    assert new["hash"] != old["hash"]
+    assert sorted(fingerprint.diff(old, new)) == EXPECTED
+    # the unchanged folders are the same nodes
+    assert new["dirs"]["assets"]["dirs"]["ch_bob"]["dirs"]["rig"]["dirs"]["DEF"] == (
+        old["dirs"]["assets"]["dirs"]["ch_bob"]["dirs"]["rig"]["dirs"]["DEF"]
+    )
+
+
+def test_diff_from_previous_snapshot(tmp_path):
+    make_workspace(tmp_path)
+    old = fingerprint.snapshot(str(tmp_path), workers=2)
+
+    # the folders changed since the previous snapshot are listed again
+    edit_workspace(tmp_path)
+    new = fingerprint.snapshot(str(tmp_path), workers=2, previous=old)
+
+    assert sorted(fingerprint.diff(old, new)) == EXPECTED
+    assert new["hash"] == fingerprint.snapshot(str(tmp_path))["hash"]
+
+
+def test_diff_without_previous(tmp_path):
+    make_workspace(tmp_path)
+    new = fingerprint.snapshot(str(tmp_path))
+
+    assert sorted(fingerprint.diff(None, new)) == sorted(fingerprint.iter_files(new))
+    assert len(list(fingerprint.iter_files(new))) == 5
@@ -0,0 +1,68 @@
+"""Check the api never imports Qt, so scripts and maya batch stay headless."""
+
+import json
+import os
+import subprocess
+import sys
+
+# the modules that must never be imported by the api
+QT_MODULES = ("PySide2", "shiboken2", "python_core.pyside2", "pipeline.ui")
+
+# the modules asking questions, they used to import the dialogs
+QUESTIONING_MODULES = (
+    "pipeline.api.assets.assets",
+    "pipeline.api.maya_api.creation",
+    "pipeline.api.maya_api.exports",
+    "pipeline.api.checks.git",
+)
+
+# imports every module of the api and the command line,
+# then prints them with the Qt modules loaded
+SCRIPT = """
+import importlib, json, pkgutil, sys, types
+
+def stub(*names):
+    for name in names:
+        module = sys.modules[name] = types.ModuleType(name)
+        parent, _, child = name.rpartition(".")
+        if parent:
+            setattr(sys.modules[parent], child, module)
+
+# the studio library and maya may not be installed where the tests run
+try:
+    import python_core.types.strings
+except ImportError:
+    stub("python_core", "python_core.types", "python_core.types.strings")
+try:
+    import maya.cmds
+except ImportError:
+    stub("maya", "maya.cmds", "maya.mel", "maya.api", "maya.api.OpenMaya")
+
+import pipeline.api
+
+modules = ["pipeline.cli"] + [
+    module.name
+    for module in pkgutil.walk_packages(pipeline.api.__path__, "pipeline.api.")
+]
+for name in modules:
+    importlib.import_module(name)
+
+qt = [name for name in sys.modules if name.startswith({qt!r})]
+print(json.dumps({{"modules": modules, "qt": qt}}))
+"""
+
+
+def test_api_imports_no_qt():
+    # a fresh interpreter, the tests may have imported Qt already
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    process = subprocess.run(
+        [sys.executable, "-c", SCRIPT.format(qt=QT_MODULES)],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    assert not process.returncode, process.stderr
+
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    assert set(QUESTIONING_MODULES) <= set(result["modules"])
+    assert result["qt"] == []
@@ -0,0 +1,61 @@
+"""Check the rsync transfers rebuild the source content from the previous version."""
+
+import os
+import random
+
+import pytest
+
+from pipeline.api.storage import rsync
+from pipeline.utils import files
+
+# the content of the previous version, reproducible
+SIZE = rsync.MIN_BLOCK_SIZE * 40 + 123
+BASIS = random.Random(0).getrandbits(SIZE * 8).to_bytes(SIZE, "little")
+
+
+def edit(content):
+    """Insert, remove and change bytes, shifting the blocks that follow."""
+
+    content = content[:5000] + b"inserted" + content[5000:]
+    content = content[:60000] + content[60100:]
+    return content[:100000] + b"changed" + content[100007:]
+
+
+@pytest.mark.parametrize(
+    "basis, content",
+    [
+        (BASIS, BASIS),
+        (BASIS, edit(BASIS)),
+        (edit(BASIS), BASIS),
+        (BASIS, BASIS[:1000]),
+        (BASIS[:1000], BASIS),
+        (b"", BASIS),
+        (BASIS, b""),
+    ],
+    ids=["same", "edited", "reverted", "truncated", "extended", "empty", "emptied"],
+)
+def test_transfer(tmp_path, basis, content):
+    source = tmp_path / "source.ma"
+    destination = tmp_path / "destination.ma"
+    source.write_bytes(content)
+    destination.write_bytes(basis)
+
+    literal, checksum = rsync.transfer(str(source), str(destination))
+
+    assert destination.read_bytes() == content
+    assert checksum == files.content_checksum(str(destination))
+    assert literal <= len(content)
+
+
+def test_transfer_reuses_shifted_blocks(tmp_path):
+    source = tmp_path / "source.ma"
+    destination = tmp_path / "destination.ma"
+    source.write_bytes(edit(BASIS))
+    destination.write_bytes(BASIS)
+
+    literal, checksum = rsync.transfer(str(source), str(destination))
+
+    # only the blocks around the edits are sent
+    assert destination.read_bytes() == edit(BASIS)
+    assert literal <= rsync.block_size_for(SIZE) * 6
+    assert sorted(os.listdir(tmp_path)) == ["destination.ma", "source.ma"]
@@ -0,0 +1,52 @@
+"""Check the increments stored as deltas are rebuilt byte for byte."""
+
+from pipeline.api.assets import versions
+
+
+def write_increments(directory, count):
+    """Write increments each changing a few lines of the previous one."""
+
+    lines = [b"createNode transform -n node%d;\n" % index for index in range(200)]
+    contents = dict()
+    for version in range(count):
+        lines[version * 7] = b'setAttr ".version" %d;\n' % version
+        lines.insert(version * 11, b"// inserted in %d\n" % version)
+        del lines[-1]
+
+        name = "ch_bob_rig_{:03d}.ma".format(version)
+        contents[name] = b"".join(lines)
+        (directory / name).write_bytes(contents[name])
+
+    return contents
+
+
+def test_encode_round_trip_across_keyframe(tmp_path, monkeypatch):
+    # a short interval, so the chains go through a keyframe
+    monkeypatch.setattr(versions, "KEYFRAME_INTERVAL", 3)
+    contents = write_increments(tmp_path, 8)
+
+    store = versions.VersionStore(str(tmp_path))
+    assert store.encode(keep=1) > 0
+
+    names = sorted(contents)
+    deltas = [name for name in names if store.is_delta(name)]
+    # every third increment and the latest one stay in full
+    assert deltas == [name for index, name in enumerate(names[:-1]) if index % 3 != 2]
+
+    for name, content in contents.items():
+        assert b"".join(store.iter_lines(name)) == content
+    assert store.verify() == []
+
+
+def test_restore_keeps_previous_deltas(tmp_path):
+    contents = write_increments(tmp_path, 4)
+
+    store = versions.VersionStore(str(tmp_path))
+    store.encode(keep=1)
+
+    # the restored increment is the successor of the previous delta
+    store.restore("ch_bob_rig_001.ma")
+    assert not store.is_delta("ch_bob_rig_001.ma")
+    assert store.is_delta("ch_bob_rig_000.ma")
+    for name, content in contents.items():
+        assert b"".join(store.iter_lines(name)) == content